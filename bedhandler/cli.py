@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+from itertools import chain
+from typing import Iterator
+
+from .domain import BaseMultList
+from .handler import ColumnarFileLoader
+from .handler import Region
+from .handler import StreamingBedFileLoader
+from .handler.columnar_file import convert, formats, is_columnar_file
+from .handler.writer import BedFileWriter
+
+
+def open_loader(filename: str, args: argparse.Namespace, region: Region = None) -> StreamingBedFileLoader:
+    """
+    Open an input of a subcommand: stdin ('-'), a columnar file or a BED/TSV file, which is streamed
+    :param filename: the input
+    :param args: parsed arguments
+    :param region: region to be read (the whole input if None)
+    :return: the loader
+    """
+    if filename != '-' and is_columnar_file(filename):
+        return ColumnarFileLoader(filename)
+    return StreamingBedFileLoader(sys.stdin if filename == '-' else filename, strip_chr=args.strip_chr,
+                                  region=region)
+
+
+def iter_records(loader, region: Region = None) -> Iterator[list]:
+    """
+    :return: expanded lines of a loader overlapping region, in the order they're read
+    """
+    if isinstance(loader, ColumnarFileLoader):
+        return (line for line in loader.iter_expanded()
+                if region is None or region.overlaps(line[0], int(line[1]), int(line[2])))
+    return loader.iter_records()
+
+
+def iter_data_lines(loader, region: Region = None) -> Iterator[tuple]:
+    """
+    :return: (data line, expanded line) pairs of a loader overlapping region, in the order they're read. Data lines
+    of BED/TSV inputs are written back as they're found, with every attribute (such as PURPOSE=CDS); columnar inputs
+    only keep expanded lines, so they're serialized again (see BedFileWriter)
+    """
+    if isinstance(loader, ColumnarFileLoader):
+        writer = BedFileWriter(None, loader.columns)
+        return (('\t'.join(writer.to_fields(line)), line) for line in iter_records(loader, region))
+    expander = loader.get_expander()
+    return ((line, bed_line if expander.is_identity() else expander.expand(bed_line))
+            for line, bed_line in loader.iter_data_lines())
+
+
+def write_lines(loader, lines: Iterator[str]):
+    """
+    Write the header lines of a loader and then data lines to stdout
+    """
+    sys.stdout.writelines(line + '\n' for line in chain(loader.header_lines, lines))
+
+
+def run_detect(args: argparse.Namespace) -> int:
+    for filename in args.input:
+        loader = open_loader(filename, args)
+        if len(args.input) > 1:
+            print('{}\t{}'.format(filename, loader.file_type))
+        else:
+            print(loader.file_type)
+    return 0
+
+
+def run_expand(args: argparse.Namespace) -> int:
+    loader = open_loader(args.input, args)
+    if not args.no_header:
+        sys.stdout.write('#' + '\t'.join(loader.columns) + '\n')
+    sys.stdout.writelines('\t'.join(str(value) for value in line) + '\n' for line in iter_records(loader))
+    return 0
+
+
+def values(column) -> set:
+    if isinstance(column, BaseMultList):
+        return set(column.flattened())
+    return {column}
+
+
+def run_filter(args: argparse.Namespace) -> int:
+    region = Region.parse(args.region) if args.region is not None else None
+    loader = open_loader(args.input, args, region)
+    genes = set(args.gene) if args.gene else None
+    pools = set(args.pool) if args.pool else None
+    for name, wanted in (('gene', genes), ('pools', pools)):
+        if wanted is not None and name not in loader.columns:
+            raise ValueError('{} files don\'t describe {}'.format(loader.file_type, name))
+
+    gene_index = loader.columns.index('gene') if genes else -1
+    pools_index = loader.columns.index('pools') if pools else -1
+    write_lines(loader, (data_line for data_line, line in iter_data_lines(loader, region)
+                         if (genes is None or not genes.isdisjoint(values(line[gene_index])))
+                         and (pools is None or not pools.isdisjoint(values(line[pools_index])))))
+    return 0
+
+
+def run_sort(args: argparse.Namespace) -> int:
+    loader = open_loader(args.input, args)
+    if isinstance(loader, ColumnarFileLoader):
+        writer = BedFileWriter(None, loader.columns)
+        write_lines(loader, ('\t'.join(writer.to_fields(line)) for line in loader.iter_expanded()))
+    else:
+        write_lines(loader, loader.iter_sorted_data_lines(args.max_lines_in_memory, args.tmp_dir))
+    return 0
+
+
+def run_query(args: argparse.Namespace) -> int:
+    region = Region.parse(args.region)
+    loader = open_loader(args.input, args, region)
+    if isinstance(loader, ColumnarFileLoader):
+        write_lines(loader, (data_line for data_line, _ in iter_data_lines(loader, region)))
+    else:
+        write_lines(loader, (line for line, _ in loader.iter_data_lines()))
+    return 0
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    rows = convert(sys.stdin if args.input == '-' else args.input, args.output, args.format, args.batch_size,
+                   strip_chr=args.strip_chr, region=args.region)
+    print('Wrote {} rows to {}'.format(rows, args.output), file=sys.stderr)
+    return 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='bedhandler', description='Handle BED/TSV files of Ion Torrent sequencers. '
+                                     'Inputs may be plain, gzip or BGZF files, columnar files, or \'-\' for stdin')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--strip-chr', action='store_true', help='remove \'chr\' from chromosomes')
+
+    detect_parser = subparsers.add_parser('detect', parents=[common], help='print the file type of each input')
+    detect_parser.add_argument('input', nargs='*', default=['-'])
+    detect_parser.set_defaults(func=run_detect)
+
+    expand_parser = subparsers.add_parser('expand', parents=[common], help='print expanded lines, in file order')
+    expand_parser.add_argument('input', nargs='?', default='-')
+    expand_parser.add_argument('--no-header', action='store_true', help='don\'t print column names')
+    expand_parser.set_defaults(func=run_expand)
+
+    filter_parser = subparsers.add_parser('filter', parents=[common],
+                                          help='print lines of some genes, pools or region')
+    filter_parser.add_argument('input', nargs='?', default='-')
+    filter_parser.add_argument('--gene', action='append', help='keep amplicons of this gene (may be repeated)')
+    filter_parser.add_argument('--pool', action='append', type=int,
+                               help='keep amplicons of this pool (may be repeated)')
+    filter_parser.add_argument('--region', help='keep lines overlapping this region (chr:start-end)')
+    filter_parser.set_defaults(func=run_filter)
+
+    sort_parser = subparsers.add_parser('sort', parents=[common],
+                                        help='print lines sorted by chromosome, start and end')
+    sort_parser.add_argument('input', nargs='?', default='-')
+    sort_parser.add_argument('--max-lines-in-memory', type=int, default=1000000,
+                             help='larger inputs are sorted externally, in temporary files')
+    sort_parser.add_argument('--tmp-dir', help='directory of temporary files')
+    sort_parser.set_defaults(func=run_sort)
+
+    query_parser = subparsers.add_parser('query', parents=[common],
+                                         help='print lines overlapping a region (indexed for BGZF files)')
+    query_parser.add_argument('input')
+    query_parser.add_argument('region', help='chr, chr:pos or chr:start-end (one-based, inclusive)')
+    query_parser.set_defaults(func=run_query)
+
+    convert_parser = subparsers.add_parser('convert', parents=[common],
+                                           help='convert a file into a columnar (Parquet or Feather) file')
+    convert_parser.add_argument('input', help='BED/TSV file (plain, gzip or BGZF), or \'-\' for stdin')
+    convert_parser.add_argument('output', help='columnar file (.parquet or .feather)')
+    convert_parser.add_argument('--format', choices=sorted(set(formats.values())),
+                                help='columnar format (inferred from the output extension by default)')
+    convert_parser.add_argument('--batch-size', type=int, default=65536, help='number of rows of each record batch')
+    convert_parser.add_argument('--region', help='convert only lines overlapping a region (chr:start-end)')
+    convert_parser.set_defaults(func=run_convert)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = get_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, ImportError) as e:
+        print('bedhandler {}: {}'.format(args.command, e), file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # the reader of stdout went away (such as head), so nothing else can be written
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,3 +8,5 @@ from .geneid import GeneId
 from .geneid import GeneIdList
 from .submitted_region import SubmittedRegion
 from .submitted_region import SubmittedRegionList
+from .record import BedRecord
+from .record import record_type
@@ -0,0 +1,102 @@
+from collections import namedtuple
+from typing import Union
+
+from .base import BaseMultList
+from .geneid import GeneId, GeneIdList
+from .pools import Pool, Pools
+from .regionid import RegionId, RegionIdList
+from .submitted_region import SubmittedRegion, SubmittedRegionList
+
+# entity types (BaseMultList, BaseList) of columns that may be expanded
+multi_value_columns = {'region_id': (RegionIdList, RegionId),
+                       'gene': (GeneIdList, GeneId),
+                       'pools': (Pools, Pool),
+                       'submitted_region': (SubmittedRegionList, SubmittedRegion)}
+
+# columns stored as int in records
+int_columns = ['chrom_start', 'chrom_end']
+
+
+class BedRecord(tuple):
+    """
+    Base class of compact records (see record_type). Records are named tuples, so they don't have a per-instance
+    __dict__. Coordinates are stored as int and multi-valued columns in a compact form: a single value (such as
+    'GENE1' or 2) when there's a single target with a single value, otherwise a tuple of tuples (such as
+    (('GENE1',), ('GENE2',)) or ((2,), (3, 6))). Expanded entities are rebuilt on demand by entity()
+
+    Only the multi-valued columns in expanded_columns hold entities; the other ones (such as the region ids of
+    ampliseq_panel files, which aren't expanded) are kept as they are
+    """
+    __slots__ = ()
+
+    # multi-valued columns that are expanded into entities (set by record_type)
+    expanded_columns = frozenset(multi_value_columns)
+
+    @staticmethod
+    def compact(value) -> Union[str, int, tuple]:
+        if not isinstance(value, BaseMultList):
+            return value
+        if len(value) == 1 and len(value[0]) == 1:
+            return value[0][0]
+        return tuple(tuple(entity) for entity in value)
+
+    @classmethod
+    def from_expanded(cls, line: list) -> 'BedRecord':
+        """
+        Build a record from an expanded line
+        :param line: line itself (extra columns are dropped, missing ones are None)
+        :return: the record
+        """
+        values = []
+        for i, name in enumerate(cls._fields):
+            value = line[i] if i < len(line) else None
+            if name in int_columns and value is not None:
+                value = int(value)
+            values.append(cls.compact(value))
+        return cls._make(values)
+
+    def entity(self, name: str) -> Union[BaseMultList, str, int, None]:
+        """
+        Get a column, rebuilding its expanded entities (such as GeneIdList or Pools) if it's a multi-valued column
+        :param name: column name
+        :return: the column value
+        """
+        value = getattr(self, name)
+        if name not in self.expanded_columns or value is None:
+            return value
+        entity_list_type, entity_type = multi_value_columns[name]
+        if isinstance(value, tuple):
+            return entity_list_type([entity_type(entity) for entity in value])
+        return entity_list_type([entity_type([value])])
+
+    def to_expanded(self) -> list:
+        """
+        :return: the record as an expanded line, like the ones returned by BedFileLoader.expand_columns(). Trailing
+        None values are taken as missing columns (see from_expanded), so they're dropped
+        """
+        line = [str(value) if name in int_columns and value is not None else self.entity(name)
+                for name, value in zip(self._fields, self)]
+        while line and line[-1] is None:
+            line.pop()
+        return line
+
+
+__record_types = {}
+
+
+def record_type(file_type: str, columns: list, expanded_columns: list = None) -> type:
+    """
+    Get the record class of a file type, creating it on first use
+    :param file_type: file type, such as 'ampliseq_exome'
+    :param columns: column names of the file type
+    :param expanded_columns: multi-valued columns that are expanded into entities (every one of columns if None)
+    :return: a BedRecord named tuple class
+    """
+    if expanded_columns is None:
+        expanded_columns = [name for name in columns if name in multi_value_columns]
+    key = (file_type, tuple(columns), frozenset(expanded_columns))
+    if key not in __record_types:
+        name = ''.join(part.capitalize() for part in file_type.split('_')) + 'Record'
+        __record_types[key] = type(name, (BedRecord, namedtuple(name, columns)),
+                                   {'__slots__': (), 'expanded_columns': key[2]})
+    return __record_types[key]
@@ -1 +1,26 @@
+from .expander import LineExpander
 from .loader import BedFileLoader
+from .streaming import StreamingBedFileLoader
+from .columnar import CategoricalColumn
+from .columnar import ColumnarTable
+from .columnar import MultiValueColumn
+from .interval_index import IntervalIndex
+from .cache import ParsedResultCache
+from .region import Region
+from .batch import load_many
+from .external_sort import external_sort
+from .vocabulary import Vocabulary
+from .design_index import DesignIndex
+from .coverage import CoverageAggregator
+from .coverage import CoverageSummary
+from .coverage_matrix import CoverageMatrix
+from .set_operations import complement
+from .set_operations import intersect
+from .set_operations import merge
+from .set_operations import subtract
+from .writer import BedFileWriter
+from .mapped import MappedBedFile
+from .lazy import LazyExpandedLines
+from .columnar_file import ColumnarFileLoader
+from .columnar_file import convert
+from .columnar_file import write_columnar
@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from .loader import BedFileLoader
+
+
+def load_many(filenames: Iterable[str], max_workers: int = None, loader_class: type = BedFileLoader,
+              **kwargs) -> list:
+    """
+    Load many files concurrently in a pool of threads. Loaders don't share any detection state, so files of
+    different types can be loaded at the same time
+    :param filenames: paths of the files
+    :param max_workers: number of threads (see concurrent.futures.ThreadPoolExecutor)
+    :param loader_class: BedFileLoader or one of its subclasses
+    :param kwargs: arguments given to every loader, such as strip_chr or cache_dir
+    :return: loaders, in the same order as filenames
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda filename: loader_class(filename, **kwargs), filenames))
@@ -0,0 +1,301 @@
+import gzip
+import io
+import json
+import os
+import struct
+import tempfile
+import zlib
+from typing import Iterator, Union
+
+from .region import Region
+
+# an empty block that marks the end of a BGZF file
+bgzf_eof = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+# maximum amount of uncompressed data in a single block
+bgzf_block_size = 0xff00
+
+
+def is_gzip(filename: str) -> bool:
+    with open(filename, 'rb') as file:
+        return file.read(2) == b'\x1f\x8b'
+
+
+def is_bgzf(filename: str) -> bool:
+    """
+    Check whether a file is block-gzipped: a gzip member with the 'BC' extra subfield
+    """
+    with open(filename, 'rb') as file:
+        header = file.read(18)
+    return len(header) == 18 and header[:4] == b'\x1f\x8b\x08\x04' and header[12:14] == b'BC'
+
+
+def open_text(filename: str):
+    """
+    Open a plain, gzip or BGZF file for reading text
+    :param filename: path of the file
+    :return: file object
+    """
+    if is_gzip(filename):
+        return gzip.open(filename, 'rt')
+    return open(filename)
+
+
+class BgzfReader:
+    """
+    Reader for block-gzipped (BGZF) files supporting virtual offsets: (block offset << 16) | offset within the
+    uncompressed block, so lines can be read starting from any position without decompressing previous blocks.
+
+    :param str filename: path of the file
+    """
+
+    def __init__(self, filename: str):
+        self.file = open(filename, 'rb')
+        self.block_offset = 0
+        self.next_block_offset = 0
+        self.block_data = b''
+        self.within_block = 0
+        self.load_block(0)
+
+    def load_block(self, block_offset: int):
+        self.file.seek(block_offset)
+        header = self.file.read(12)
+        self.block_offset = block_offset
+        self.within_block = 0
+        if len(header) < 12:
+            self.block_data = b''
+            self.next_block_offset = block_offset
+            return
+        if header[:4] != b'\x1f\x8b\x08\x04':
+            raise ValueError('Invalid BGZF block at offset {} of \'{}\''.format(block_offset, self.file.name))
+        extra_length = struct.unpack('<H', header[10:12])[0]
+        extra = self.file.read(extra_length)
+        block_size = None
+        i = 0
+        while i + 4 <= extra_length:
+            subfield_length = struct.unpack('<H', extra[i + 2:i + 4])[0]
+            if extra[i:i + 2] == b'BC':
+                block_size = struct.unpack('<H', extra[i + 4:i + 6])[0] + 1
+            i += 4 + subfield_length
+        if block_size is None:
+            raise ValueError('Invalid BGZF block at offset {} of \'{}\''.format(block_offset, self.file.name))
+        compressed = self.file.read(block_size - 12 - extra_length)
+        self.block_data = zlib.decompress(compressed[:-8], -15)
+        self.next_block_offset = block_offset + block_size
+
+    def tell(self) -> int:
+        return (self.block_offset << 16) | self.within_block
+
+    def seek(self, virtual_offset: int):
+        self.load_block(virtual_offset >> 16)
+        self.within_block = virtual_offset & 0xffff
+
+    def readline(self) -> bytes:
+        parts = []
+        while True:
+            if self.within_block >= len(self.block_data):
+                if self.next_block_offset == self.block_offset:
+                    break
+                self.load_block(self.next_block_offset)
+                continue
+            end = self.block_data.find(b'\n', self.within_block)
+            if end == -1:
+                parts.append(self.block_data[self.within_block:])
+                self.within_block = len(self.block_data)
+                continue
+            parts.append(self.block_data[self.within_block:end + 1])
+            self.within_block = end + 1
+            break
+        return b''.join(parts)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line.decode('utf-8')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> 'BgzfReader':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class BgzfWriter(io.TextIOBase):
+    """
+    Writer for block-gzipped (BGZF) files. Text is buffered and written as independent gzip blocks of at most
+    bgzf_block_size bytes, followed by the standard empty EOF block.
+
+    :param str filename: path of the file
+    :param int compresslevel: zlib compression level
+    """
+
+    def __init__(self, filename: str, compresslevel: int = 6):
+        self.file = open(filename, 'wb')
+        self.compresslevel = compresslevel
+        self.buffer = bytearray()
+
+    def write(self, text: str) -> int:
+        self.buffer.extend(text.encode('utf-8'))
+        while len(self.buffer) >= bgzf_block_size:
+            self.write_block(bytes(self.buffer[:bgzf_block_size]))
+            del self.buffer[:bgzf_block_size]
+        return len(text)
+
+    def write_block(self, data: bytes):
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush()
+        block_size = len(compressed) + 25 + 1
+        self.file.write(b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00' +
+                        struct.pack('<H', block_size - 1))
+        self.file.write(compressed)
+        self.file.write(struct.pack('<II', zlib.crc32(data) & 0xffffffff, len(data)))
+
+    def close(self):
+        if self.file.closed:
+            return
+        if self.buffer:
+            self.write_block(bytes(self.buffer))
+            self.buffer.clear()
+        self.file.write(bgzf_eof)
+        self.file.close()
+        super().close()
+
+
+class BgzfIndex:
+    """
+    A tabix-like index for coordinate-sorted BGZF files.
+
+    Like tabix, the index can't be built for files that aren't sorted (lines of a chromosome must be contiguous and
+    sorted by chrom_start), since read_region stops at the first line past the region: build raises a ValueError
+    then, and load remembers it, so the file isn't read again until it changes.
+
+    For each chromosome, the index keeps a linear index: for every window of 2 ** window_shift bases, the virtual
+    offset of the first line overlapping the window. The index is stored next to the file (filename + suffix) and
+    rebuilt when the file changes.
+
+    :param dict chromosomes: chromosome -> list of virtual offsets per window (-1 for windows without lines)
+    """
+    suffix = '.bhi'
+    window_shift = 14
+
+    def __init__(self, chromosomes: dict):
+        self.chromosomes = chromosomes
+
+    @staticmethod
+    def split_data_line(line: str) -> Union[list, None]:
+        fields = line.rstrip('\n').split('\t', 3)
+        if len(fields) >= 3 and fields[1].isdigit() and fields[2].isdigit():
+            return fields
+        return None
+
+    @classmethod
+    def build(cls, filename: str) -> 'BgzfIndex':
+        chromosomes = {}
+        previous_chrom, previous_start = None, 0
+        with BgzfReader(filename) as reader:
+            while True:
+                offset = reader.tell()
+                line = reader.readline()
+                if not line:
+                    break
+                fields = cls.split_data_line(line.decode('utf-8'))
+                if fields is None:
+                    continue
+                start, end = int(fields[1]), max(int(fields[2]), int(fields[1]) + 1)
+                if fields[0] != previous_chrom:
+                    if fields[0] in chromosomes:
+                        raise ValueError('\'{}\' isn\'t sorted: lines of {} aren\'t contiguous'.format(
+                            filename, fields[0]))
+                    previous_chrom, previous_start = fields[0], 0
+                elif start < previous_start:
+                    raise ValueError('\'{}\' isn\'t sorted: {}:{} comes after {}:{}'.format(
+                        filename, fields[0], start, previous_chrom, previous_start))
+                previous_start = start
+                windows = chromosomes.setdefault(fields[0], [])
+                last_window = (end - 1) >> cls.window_shift
+                if len(windows) <= last_window:
+                    windows.extend([-1] * (last_window + 1 - len(windows)))
+                for window in range(start >> cls.window_shift, last_window + 1):
+                    if windows[window] == -1:
+                        windows[window] = offset
+        return cls(chromosomes)
+
+    @classmethod
+    def load(cls, filename: str) -> 'BgzfIndex':
+        """
+        Load the index of a file, building (and saving) it if it's missing or stale. Raises a ValueError if the
+        file isn't sorted
+        :param filename: path of the BGZF file
+        :return: the index
+        """
+        stat = os.stat(filename)
+        stored = None
+        try:
+            with open(filename + cls.suffix) as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            pass
+        if isinstance(stored, dict) and stored.get('size') == stat.st_size and \
+                stored.get('mtime_ns') == stat.st_mtime_ns:
+            if 'unsorted' in stored:
+                raise ValueError(stored['unsorted'])
+            if 'chromosomes' in stored:
+                return cls(stored['chromosomes'])
+
+        try:
+            index = cls.build(filename)
+            content = {'chromosomes': index.chromosomes}
+        except ValueError as e:
+            index, error = None, e
+            content = {'unsorted': str(e)}
+
+        # write to a temporary file and rename it, so concurrent loaders never read a partial index
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), suffix='.tmp')
+        except OSError:
+            fd = None
+        if fd is not None:
+            try:
+                with os.fdopen(fd, 'w') as file:
+                    json.dump(dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns, **content), file)
+                os.replace(tmp_path, filename + cls.suffix)
+            except OSError:
+                os.remove(tmp_path)
+        if index is None:
+            raise error
+        return index
+
+    def first_offset(self, region: Region) -> Union[int, None]:
+        """
+        :return: the virtual offset where lines overlapping region may start, or None if there are none
+        """
+        windows = self.chromosomes.get(region.chrom, [])
+        for offset in windows[region.start >> self.window_shift:]:
+            if offset != -1:
+                return offset
+        return None
+
+    def read_region(self, reader: BgzfReader, region: Region) -> Iterator[str]:
+        """
+        Yield the lines of a region, reading only the blocks that hold them
+        :param reader: reader of the indexed file
+        :param region: region itself
+        :return: iterator over lines overlapping the region
+        """
+        offset = self.first_offset(region)
+        if offset is None:
+            return
+        reader.seek(offset)
+        for line in reader:
+            fields = self.split_data_line(line)
+            if fields is None:
+                continue
+            if fields[0] != region.chrom or (region.end is not None and int(fields[1]) >= region.end):
+                return
+            if region.overlaps(fields[0], int(fields[1]), int(fields[2])):
+                yield line
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Union
+
+
+class ParsedResultCache:
+    """
+    An on-disk cache for parsed files.
+
+    Each entry is a pickle file holding a small header (file size, mtime and content hash), followed by the parsed
+    state (detected file type, columns and column indexes, which is small) and, optionally, the expanded lines as a
+    ColumnarTable (see put_expanded), so the state is read without unpickling expanded lines. Entries are reused when
+    the file's size and mtime are unchanged; when only the mtime changed (such as a copied or touched file), the
+    content hash decides, and the entry's header is then rewritten with the new mtime so the file isn't hashed again.
+    By default a file rewritten with the same size within the mtime resolution of its filesystem would be taken as
+    unchanged; giving verify_hash compares the content hash on every lookup instead, at the cost of reading the file.
+    Hits refresh the entry's mtime, and the least recently used entries are evicted whenever the cache grows beyond
+    max_size bytes.
+
+    :param str cache_dir: directory where entries are stored (it's created if it doesn't exist)
+    :param int max_size: maximum size of the cache in bytes
+    :param bool verify_hash: whether the content hash is compared even when size and mtime are unchanged
+    """
+    suffix = '.bhcache'
+
+    def __init__(self, cache_dir: str, max_size: int = 1024 ** 3, verify_hash: bool = False):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.verify_hash = verify_hash
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, filename: str, *options) -> str:
+        key = repr((os.path.abspath(filename),) + options).encode('utf-8')
+        return os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + self.suffix)
+
+    @staticmethod
+    def content_hash(filename: str) -> str:
+        digest = hashlib.blake2b()
+        with open(filename, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def is_valid(self, header: dict, filename: str, stat: os.stat_result = None) -> bool:
+        """
+        :param stat: stat of filename (it's read if None)
+        :return: whether an entry's header describes the current content of filename
+        """
+        stat = os.stat(filename) if stat is None else stat
+        if header['size'] != stat.st_size:
+            return False
+        if header['mtime_ns'] == stat.st_mtime_ns and not self.verify_hash:
+            return True
+        return header['hash'] == self.content_hash(filename)
+
+    def read(self, filename: str, *options, expanded: bool = False) -> Union[tuple, None]:
+        """
+        Read a valid entry
+        :param filename: path of the parsed file
+        :param options: any loading option that changes the parsed state
+        :param expanded: whether expanded lines are read too
+        :return: (header, state, expanded lines or None) or None if there isn't a valid entry
+        """
+        path = self.entry_path(filename, *options)
+        try:
+            with open(path, 'rb') as entry:
+                header = pickle.load(entry)
+                stat = os.stat(filename)
+                if not self.is_valid(header, filename, stat):
+                    return None
+                if header['mtime_ns'] != stat.st_mtime_ns:
+                    # the content hash matched: keep the new mtime, so the next lookup doesn't hash the file again
+                    header = dict(header, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+                    self.rewrite_header(entry, path, header)
+                state = pickle.load(entry)
+                lines = pickle.load(entry) if expanded and header.get('expanded') else None
+            os.utime(path)
+            return header, state, lines
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, AttributeError):
+            return None
+
+    def get(self, filename: str, *options) -> Union[dict, None]:
+        """
+        Look up the parsed state of a file
+        :param filename: path of the parsed file
+        :param options: any loading option that changes the parsed state
+        :return: the state or None if there isn't a valid entry
+        """
+        entry = self.read(filename, *options)
+        return entry[1] if entry is not None else None
+
+    def get_expanded(self, filename: str, *options):
+        """
+        Look up the expanded lines of a file, stored by put_expanded
+        :param filename: path of the parsed file
+        :param options: any loading option that changes the parsed state
+        :return: the ColumnarTable or None if there isn't a valid entry holding it
+        """
+        entry = self.read(filename, *options, expanded=True)
+        return entry[2] if entry is not None else None
+
+    def put(self, filename: str, state: dict, *options):
+        """
+        Store the parsed state of a file (replacing its expanded lines, if any)
+        :param filename: path of the parsed file
+        :param state: parsed state
+        :param options: any loading option that changes the parsed state
+        """
+        stat = os.stat(filename)
+        header = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': self.content_hash(filename)}
+        self.write(filename, options, header, state)
+
+    def put_expanded(self, filename: str, expanded, *options) -> bool:
+        """
+        Add the expanded lines of a file to its entry, which must still be valid (so lines parsed from a file that
+        changed since its state was stored aren't kept)
+        :param filename: path of the parsed file
+        :param expanded: expanded lines, as a ColumnarTable
+        :param options: any loading option that changes the parsed state
+        :return: whether they were stored
+        """
+        entry = self.read(filename, *options)
+        if entry is None:
+            return False
+        header, state, _ = entry
+        self.write(filename, options, dict(header, expanded=True), state, expanded)
+        return True
+
+    def rewrite_header(self, entry, path: str, header: dict):
+        """
+        Replace the header of an entry, copying the pickled parts that follow it as they are
+        :param entry: the entry's file object, positioned right after its header (and left there)
+        :param path: path of the entry
+        :param header: new header
+        """
+        position = entry.tell()
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as new_entry:
+                pickle.dump(header, new_entry, protocol=pickle.HIGHEST_PROTOCOL)
+                shutil.copyfileobj(entry, new_entry)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        entry.seek(position)
+
+    def write(self, filename: str, options: tuple, header: dict, *parts):
+        """
+        Write an entry to a temporary file and then rename it, so concurrent readers never see a partial entry
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as entry:
+                pickle.dump(header, entry, protocol=pickle.HIGHEST_PROTOCOL)
+                for part in parts:
+                    pickle.dump(part, entry, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.entry_path(filename, *options))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_size
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(self.suffix):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                    entries.append((stat.st_mtime_ns, stat.st_size, name))
+                except OSError:
+                    continue
+        total = sum(entry[1] for entry in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
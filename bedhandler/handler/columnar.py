@@ -0,0 +1,492 @@
+import gc
+import importlib
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate, islice
+from typing import Iterable, Union
+
+from ..domain import BaseMultList
+from ..domain.record import multi_value_columns
+from .vocabulary import Vocabulary
+
+# pyarrow types of array typecodes
+arrow_types = {'i': 'int32', 'q': 'int64', 'd': 'float64'}
+
+# numpy dtypes of array typecodes
+numpy_dtypes = {'i': 'int32', 'q': 'int64', 'd': 'float64'}
+
+# leading bytes of columnar files
+magic_numbers = {b'PAR1': 'parquet', b'ARROW1': 'feather'}
+
+
+def columnar_format(filename: str) -> Union[str, None]:
+    """
+    :return: 'parquet' or 'feather' if filename is a columnar file (by its leading bytes), otherwise None
+    """
+    try:
+        with open(filename, 'rb') as file:
+            start = file.read(6)
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+    for magic, format in magic_numbers.items():
+        if start.startswith(magic):
+            return format
+    return None
+
+
+def import_optional(module: str):
+    """
+    Import an optional dependency
+    :param module: module name, such as 'pyarrow'
+    :return: the module
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError('{0} is required for this feature, install it with: pip install {0}'.format(module))
+
+
+@contextmanager
+def paused_gc():
+    """
+    Pause the cyclic garbage collector while many small containers (such as the entities of expanded lines) are
+    built at once: they don't form cycles, but every collection they trigger traverses all of them again
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def translate_codes(codes: array, source: Vocabulary, target: Vocabulary) -> array:
+    """
+    :return: codes of source vocabulary as codes of target vocabulary (the same array if both vocabularies agree)
+    """
+    translation = [target.code(value) for value in source.values]
+    if source is target or translation == list(range(len(translation))):
+        return codes
+    return array(codes.typecode, [translation[code] for code in codes])
+
+
+def arrow_array(values: array):
+    """
+    :return: a pyarrow array wrapping the buffer of values (without copying them)
+    """
+    pa = import_optional('pyarrow')
+    return pa.Array.from_buffers(getattr(pa, arrow_types[values.typecode])(), len(values),
+                                 [None, pa.py_buffer(values)])
+
+
+class CategoricalColumn:
+    """
+    A column of repeated strings (such as chromosomes) stored as integer codes of a vocabulary
+
+    :param Vocabulary vocabulary: vocabulary of the column's values (a new one if None)
+    """
+
+    def __init__(self, vocabulary: Vocabulary = None):
+        self.codes = array('i')
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+
+    @property
+    def categories(self) -> list:
+        return self.vocabulary.values
+
+    def append(self, value: str):
+        self.codes.append(self.vocabulary.code(value))
+
+    def extend(self, values: Iterable[str]):
+        self.codes.extend(map(self.vocabulary.code, values))
+
+    def extend_from(self, other: 'CategoricalColumn'):
+        """
+        Append the rows of another column, translating its codes (not its values) to this column's vocabulary
+        :param other: column itself
+        """
+        self.codes.extend(translate_codes(other.codes, other.vocabulary, self.vocabulary))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> str:
+        return self.vocabulary[self.codes[i]]
+
+    def decode(self, vocabulary: Vocabulary = None) -> list:
+        """
+        Decode every row at once
+        :param vocabulary: if given, values are interned through it instead of being the column's own objects
+        :return: values of the column
+        """
+        categories = self.categories if vocabulary is None else [vocabulary.intern(value)
+                                                                 for value in self.categories]
+        return [categories[code] for code in self.codes]
+
+    def to_arrow(self):
+        """
+        :return: a pyarrow DictionaryArray of the column
+        """
+        pa = import_optional('pyarrow')
+        return pa.DictionaryArray.from_arrays(arrow_array(self.codes), pa.array(list(self.categories), pa.string()))
+
+    def to_pandas(self):
+        """
+        :return: a pandas Categorical of the column
+        """
+        pd = import_optional('pandas')
+        np = import_optional('numpy')
+        return pd.Categorical.from_codes(np.frombuffer(self.codes, dtype=numpy_dtypes[self.codes.typecode]),
+                                         list(self.categories))
+
+
+class MultiValueColumn:
+    """
+    A column of BaseMultList entities (such as GeneIdList or Pools) stored as offsets and values.
+
+    Values of the i-th row's entities are values[target_offsets[t]:target_offsets[t + 1]] for t in
+    range(row_offsets[i], row_offsets[i + 1]).
+
+    :param type entity_list_type: BaseMultList subclass used to rebuild a row
+    :param type entity_type: BaseList subclass used to rebuild each entity of a row
+    :param str typecode: array typecode for values, or None to keep them in a list of strings
+    :param Vocabulary vocabulary: if given, values are stored as int32 codes of this vocabulary
+    """
+
+    def __init__(self, entity_list_type: type, entity_type: type, typecode: str = None,
+                 vocabulary: Vocabulary = None):
+        self.entity_list_type = entity_list_type
+        self.entity_type = entity_type
+        self.vocabulary = vocabulary
+        self.row_offsets = array('q', [0])
+        self.target_offsets = array('q', [0])
+        if vocabulary is not None:
+            typecode = 'i'
+        self.values = array(typecode) if typecode is not None else []
+
+    def append(self, entity_list: BaseMultList):
+        for entity in entity_list:
+            self.values.extend(entity if self.vocabulary is None else [self.vocabulary.code(v) for v in entity])
+            self.target_offsets.append(len(self.values))
+        self.row_offsets.append(len(self.target_offsets) - 1)
+
+    def extend(self, entity_lists: Iterable[BaseMultList]):
+        """
+        Append many rows, computing offsets of all of them at once
+        :param entity_lists: rows themselves
+        """
+        entity_lists = entity_lists if isinstance(entity_lists, list) else list(entity_lists)
+        entities = [entity for entity_list in entity_lists for entity in entity_list]
+        values = [value for entity in entities for value in entity]
+        # accumulate yields the initial offset first, which is already the last one of the column
+        self.target_offsets.extend(islice(accumulate(map(len, entities), initial=self.target_offsets[-1]), 1, None))
+        self.row_offsets.extend(islice(accumulate(map(len, entity_lists), initial=self.row_offsets[-1]), 1, None))
+        self.values.extend(values if self.vocabulary is None else map(self.vocabulary.code, values))
+
+    def extend_from(self, other: 'MultiValueColumn'):
+        """
+        Append the rows of another column of the same entities, shifting its offsets (and translating its codes, if
+        values are vocabulary encoded)
+        :param other: column itself
+        """
+        for offsets, other_offsets in [(self.target_offsets, other.target_offsets),
+                                       (self.row_offsets, other.row_offsets)]:
+            base = offsets[-1]
+            offsets.extend(other_offsets[1:] if base == 0 else [offset + base for offset in other_offsets[1:]])
+        if self.vocabulary is None:
+            self.values.extend(other.values)
+        else:
+            self.values.extend(translate_codes(other.values, other.vocabulary, self.vocabulary))
+
+    def empty_like(self, vocabulary: Vocabulary = None) -> 'MultiValueColumn':
+        """
+        :param vocabulary: vocabulary of the new column, if this one's values are vocabulary encoded
+        :return: a column without rows, storing values the same way as this one
+        """
+        typecode = self.values.typecode if isinstance(self.values, array) else None
+        return MultiValueColumn(self.entity_list_type, self.entity_type, typecode,
+                                vocabulary if self.vocabulary is not None else None)
+
+    def entity_values(self, t: int) -> list:
+        values = self.values[self.target_offsets[t]:self.target_offsets[t + 1]]
+        if self.vocabulary is None:
+            return values
+        return [self.vocabulary[code] for code in values]
+
+    def __len__(self) -> int:
+        return len(self.row_offsets) - 1
+
+    def __getitem__(self, i: int) -> BaseMultList:
+        return self.entity_list_type([self.entity_type(self.entity_values(t))
+                                      for t in range(self.row_offsets[i], self.row_offsets[i + 1])])
+
+    def to_entity_lists(self, vocabulary: Vocabulary = None) -> list:
+        """
+        Rebuild the entities of every row at once, slicing flat lists of values instead of decoding row by row
+        :param vocabulary: if given, values of vocabulary encoded columns are interned through it
+        :return: BaseMultList of each row
+        """
+        if self.vocabulary is None:
+            values = self.values if isinstance(self.values, list) else self.values.tolist()
+        else:
+            decoded = self.vocabulary.values if vocabulary is None else [vocabulary.intern(value)
+                                                                          for value in self.vocabulary.values]
+            values = [decoded[code] for code in self.values]
+        entity_type, entity_list_type = self.entity_type, self.entity_list_type
+        target_offsets, row_offsets = self.target_offsets.tolist(), self.row_offsets.tolist()
+        entities = [entity_type(values[start:end]) for start, end in zip(target_offsets, target_offsets[1:])]
+        return [entity_list_type(entities[start:end]) for start, end in zip(row_offsets, row_offsets[1:])]
+
+    def to_list(self, i: int) -> list:
+        """
+        :return: values of the i-th row's entities, as a list of lists
+        """
+        return [list(self.entity_values(t)) for t in range(self.row_offsets[i], self.row_offsets[i + 1])]
+
+    def to_arrow(self):
+        """
+        :return: a pyarrow array of the column, typed as a list (rows) of lists (entities) of values, built from the
+        offsets without copying them
+        """
+        pa = import_optional('pyarrow')
+        if self.vocabulary is not None:
+            values = pa.array(list(self.vocabulary.values), pa.string()).take(arrow_array(self.values))
+        elif isinstance(self.values, array):
+            values = arrow_array(self.values)
+        else:
+            values = pa.array(self.values, pa.string())
+        entities = pa.LargeListArray.from_arrays(arrow_array(self.target_offsets), values)
+        return pa.LargeListArray.from_arrays(arrow_array(self.row_offsets), entities)
+
+
+class ColumnarTable:
+    """
+    A columnar representation of expanded lines.
+
+    Chromosomes are stored as a CategoricalColumn, gene symbols as codes of a vocabulary, coordinates and amplicon
+    coverage metrics as typed arrays (array.array, which exposes the buffer protocol, so numpy.frombuffer can wrap them
+    without copying), and expanded multi-valued columns (region id, gene, pools and submitted region) as
+    MultiValueColumn. Any other column is kept as a list of strings.
+
+    Fields past the given columns (such as name, score and strand of a BED6 file loaded as general_tsv) are kept as
+    string columns named by their position (see extra_column_name), added to columns when the first line is appended.
+
+    Tables that aren't typed keep coordinates and metrics as the strings of expanded lines, so to_lines() rebuilds
+    lines equal to the appended ones (typed float columns may be formatted differently, such as '98.50' as '98.5').
+
+    :param list columns: column names (the table works on its own copy)
+    :param str file_type: type of the file the lines were loaded from
+    :param Vocabulary chrom_vocabulary: vocabulary of chromosomes (a new one if None)
+    :param Vocabulary gene_vocabulary: vocabulary of gene symbols (a new one if None)
+    :param bool typed: whether coordinates and metrics are stored as typed arrays
+    """
+    # typecodes of numeric columns
+    __int_columns = ['chrom_start', 'chrom_end', 'gc_count', 'overlaps', 'fwd_e2e', 'rev_e2e', 'total_reads',
+                     'fwd_reads', 'rev_reads']
+    __float_columns = ['cov20x', 'cov100x', 'cov500x']
+
+    # typecodes of values of multi-valued columns (None to keep them as strings)
+    __multi_value_typecodes = {'pools': 'q'}
+
+    def __init__(self, columns: list, file_type: str, chrom_vocabulary: Vocabulary = None,
+                 gene_vocabulary: Vocabulary = None, typed: bool = True):
+        self.columns = list(columns)
+        self.file_type = file_type
+        self.typed = typed
+        self.chrom_vocabulary = chrom_vocabulary if chrom_vocabulary is not None else Vocabulary()
+        self.gene_vocabulary = gene_vocabulary if gene_vocabulary is not None else Vocabulary()
+        self.data = {}
+        self.__length = 0
+
+    @classmethod
+    def typecode(cls, name: str) -> Union[str, None]:
+        """
+        :return: array typecode of a numeric column, or None if the column isn't numeric
+        """
+        if name in cls.__int_columns:
+            return 'q'
+        if name in cls.__float_columns:
+            return 'd'
+        return None
+
+    @staticmethod
+    def extra_column_name(j: int) -> str:
+        """
+        :return: name of the j-th field (zero-based) of lines wider than the table's columns, such as 'column_4'
+        """
+        return 'column_{}'.format(j + 1)
+
+    def __check_width(self, width: int):
+        """
+        Add columns for the fields of the first lines past the table's columns. Columns can't be added once rows
+        were appended, since those rows have no value for them
+        :param width: largest number of fields of the lines being appended
+        """
+        if width <= len(self.columns):
+            return
+        if self.data:
+            raise ValueError('Line has {} fields but the table has {} columns'.format(width, len(self.columns)))
+        self.columns += [self.extra_column_name(j) for j in range(len(self.columns), width)]
+
+    def new_column(self, name: str, value) -> Union[list, array, CategoricalColumn, MultiValueColumn]:
+        if name == 'chrom':
+            return CategoricalColumn(self.chrom_vocabulary)
+        if self.typed and self.typecode(name) is not None:
+            return array(self.typecode(name))
+        if isinstance(value, BaseMultList) and name in multi_value_columns:
+            vocabulary = self.gene_vocabulary if name == 'gene' else None
+            return MultiValueColumn(*multi_value_columns[name], self.__multi_value_typecodes.get(name), vocabulary)
+        return []
+
+    def append(self, line: list):
+        """
+        Append an expanded line to the table
+        :param line: line itself
+        """
+        self.__check_width(len(line))
+        if not self.data:
+            self.data = {name: self.new_column(name, value) for name, value in zip(self.columns, line)}
+        for name, value in zip(self.columns, line):
+            column = self.data[name]
+            if isinstance(column, array):
+                column.append(float(value) if column.typecode == 'd' else int(value))
+            else:
+                column.append(value)
+        self.__length += 1
+
+    def extend(self, lines: Iterable[list], chunk_size: int = 65536):
+        """
+        Append many expanded lines, one column at a time, reading at most chunk_size lines at once
+        :param lines: lines themselves
+        :param chunk_size: number of lines kept in memory
+        """
+        lines = iter(lines)
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                return
+            widths = set(map(len, chunk))
+            self.__check_width(max(widths))
+            if not self.data:
+                self.data = {name: self.new_column(name, value)
+                             for name, value in zip(self.columns, max(chunk, key=len))}
+            # lines of the same length (the usual case) are transposed at once
+            transposed = list(zip(*chunk)) if len(widths) == 1 else None
+            for j, name in enumerate(self.columns):
+                if name not in self.data:
+                    continue
+                column = self.data[name]
+                values = transposed[j] if transposed is not None else [line[j] for line in chunk if j < len(line)]
+                if isinstance(column, array):
+                    column.extend(map(float if column.typecode == 'd' else int, values))
+                else:
+                    column.extend(values)
+            self.__length += len(chunk)
+
+    def extend_from(self, other: 'ColumnarTable'):
+        """
+        Append the rows of another table with the same columns (such as one built by another process), one column at
+        a time and without rebuilding its lines. Categorical and gene codes are translated to this table's vocabularies
+        :param other: table itself
+        """
+        if not other.data:
+            return
+        if not self.data:
+            self.columns = list(other.columns)
+            self.data = {name: self.empty_like(column) for name, column in other.data.items()}
+        elif other.names != self.names:
+            raise ValueError('Tables have different columns: {} and {}'.format(self.names, other.names))
+        for name, column in other.data.items():
+            if isinstance(column, (CategoricalColumn, MultiValueColumn)):
+                self.data[name].extend_from(column)
+            else:
+                self.data[name].extend(column)
+        self.__length += len(other)
+
+    def empty_like(self, column: Union[list, array, CategoricalColumn, MultiValueColumn]) \
+            -> Union[list, array, CategoricalColumn, MultiValueColumn]:
+        """
+        :return: a column without rows, storing values the same way as column but with this table's vocabularies
+        """
+        if isinstance(column, CategoricalColumn):
+            return CategoricalColumn(self.chrom_vocabulary)
+        if isinstance(column, MultiValueColumn):
+            return column.empty_like(self.gene_vocabulary)
+        if isinstance(column, array):
+            return array(column.typecode)
+        return []
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def __getitem__(self, name: str) -> Union[list, array, CategoricalColumn, MultiValueColumn]:
+        return self.data[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.data
+
+    @property
+    def names(self) -> list:
+        """
+        :return: names of the columns holding data (lines may have fewer columns than the file type)
+        """
+        return [name for name in self.columns if name in self.data]
+
+    def to_lines(self, chrom_vocabulary: Vocabulary = None, gene_vocabulary: Vocabulary = None) -> list:
+        """
+        Rebuild expanded lines, decoding one column at a time (typed columns are formatted back as str)
+        :param chrom_vocabulary: if given, chromosomes are interned through it (such as a loader's vocabulary)
+        :param gene_vocabulary: if given, gene symbols are interned through it
+        :return: list of expanded lines
+        """
+        columns = []
+        with paused_gc():
+            for name in self.names:
+                column = self.data[name]
+                if isinstance(column, array):
+                    columns.append([str(value) for value in column])
+                elif isinstance(column, CategoricalColumn):
+                    columns.append(column.decode(chrom_vocabulary))
+                elif isinstance(column, MultiValueColumn):
+                    columns.append(column.to_entity_lists(gene_vocabulary if name == 'gene' else None))
+                else:
+                    columns.append(column)
+            return [list(line) for line in zip(*columns)]
+
+    def to_arrow(self):
+        """
+        :return: a pyarrow RecordBatch of the table. Chromosomes are dictionary encoded and multi-valued columns
+        (such as gene and pools) are list typed
+        """
+        pa = import_optional('pyarrow')
+        arrays = []
+        for name in self.names:
+            column = self.data[name]
+            if isinstance(column, array):
+                arrays.append(arrow_array(column))
+            elif isinstance(column, (CategoricalColumn, MultiValueColumn)):
+                arrays.append(column.to_arrow())
+            else:
+                arrays.append(pa.array(column, pa.string()))
+        return pa.RecordBatch.from_arrays(arrays, names=self.names)
+
+    def to_pandas(self):
+        """
+        :return: a pandas DataFrame of the table. Chromosomes are categorical and multi-valued columns (such as gene
+        and pools) hold lists of lists
+        """
+        pd = import_optional('pandas')
+        np = import_optional('numpy')
+        data = {}
+        for name in self.names:
+            column = self.data[name]
+            if isinstance(column, array):
+                data[name] = np.frombuffer(column, dtype=numpy_dtypes[column.typecode])
+            elif isinstance(column, CategoricalColumn):
+                data[name] = column.to_pandas()
+            elif isinstance(column, MultiValueColumn):
+                data[name] = [column.to_list(i) for i in range(len(column))]
+            else:
+                data[name] = column
+        return pd.DataFrame(data, columns=self.names)
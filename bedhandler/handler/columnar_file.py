@@ -0,0 +1,292 @@
+import json
+import os
+from typing import Iterator, TextIO, Union
+
+from ..domain.record import multi_value_columns
+from .columnar import columnar_format, import_optional
+from .expander import LineExpander
+from .loader import BedFileLoader
+from .streaming import StreamingBedFileLoader
+from .vocabulary import Vocabulary
+from .writer import BedFileWriter
+
+# schema metadata key of the loader's state (file type, columns, header lines)
+metadata_key = b'bedhandler'
+
+# columnar formats by file extension
+formats = {'.parquet': 'parquet', '.pq': 'parquet', '.feather': 'feather', '.arrow': 'feather'}
+
+
+def get_format(filename: str, format: str = None) -> str:
+    """
+    :param filename: path of a columnar file
+    :param format: 'parquet' or 'feather', or None to infer it from the file extension
+    :return: the format
+    """
+    if format is None:
+        format = formats.get(os.path.splitext(filename)[1].lower())
+    if format not in formats.values():
+        raise ValueError('Unknown columnar format for \'{}\', use one of: {}'.format(
+            filename, ', '.join(sorted(set(formats.values())))))
+    return format
+
+
+def is_columnar_file(filename: str) -> bool:
+    return columnar_format(filename) is not None
+
+
+def write_columnar(loader: BedFileLoader, output: str, format: str = None, batch_size: int = 65536) -> int:
+    """
+    Write the expanded lines of a loader to a columnar file (requires pyarrow), one record batch (or Parquet row
+    group) at a time. The file type, columns and header lines of the loader are kept in the schema metadata. Fields
+    past the loader's columns (such as those of a BED6 file loaded as general_tsv) are written as string columns
+    named by position (see ColumnarTable.extra_column_name), which are recorded in the metadata columns too.
+
+    Feather files are written uncompressed, so they can be memory mapped without copying when they're read
+    :param loader: loader itself
+    :param output: path of the columnar file
+    :param format: 'parquet' or 'feather', or None to infer it from the output extension
+    :param batch_size: number of rows of each record batch
+    :return: number of rows written
+    """
+    pa = import_optional('pyarrow')
+    format = get_format(output, format)
+    # streaming loaders give lines in file order, which is only known once they're written (None: it's checked when
+    # the file is read, see ColumnarFileLoader.is_sorted)
+    state = {'file_type': loader.file_type, 'columns': loader.columns, 'header_lines': loader.header_lines,
+             'is_sorted': None if isinstance(loader, StreamingBedFileLoader) else True}
+    metadata = {metadata_key: json.dumps(state).encode('utf-8')}
+    writer = None
+    rows = 0
+    try:
+        for batch in loader.iter_batches(batch_size):
+            if writer is None:
+                # the first batch tells whether lines have fields past the loader's columns
+                state['columns'] = batch.names
+                metadata = {metadata_key: json.dumps(state).encode('utf-8')}
+            elif batch.names != state['columns']:
+                raise ValueError('Lines of \'{}\' don\'t have the same number of fields'.format(loader.filename))
+            record_batch = batch.to_arrow().replace_schema_metadata(metadata)
+            if writer is None:
+                writer = new_writer(output, format, record_batch.schema)
+            writer.write_batch(record_batch)
+            rows += len(batch)
+        if writer is None:
+            writer = new_writer(output, format, pa.schema([], metadata=metadata))
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def new_writer(output: str, format: str, schema):
+    pa = import_optional('pyarrow')
+    if format == 'parquet':
+        return import_optional('pyarrow.parquet').ParquetWriter(output, schema)
+    # vocabularies only grow, so the dictionary of a batch is a delta of the previous batch's one
+    return pa.ipc.new_file(output, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+
+def convert(filename: Union[str, TextIO], output: str, format: str = None, batch_size: int = 65536, **kwargs) -> int:
+    """
+    Convert any file BedFileLoader understands into a columnar file (see write_columnar). The file is streamed (see
+    StreamingBedFileLoader), so memory usage doesn't depend on its size, and rows are written in file order
+    :param filename: path of the BED/TSV file, or a text file object (such as sys.stdin)
+    :param output: path of the columnar file
+    :param format: 'parquet' or 'feather', or None to infer it from the output extension
+    :param batch_size: number of rows of each record batch
+    :param kwargs: StreamingBedFileLoader options (such as strip_chr or region)
+    :return: number of rows written
+    """
+    return write_columnar(StreamingBedFileLoader(filename, **kwargs), output, format, batch_size)
+
+
+def read_schema(filename: str, memory_map: bool = True) -> tuple:
+    """
+    Read the schema of a columnar file written by write_columnar (requires pyarrow)
+    :param filename: path of the file
+    :param memory_map: whether the file is memory mapped
+    :return: (format, pyarrow Schema, metadata dict)
+    """
+    pa = import_optional('pyarrow')
+    format = columnar_format(filename)
+    if format is None:
+        raise ValueError('\'{}\' isn\'t a Parquet or Feather file'.format(filename))
+    if format == 'parquet':
+        schema = import_optional('pyarrow.parquet').read_schema(filename, memory_map=memory_map)
+    else:
+        with pa.memory_map(filename) if memory_map else pa.OSFile(filename) as source:
+            schema = pa.ipc.open_file(source).schema
+    if schema.metadata is None or metadata_key not in schema.metadata:
+        raise ValueError('\'{}\' wasn\'t written by bedhandler'.format(filename))
+    return format, schema, json.loads(schema.metadata[metadata_key].decode('utf-8'))
+
+
+def read_columnar(filename: str, columns: list = None, memory_map: bool = True) -> tuple:
+    """
+    Read a columnar file written by write_columnar (requires pyarrow)
+    :param filename: path of the file
+    :param columns: columns to be read (all of them if None)
+    :param memory_map: whether the file is memory mapped
+    :return: (pyarrow Table, metadata dict)
+    """
+    format, schema, metadata = read_schema(filename, memory_map)
+    if columns is not None:
+        for name in columns:
+            if name not in schema.names:
+                raise ValueError('Unknown column \'{}\' for {}'.format(name, metadata['file_type']))
+
+    if format == 'parquet':
+        table = import_optional('pyarrow.parquet').read_table(filename, columns=columns, memory_map=memory_map)
+    else:
+        table = import_optional('pyarrow.feather').read_table(filename, columns=columns, memory_map=memory_map)
+    return table, metadata
+
+
+class ColumnarFileLoader(BedFileLoader):
+    """
+    Loads a columnar file written by write_columnar (see also convert), without parsing any text: the file is memory
+    mapped and only the requested columns are read. Expanded lines, batches and data frames are built from the
+    columns, and to_arrow() returns the table itself.
+
+    Data lines (bed_lines) are rebuilt from the expanded lines, and parsed again, only when they're needed (such as
+    by lazy_expand_columns), and only if every column was read. Numeric columns of expanded lines are str, like the
+    ones parsed from text, but float columns may be formatted differently from the original file (such as '98.50' read
+    back as '98.5').
+
+    :param str filename: path of the columnar file
+    :param list columns: columns to be read (all of them if None)
+    :param bool memory_map: whether the file is memory mapped
+    :param Vocabulary chrom_vocabulary: vocabulary of chromosomes, which may be shared by many loaders
+    :param Vocabulary gene_vocabulary: vocabulary of gene symbols, which may be shared by many loaders
+    """
+
+    def __init__(self, filename: str, columns: list = None, memory_map: bool = True,
+                 chrom_vocabulary: Vocabulary = None, gene_vocabulary: Vocabulary = None):
+        self.filename = filename
+        self.strip_chr = False
+        self.region = None
+        self.cache = None
+        self.chrom_vocabulary = chrom_vocabulary if chrom_vocabulary is not None else Vocabulary()
+        self.gene_vocabulary = gene_vocabulary if gene_vocabulary is not None else Vocabulary()
+        self.table, metadata = read_columnar(filename, columns, memory_map)
+
+        # data lines are rebuilt on demand (see bed_lines)
+        self.__bed_lines = None
+        self.load_lines(metadata['header_lines'], [])
+        self.__bed_lines = None
+        self.file_type = metadata['file_type']
+        self.columns = self.table.column_names
+        self.is_sorted = metadata['is_sorted']
+        # lines may have fewer values than the file type has columns, so only the stored columns are compared
+        self.projected = columns is not None and list(columns) != read_schema(filename, memory_map)[1].names
+
+    @property
+    def bed_lines(self) -> list:
+        if self.__bed_lines is None:
+            self.rebuild_bed_lines()
+        return self.__bed_lines
+
+    @bed_lines.setter
+    def bed_lines(self, bed_lines: list):
+        self.__bed_lines = bed_lines
+
+    @property
+    def is_sorted(self) -> bool:
+        """
+        Whether rows are sorted by sort_key. Files written from streaming loaders don't know it, so it's checked on
+        first access, over the coordinate columns only
+        """
+        if self.__is_sorted is None:
+            coordinates = ['chrom', 'chrom_start', 'chrom_end']
+            table = read_columnar(self.filename, coordinates)[0]
+            self.__is_sorted = self.check_sorted(zip(*[table.column(name).to_pylist() for name in coordinates]))
+        return self.__is_sorted
+
+    @is_sorted.setter
+    def is_sorted(self, is_sorted: Union[bool, None]):
+        self.__is_sorted = is_sorted
+
+    def rebuild_bed_lines(self):
+        """
+        Rebuild data lines from the table (see BedFileWriter.to_fields) and detect their column indexes
+        """
+        if self.projected:
+            raise ValueError('Data lines can\'t be rebuilt from some of the columns of \'{}\''.format(self.filename))
+        writer = BedFileWriter(None, self.columns)
+        file_type, columns, is_sorted = self.file_type, self.columns, self.is_sorted
+        self.load_lines(self.header_lines, [writer.to_fields(line) for line in self.iter_table()])
+        self.file_type, self.columns, self.is_sorted = file_type, columns, is_sorted
+
+    def get_expander(self) -> LineExpander:
+        # the expander depends on the column indexes detected in data lines
+        if self.__bed_lines is None:
+            self.rebuild_bed_lines()
+        return super().get_expander()
+
+    def get_expanded_columns(self) -> list:
+        pa = import_optional('pyarrow')
+        return [field.name for field in self.table.schema
+                if field.name in multi_value_columns and pa.types.is_large_list(field.type)]
+
+    def decode(self, name: str, column) -> list:
+        """
+        Decode a column of a record batch to the values of expanded lines
+        :param name: column name
+        :param column: pyarrow array
+        :return: list of values
+        """
+        pa = import_optional('pyarrow')
+        values = column.to_pylist()
+        if name == 'chrom':
+            return [self.chrom_vocabulary.intern(value) for value in values]
+        if name in multi_value_columns and pa.types.is_large_list(column.type):
+            entity_list_type, entity_type = multi_value_columns[name]
+            if name == 'gene':
+                intern = self.gene_vocabulary.intern
+                return [entity_list_type([entity_type([intern(gene) for gene in entity]) for entity in value])
+                        for value in values]
+            return [entity_list_type([entity_type(entity) for entity in value]) for value in values]
+        if pa.types.is_integer(column.type):
+            return [str(value) for value in values]
+        if pa.types.is_floating(column.type):
+            return [str(int(value)) if value.is_integer() else repr(value) for value in values]
+        return values
+
+    def iter_table(self, columns: list = None) -> Iterator[list]:
+        """
+        Expand rows of the table, in the order they were written
+        :param columns: columns of the expanded lines (all of the read ones if None)
+        :return: iterator over expanded lines
+        """
+        table = self.table if columns is None else self.table.select(columns)
+        for batch in table.to_batches():
+            yield from (list(line) for line in zip(*[self.decode(name, column)
+                                                     for name, column in zip(batch.schema.names, batch.columns)]))
+
+    def iter_expanded(self) -> Iterator[list]:
+        if self.is_sorted:
+            return self.iter_table()
+        return iter(self.sorted_lines(list(self.iter_table())))
+
+    def expand_columns(self, workers: int = None, columns: list = None) -> list:
+        """
+        Expand rows of the table, without parsing data lines
+        :param workers: ignored (there's nothing to parse)
+        :param columns: if given, lines hold only these columns (in this order)
+        :return: expanded lines, sorted by chrom, chrom_start and chrom_end
+        """
+        if columns is not None:
+            for name in columns:
+                self.get_column_index(name)
+            if self.is_sorted:
+                return list(self.iter_table(columns))
+            indexes = [self.columns.index(name) for name in columns]
+            return [[line[i] for i in indexes] for line in self.iter_expanded()]
+        return list(self.iter_expanded())
+
+    def to_arrow(self, batch_size: int = 65536):
+        return self.table
+
+    def to_pandas(self):
+        return self.table.to_pandas()
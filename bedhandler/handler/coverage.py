@@ -0,0 +1,185 @@
+from array import array
+from collections import namedtuple
+from statistics import median
+
+from .columnar import ColumnarTable, MultiValueColumn, import_optional, numpy_dtypes
+
+CoverageSummary = namedtuple('CoverageSummary', ['count', 'sum', 'mean', 'median', 'uniformity'])
+
+
+def get_numpy():
+    """
+    :return: numpy, or None if it isn't installed (pure Python is used then)
+    """
+    try:
+        return import_optional('numpy')
+    except ImportError:
+        return None
+
+
+def to_numpy(np, values):
+    """
+    :return: values as a numpy array, wrapping typed arrays (array.array) without copying them
+    """
+    if isinstance(values, array):
+        return np.frombuffer(values, dtype=numpy_dtypes[values.typecode])
+    return np.asarray(values)
+
+
+def summarize_sorted(np, sorted_values, counts) -> list:
+    """
+    Summarize many groups of values at once with numpy (see summarize)
+    :param np: numpy module
+    :param sorted_values: values of every group, one group after the other, sorted within each group
+    :param counts: number of values of each group (at least one)
+    :return: a CoverageSummary for each group
+    """
+    starts = np.cumsum(counts) - counts
+    sums = np.add.reduceat(sorted_values, starts)
+    means = sums / counts
+    uniform = np.add.reduceat((sorted_values >= np.repeat(0.2 * means, counts)).astype(np.int64), starts)
+    lower, upper = sorted_values[starts + (counts - 1) // 2], sorted_values[starts + counts // 2]
+    return [CoverageSummary(count, total, mean, low if count % 2 else (low + high) / 2, reaching / count)
+            for count, total, mean, low, high, reaching in zip(counts.tolist(), sums.tolist(), means.tolist(),
+                                                                lower.tolist(), upper.tolist(), uniform.tolist())]
+
+
+def summarize(values) -> CoverageSummary:
+    """
+    Summarize coverage values. Uniformity is the fraction of values reaching at least 20% of the mean, as in
+    Torrent Suite's coverage analysis. Values are summarized with numpy if it's installed
+    :param values: values themselves (typed arrays are wrapped by numpy without copying them)
+    :return: the summary
+    """
+    count = len(values)
+    if count == 0:
+        return CoverageSummary(0, 0, 0.0, 0.0, 0.0)
+    np = get_numpy()
+    if np is not None:
+        return summarize_sorted(np, np.sort(to_numpy(np, values)), np.array([count]))[0]
+    total = sum(values)
+    mean = total / count
+    threshold = 0.2 * mean
+    uniformity = sum(1 for value in values if value >= threshold) / count
+    return CoverageSummary(count, total, mean, median(values), uniformity)
+
+
+class CoverageAggregator:
+    """
+    Aggregates coverage metrics of an amplicon_cov file by gene or pool.
+
+    Metrics are read from the typed arrays of a ColumnarTable and groups are computed once from the offsets of the
+    gene and pools columns. Amplicons listing many genes or pools (merged '&' targets, or Pool=1,2) count once for
+    each of them. If numpy is installed, every group is summarized at once over the metric array (see
+    summarize_sorted); otherwise, one group at a time in pure Python.
+
+    :param ColumnarTable table: table of an amplicon_cov file
+    """
+    metrics = ['total_reads', 'fwd_reads', 'rev_reads', 'fwd_e2e', 'rev_e2e', 'cov20x', 'cov100x', 'cov500x']
+
+    def __init__(self, table: ColumnarTable):
+        self.table = table
+        self.__groups = {}
+        self.__group_arrays = {}
+
+    @classmethod
+    def from_loader(cls, loader) -> 'CoverageAggregator':
+        """
+        :param loader: a BedFileLoader of an amplicon_cov file
+        :return: the aggregator
+        """
+        if loader.file_type != 'amplicon_cov':
+            raise ValueError('Coverage can only be aggregated for amplicon_cov files, not {}'.format(loader.file_type))
+        return cls(loader.to_columnar())
+
+    @staticmethod
+    def group_rows(column: MultiValueColumn) -> dict:
+        """
+        :return: value -> ids of rows listing it (once per row)
+        """
+        groups = {}
+        row_offsets, target_offsets, values = column.row_offsets, column.target_offsets, column.values
+        for i in range(len(column)):
+            for value in set(values[target_offsets[row_offsets[i]]:target_offsets[row_offsets[i + 1]]]):
+                rows = groups.get(value)
+                if rows is None:
+                    rows = groups[value] = array('q')
+                rows.append(i)
+        if column.vocabulary is not None:
+            return {column.vocabulary[code]: rows for code, rows in groups.items()}
+        return groups
+
+    @staticmethod
+    def group_arrays(np, column: MultiValueColumn) -> tuple:
+        """
+        Group rows by value with numpy, from the offsets of a column with typed values (see group_rows)
+        :param np: numpy module
+        :param column: the column
+        :return: (values, sorted; ids of rows listing each value, once per row, one group after the other and sorted
+        within each group; number of rows of each group)
+        """
+        value_offsets = to_numpy(np, column.target_offsets)[to_numpy(np, column.row_offsets)]
+        row_ids = np.repeat(np.arange(len(column)), np.diff(value_offsets))
+        values = to_numpy(np, column.values)[:len(row_ids)]
+        order = np.lexsort((row_ids, values))
+        values, row_ids = values[order], row_ids[order]
+        # rows listing a value many times (such as Pool=1,1) count once
+        first = np.ones(len(values), dtype=bool)
+        first[1:] = (values[1:] != values[:-1]) | (row_ids[1:] != row_ids[:-1])
+        values, row_ids = values[first], row_ids[first]
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        return values[starts], row_ids, np.diff(np.r_[starts, len(values)])
+
+    def column(self, column: str) -> MultiValueColumn:
+        if column not in self.table or not isinstance(self.table[column], MultiValueColumn):
+            raise ValueError('Can\'t group by \'{}\''.format(column))
+        return self.table[column]
+
+    def groups(self, column: str) -> dict:
+        if column not in self.__groups:
+            self.__groups[column] = self.group_rows(self.column(column))
+        return self.__groups[column]
+
+    def metric(self, metric: str) -> array:
+        if metric not in self.metrics or metric not in self.table:
+            raise ValueError('Unknown coverage metric \'{}\''.format(metric))
+        return self.table[metric]
+
+    def aggregate(self, column: str, metric: str = 'total_reads') -> dict:
+        """
+        Summarize a metric for each value of a multi-valued column
+        :param column: column used to group amplicons, such as 'gene' or 'pools'
+        :param metric: coverage metric, such as 'total_reads'
+        :return: value -> CoverageSummary
+        """
+        values = self.metric(metric)
+        multi_value_column = self.column(column)
+        np = get_numpy()
+        if np is None or not isinstance(multi_value_column.values, array) or len(multi_value_column.values) == 0:
+            return {key: summarize([values[i] for i in rows]) for key, rows in self.groups(column).items()}
+
+        if column not in self.__group_arrays:
+            self.__group_arrays[column] = self.group_arrays(np, multi_value_column)
+        keys, rows, counts = self.__group_arrays[column]
+        group_values = to_numpy(np, values)[rows]
+        # sorted by value within each group, keeping groups in place
+        group_values = group_values[np.lexsort((group_values, np.repeat(np.arange(len(counts)), counts)))]
+        summaries = summarize_sorted(np, group_values, counts)
+        if multi_value_column.vocabulary is not None:
+            keys = [multi_value_column.vocabulary[code] for code in keys.tolist()]
+        else:
+            keys = keys.tolist()
+        # values in the order of the first row listing them, like group_rows
+        return {keys[i]: summaries[i] for i in np.argsort(rows[np.cumsum(counts) - counts], kind='stable').tolist()}
+
+    def by_gene(self, metric: str = 'total_reads') -> dict:
+        return self.aggregate('gene', metric)
+
+    def by_pool(self, metric: str = 'total_reads') -> dict:
+        return self.aggregate('pools', metric)
+
+    def summary(self, metric: str = 'total_reads') -> CoverageSummary:
+        """
+        :return: summary of a metric over all amplicons
+        """
+        return summarize(self.metric(metric))
@@ -0,0 +1,169 @@
+import hashlib
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union
+
+from .bgzf import open_text
+from .columnar import ColumnarTable
+from .loader import BedFileLoader
+
+# columns of amplicon.cov files, as they're found in the file (before expanding attributes)
+amplicon_cov_columns = ['contig_id', 'contig_srt', 'contig_end', 'region_id', 'attributes', 'gc_count', 'overlaps',
+                        'fwd_e2e', 'rev_e2e', 'total_reads', 'fwd_reads', 'rev_reads', 'cov20x', 'cov100x',
+                        'cov500x']
+
+
+def read_metric(filename: str, metric: str) -> tuple:
+    """
+    Read region ids and a metric from an amplicon.cov file, without building expanded lines. The metric column is
+    located by the file's header, or by the default amplicon.cov layout if there isn't one
+    :param filename: path of the file
+    :param metric: metric column, such as 'total_reads'
+    :return: (list of region ids, array of metric values)
+    """
+    typecode = ColumnarTable.typecode(metric)
+    convert = float if typecode == 'd' else int
+    region_ids = []
+    values = array(typecode)
+    region_id_index = amplicon_cov_columns.index('region_id')
+    metric_index = amplicon_cov_columns.index(metric)
+    with open_text(filename) as file:
+        for line in file:
+            bed_line = BedFileLoader.split_line(line, False)
+            if bed_line is None:
+                header = line.rstrip('\n').split('\t')
+                if 'region_id' in header and metric in header:
+                    region_id_index, metric_index = header.index('region_id'), header.index(metric)
+                continue
+            region_ids.append(bed_line[region_id_index])
+            values.append(convert(bed_line[metric_index]))
+    return region_ids, values
+
+
+def region_ids_digest(region_ids: list) -> str:
+    """
+    :return: digest of an ordered list of region ids, so lists can be compared without sending them between processes
+    """
+    return hashlib.sha1('\n'.join(region_ids).encode('utf-8')).hexdigest()
+
+
+def read_metric_column(filename: str, metric: str, with_region_ids: bool) -> tuple:
+    """
+    Read a metric in a worker of CoverageMatrix.load (see read_metric). Only the digest of region ids is sent back
+    to the parent process, unless the ids themselves are asked for
+    :param filename: path of the file
+    :param metric: metric column, such as 'total_reads'
+    :param with_region_ids: whether region ids are returned
+    :return: (list of region ids or None, digest of region ids, array of metric values)
+    """
+    region_ids, values = read_metric(filename, metric)
+    return region_ids if with_region_ids else None, region_ids_digest(region_ids), values
+
+
+class CoverageMatrix:
+    """
+    A regions x samples matrix of a coverage metric, built from many amplicon.cov files.
+
+    Values are kept in a single preallocated array (row-major: values[region * len(samples) + sample]). Rows
+    follow the region order of the first file; every file must describe the same set of regions, each one once.
+
+    :param list region_ids: row labels
+    :param list samples: column labels
+    :param str metric: metric in the matrix
+    :param array values: values of the matrix
+    """
+
+    def __init__(self, region_ids: list, samples: list, metric: str, values: array):
+        self.region_ids = region_ids
+        self.samples = samples
+        self.metric = metric
+        self.values = values
+        self.__region_rows = {region_id: i for i, region_id in enumerate(region_ids)}
+        if len(self.__region_rows) != len(region_ids):
+            duplicate = next(region_id for i, region_id in enumerate(region_ids) if self.__region_rows[region_id] != i)
+            raise ValueError('Region \'{}\' is described more than once'.format(duplicate))
+
+    @classmethod
+    def load(cls, filenames: list, metric: str = 'total_reads', samples: list = None,
+             max_workers: int = None) -> 'CoverageMatrix':
+        """
+        Build a matrix from many amplicon.cov files, which are parsed in a pool of processes. Workers send back the
+        region ids of the first file only; the other files are compared to it by a digest of their region ids, and
+        the ids of a file are read again (by the parent process) only when its regions are in a different order
+        :param filenames: paths of the files (plain or gzip compressed)
+        :param metric: coverage metric, such as 'total_reads' or 'cov20x'
+        :param samples: sample names (file names by default)
+        :param max_workers: number of processes (see concurrent.futures.ProcessPoolExecutor)
+        :return: the matrix
+        """
+        if ColumnarTable.typecode(metric) is None or metric not in amplicon_cov_columns:
+            raise ValueError('Unknown coverage metric \'{}\''.format(metric))
+        if samples is None:
+            samples = [os.path.basename(filename) for filename in filenames]
+        if len(samples) != len(filenames):
+            raise ValueError('Expected {} sample names, got {}'.format(len(filenames), len(samples)))
+
+        matrix = digest = None
+        with_region_ids = [j == 0 for j in range(len(filenames))]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for j, (filename, (region_ids, file_digest, values)) in enumerate(zip(filenames, executor.map(
+                    read_metric_column, filenames, [metric] * len(filenames), with_region_ids))):
+                if matrix is None:
+                    matrix = cls(region_ids, samples, metric,
+                                 array(values.typecode, bytes(values.itemsize * len(region_ids) * len(samples))))
+                    digest = file_digest
+                elif file_digest == digest:
+                    region_ids = matrix.region_ids
+                else:
+                    region_ids, _ = read_metric(filename, metric)
+                matrix.fill(j, region_ids, values, filename)
+        if matrix is None:
+            matrix = cls([], samples, metric, array(ColumnarTable.typecode(metric)))
+        return matrix
+
+    def fill(self, sample: int, region_ids: list, values: array, filename: str = ''):
+        """
+        Fill the column of a sample
+        :param sample: column index
+        :param region_ids: region ids of values
+        :param values: metric values
+        :param filename: file the values were read from (for error messages)
+        """
+        columns = len(self.samples)
+        if region_ids is self.region_ids or region_ids == self.region_ids:
+            for i, value in enumerate(values):
+                self.values[i * columns + sample] = value
+            return
+
+        if len(region_ids) != len(self.region_ids) or set(region_ids) != self.__region_rows.keys():
+            raise ValueError('\'{}\' doesn\'t describe the same regions as \'{}\''.format(filename, self.samples[0]))
+        for region_id, value in zip(region_ids, values):
+            self.values[self.__region_rows[region_id] * columns + sample] = value
+
+    def value(self, region_id: str, sample: Union[str, int]) -> Union[int, float]:
+        """
+        :param region_id: row label
+        :param sample: column label or index
+        :return: the value of a region in a sample
+        """
+        column = sample if isinstance(sample, int) else self.samples.index(sample)
+        return self.values[self.__region_rows[region_id] * len(self.samples) + column]
+
+    def row(self, region_id: str) -> array:
+        """
+        :return: values of a region in every sample
+        """
+        start = self.__region_rows[region_id] * len(self.samples)
+        return self.values[start:start + len(self.samples)]
+
+    def column(self, sample: Union[str, int]) -> array:
+        """
+        :return: values of every region in a sample
+        """
+        column = sample if isinstance(sample, int) else self.samples.index(sample)
+        return self.values[column::len(self.samples)]
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.region_ids), len(self.samples)
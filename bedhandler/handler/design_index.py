@@ -0,0 +1,58 @@
+from array import array
+
+from ..domain import BaseMultList
+
+
+class DesignIndex:
+    """
+    Inverted indexes over expanded lines: gene -> row ids, pool -> row ids and region id -> row id, where a row id is
+    the position of a line in the indexed list. Merged targets (GENE1&GENE2, Pool=1&2,3) add the row to every gene or
+    pool they list, once per row.
+
+    :param list lines: expanded lines (such as the result of BedFileLoader.expand_columns())
+    :param list columns: column names of lines
+    """
+
+    def __init__(self, lines: list, columns: list):
+        self.lines = lines
+        self.genes = {}
+        self.pools = {}
+        self.region_ids = {}
+
+        gene_index = columns.index('gene') if 'gene' in columns else -1
+        pools_index = columns.index('pools') if 'pools' in columns else -1
+        region_id_index = columns.index('region_id') if 'region_id' in columns else -1
+        for i, line in enumerate(lines):
+            if gene_index != -1 and gene_index < len(line):
+                self.add(self.genes, self.values(line[gene_index]), i)
+            if pools_index != -1 and pools_index < len(line):
+                self.add(self.pools, self.values(line[pools_index]), i)
+            if region_id_index != -1 and region_id_index < len(line):
+                for region_id in self.values(line[region_id_index]):
+                    self.region_ids.setdefault(region_id, i)
+
+    @staticmethod
+    def values(column) -> set:
+        if isinstance(column, BaseMultList):
+            return set(column.flattened())
+        return {column}
+
+    @staticmethod
+    def add(index: dict, keys: set, row_id: int):
+        for key in keys:
+            row_ids = index.get(key)
+            if row_ids is None:
+                row_ids = index[key] = array('q')
+            row_ids.append(row_id)
+
+    def gene_row_ids(self, gene: str) -> array:
+        return self.genes.get(gene, array('q'))
+
+    def pool_row_ids(self, pool: int) -> array:
+        return self.pools.get(pool, array('q'))
+
+    def region_id_row_id(self, region_id: str) -> int:
+        """
+        :return: row id of the (first) line describing region_id, or -1 if there isn't one
+        """
+        return self.region_ids.get(region_id, -1)
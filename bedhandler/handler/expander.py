@@ -0,0 +1,114 @@
+from ..mapper.attributemapper import AttributeMapper
+from ..mapper.regionidmapper import RegionIdMapper
+from .vocabulary import Vocabulary
+
+
+class LineExpander:
+    """
+    This class is responsible for expanding a single data line (already split by '\t'), given the column indexes
+    detected by a loader. The region id column is rewritten as a RegionIdList, and the attributes column is rewritten
+    as multiple columns: GeneIdList, Pools and, when the file describes them, SubmittedRegionList.
+
+    :param int region_id_index: index of the region id column (-1 if there isn't one)
+    :param int attributes_index: index of the attributes column (-1 if there isn't one)
+    :param int submitted_region_index: index of the submitted region data (-1 if there isn't one)
+    :param Vocabulary chrom_vocabulary: if given, chromosomes are interned through it (see intern)
+    :param Vocabulary gene_vocabulary: if given, gene symbols of expanded lines are interned through it
+    """
+
+    def __init__(self, region_id_index: int = -1, attributes_index: int = -1, submitted_region_index: int = -1,
+                 chrom_vocabulary: Vocabulary = None, gene_vocabulary: Vocabulary = None):
+        self.region_id_index = region_id_index
+        self.attributes_index = attributes_index
+        self.submitted_region_index = submitted_region_index
+        self.chrom_vocabulary = chrom_vocabulary
+        self.gene_vocabulary = gene_vocabulary
+
+        self.attribute_mapper = AttributeMapper()
+        self.region_id_mapper = RegionIdMapper()
+
+    def is_identity(self) -> bool:
+        """
+        :return: True if there's nothing to expand, so lines are kept as they are
+        """
+        return self.region_id_index == -1 and self.attributes_index == -1
+
+    def expand(self, line: list) -> list:
+        """
+        Expand region id and attributes columns of a line
+        :param line: line itself
+        :return: the expanded line
+        """
+        if self.region_id_index != -1:
+            expanded_region_column = [self.region_id_mapper.to_entity_list(line[self.region_id_index])]
+            line = line[0:self.region_id_index] + expanded_region_column + line[self.region_id_index + 1:]
+        if self.attributes_index != -1:
+            genes, pools, submitted_regions = self.attribute_mapper.to_entity_list(line[self.attributes_index])
+            if self.gene_vocabulary is not None:
+                self.intern_genes(genes)
+            attr_columns = [genes, pools]
+            if self.submitted_region_index != -1:
+                attr_columns.append(submitted_regions)
+            line = line[0:self.attributes_index] + attr_columns + line[self.attributes_index + 1:]
+        return line
+
+    def get_sources(self, indexes: tuple) -> list:
+        """
+        Find where columns of expanded lines come from in data lines
+        :param indexes: column indexes of expanded lines
+        :return: for each index, (index in the data line, entity), where entity is None for columns kept as they are,
+        'region_id' for the region id column, or the position of the column in AttributeMapper's result
+        """
+        attribute_count = 3 if self.submitted_region_index != -1 else 2
+        sources = []
+        for index in indexes:
+            if self.attributes_index == -1 or index < self.attributes_index:
+                source = index, None
+            elif index < self.attributes_index + attribute_count:
+                source = self.attributes_index, index - self.attributes_index
+            else:
+                source = index - attribute_count + 1, None
+            if source[0] == self.region_id_index:
+                source = source[0], 'region_id'
+            sources.append(source)
+        return sources
+
+    def project(self, line: list, sources: list) -> list:
+        """
+        Expand only some columns of a line
+        :param line: line itself
+        :param sources: sources of the columns (see get_sources)
+        :return: the expanded columns, in the order of sources (None for columns missing in the line)
+        """
+        attributes = None
+        columns = []
+        for index, entity in sources:
+            if index >= len(line):
+                columns.append(None)
+            elif entity is None:
+                columns.append(line[index])
+            elif entity == 'region_id':
+                columns.append(self.region_id_mapper.to_entity_list(line[index]))
+            else:
+                if attributes is None:
+                    attributes = self.attribute_mapper.to_entity_list(line[index])
+                    if self.gene_vocabulary is not None:
+                        self.intern_genes(attributes[0])
+                columns.append(attributes[entity])
+        return columns
+
+    def intern_genes(self, genes: list):
+        for gene_id in genes:
+            gene_id[:] = [self.gene_vocabulary.intern(gene) for gene in gene_id]
+
+    def intern(self, line: list) -> list:
+        """
+        Intern the chromosome and, for expanded lines, the gene symbols of a line through the vocabularies
+        :param line: line itself
+        :return: the same line
+        """
+        if self.chrom_vocabulary is not None:
+            line[0] = self.chrom_vocabulary.intern(line[0])
+        if self.gene_vocabulary is not None and self.attributes_index != -1 and len(line) > self.attributes_index:
+            self.intern_genes(line[self.attributes_index])
+        return line
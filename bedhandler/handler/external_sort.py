@@ -0,0 +1,73 @@
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+
+def write_run(lines: Iterable, tmp_dir: str = None, batch_size: int = 1024):
+    """
+    Write lines to an anonymous temporary file, pickled in batches
+    :return: the file, positioned at its start
+    """
+    run = tempfile.TemporaryFile(dir=tmp_dir)
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            break
+        pickle.dump(batch, run, protocol=pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+
+def read_run(run) -> Iterator:
+    while True:
+        try:
+            batch = pickle.load(run)
+        except EOFError:
+            return
+        yield from batch
+
+
+def external_sort(lines: Iterable, key: Callable, max_lines_in_memory: int, tmp_dir: str = None,
+                  fan_in: int = 64) -> Iterator:
+    """
+    Sort lines that may not fit in memory. Lines are read in runs of max_lines_in_memory, each run is sorted and
+    spilled to a temporary file, and sorted runs are merged (fan_in at a time) while being yielded. The sort is
+    stable, so the result is the same as sorted(lines, key=key). If lines fit in a single run, nothing is written
+    to disk
+    :param lines: lines to be sorted
+    :param key: sort key
+    :param max_lines_in_memory: maximum number of lines kept in memory while runs are built
+    :param tmp_dir: directory of temporary files (see tempfile)
+    :param fan_in: maximum number of runs merged at once
+    :return: iterator over sorted lines
+    """
+    runs = []
+    try:
+        lines = iter(lines)
+        while True:
+            buffer = list(islice(lines, max_lines_in_memory))
+            buffer.sort(key=key)
+            if not runs and len(buffer) < max_lines_in_memory:
+                yield from buffer
+                return
+            if not buffer:
+                break
+            runs.append(write_run(buffer, tmp_dir))
+            del buffer
+
+        while len(runs) > fan_in:
+            merged = []
+            for i in range(0, len(runs), fan_in):
+                group = runs[i:i + fan_in]
+                merged.append(write_run(heapq.merge(*[read_run(run) for run in group], key=key), tmp_dir))
+                for run in group:
+                    run.close()
+            runs = merged
+
+        yield from heapq.merge(*[read_run(run) for run in runs], key=key)
+    finally:
+        for run in runs:
+            run.close()
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_right
+
+
+class ChromosomeIntervals:
+    """
+    Intervals of a single chromosome, stored as an implicit augmented interval tree (the layout used by cgranges).
+
+    Intervals are sorted by start and the sorted array is read as a binary search tree: the node at index i has
+    level k if i ends with exactly k one bits, and its children are i - 2**(k - 1) and i + 2**(k - 1). Each node
+    stores the largest end in its subtree, so an overlap query skips every subtree ending before the query start
+    and visits O(log n) nodes per reported interval, however long some intervals are.
+
+    :param list intervals: (start, end, line index) tuples
+    """
+
+    def __init__(self, intervals: list):
+        intervals.sort(key=lambda x: x[0])
+        self.starts = array('q', [interval[0] for interval in intervals])
+        self.ends = array('q', [interval[1] for interval in intervals])
+        self.line_indexes = array('q', [interval[2] for interval in intervals])
+        self.subtree_max_ends = array('q', self.ends)
+        self.root_level = self.__index()
+
+        # running maximum of ends, for the upstream side of nearest()
+        self.max_ends = array('q')
+        max_end = -1
+        for end in self.ends:
+            max_end = max(max_end, end)
+            self.max_ends.append(max_end)
+
+    def __index(self) -> int:
+        """
+        Fill subtree_max_ends bottom up
+        :return: level of the root
+        """
+        ends, max_ends, n = self.ends, self.subtree_max_ends, len(self.ends)
+        if n == 0:
+            return -1
+        # last is the max end of the rightmost subtree at the current level, which stands in for missing children
+        last_i = (n - 1) & ~1
+        last = ends[last_i]
+        k = 1
+        while 1 << k <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                right = max_ends[i + x] if i + x < n else last
+                max_ends[i] = max(ends[i], max_ends[i - x], right)
+            last_i = last_i - x if last_i >> k & 1 else last_i + x
+            if last_i < n and max_ends[last_i] > last:
+                last = max_ends[last_i]
+            k += 1
+        return k - 1
+
+    def overlaps(self, start: int, end: int) -> list:
+        """
+        :return: positions of intervals overlapping [start, end), sorted by start
+        """
+        starts, ends, max_ends, n = self.starts, self.ends, self.subtree_max_ends, len(self.starts)
+        found = []
+        if n == 0:
+            return found
+        # (level, node, whether its left subtree was already visited); nodes are visited in order
+        stack = [(self.root_level, (1 << self.root_level) - 1, False)]
+        while stack:
+            level, x, left_visited = stack.pop()
+            if level <= 3:
+                # small subtree: a linear scan is cheaper than walking it
+                first = x >> level << level
+                for i in range(first, min(first + (1 << (level + 1)) - 1, n)):
+                    if starts[i] >= end:
+                        break
+                    if ends[i] > start:
+                        found.append(i)
+            elif not left_visited:
+                stack.append((level, x, True))
+                left = x - (1 << (level - 1))
+                # a left child past the end still has children within range
+                if left >= n or max_ends[left] > start:
+                    stack.append((level - 1, left, False))
+            elif x < n and starts[x] < end:
+                if ends[x] > start:
+                    found.append(x)
+                stack.append((level - 1, x + (1 << (level - 1)), False))
+        return found
+
+    def nearest(self, pos: int) -> list:
+        """
+        :return: positions of the intervals closest to pos (the overlapping ones, if there are any)
+        """
+        found = self.overlaps(pos, pos + 1)
+        if found:
+            return found
+
+        right = bisect_right(self.starts, pos)
+        # intervals are half-open, so the last base of an interval is end - 1
+        left_distance = pos - self.max_ends[right - 1] + 1 if right > 0 else None
+        right_distance = self.starts[right] - pos if right < len(self.starts) else None
+
+        if left_distance is not None and (right_distance is None or left_distance <= right_distance):
+            # nothing starting at or before pos reaches it, so the upstream intervals tied on the largest end are
+            # exactly the ones ending there
+            max_end = self.max_ends[right - 1]
+            found.extend(i for i in self.overlaps(max_end - 1, max_end + 1) if self.ends[i] == max_end)
+        if right_distance is not None and (left_distance is None or right_distance <= left_distance):
+            found.extend(range(right, bisect_right(self.starts, self.starts[right])))
+        return found
+
+
+class IntervalIndex:
+    """
+    An index over expanded lines (such as the result of BedFileLoader.expand_columns()) for overlap, point and
+    nearest region queries.
+
+    Lines are grouped by chromosome (first column) and each group is stored as an implicit interval tree (see
+    ChromosomeIntervals), so a query costs O(log n) per line found, long lines included. Coordinates follow the
+    BED convention: zero-based and half-open.
+
+    :param list lines: expanded lines
+    """
+
+    def __init__(self, lines: list):
+        self.lines = lines
+
+        grouped = {}
+        for i, line in enumerate(lines):
+            grouped.setdefault(line[0], []).append((int(line[1]), int(line[2]), i))
+        self.chromosomes = {chrom: ChromosomeIntervals(intervals) for chrom, intervals in grouped.items()}
+
+    @classmethod
+    def from_loader(cls, loader) -> 'IntervalIndex':
+        """
+        Build an index from the expanded lines of a loader
+        :param loader: a BedFileLoader
+        :return: the index
+        """
+        return cls(loader.expand_columns())
+
+    def __lines(self, intervals: ChromosomeIntervals, positions: list) -> list:
+        return [self.lines[intervals.line_indexes[i]] for i in positions]
+
+    def overlaps(self, chrom: str, start: int, end: int) -> list:
+        """
+        Find lines overlapping a region
+        :param chrom: chromosome
+        :param start: region start (zero-based)
+        :param end: region end (exclusive)
+        :return: overlapping lines, sorted by chrom_start
+        """
+        intervals = self.chromosomes.get(chrom)
+        if intervals is None:
+            return []
+        return self.__lines(intervals, intervals.overlaps(start, end))
+
+    def contains(self, chrom: str, pos: int) -> list:
+        """
+        Find lines containing a position
+        :param chrom: chromosome
+        :param pos: position (zero-based)
+        :return: lines containing the position, sorted by chrom_start
+        """
+        return self.overlaps(chrom, pos, pos + 1)
+
+    def nearest(self, chrom: str, pos: int) -> list:
+        """
+        Find the lines closest to a position. Lines containing the position are returned if there are any,
+        otherwise the closest line upstream and/or downstream of it (both of them when they're tied)
+        :param chrom: chromosome
+        :param pos: position (zero-based)
+        :return: closest lines
+        """
+        intervals = self.chromosomes.get(chrom)
+        if intervals is None:
+            return []
+        return self.__lines(intervals, intervals.nearest(pos))
@@ -0,0 +1,63 @@
+from typing import Iterator
+
+from .expander import LineExpander
+
+
+class LazyExpandedLines:
+    """
+    Expanded lines that keep the data lines (and their raw attribute strings) and decode them only on access: a row
+    is expanded when it's read (lines[i]), and a column is expanded for every row at once, the first time it's read
+    (column(name)), and then kept.
+
+    :param list lines: data lines, already sorted
+    :param list columns: column names of expanded lines
+    :param LineExpander expander: expander of the lines
+    """
+
+    def __init__(self, lines: list, columns: list, expander: LineExpander):
+        self.lines = lines
+        self.columns = columns
+        self.expander = expander
+        self.__decoded = {}
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, i: int) -> list:
+        if self.expander.is_identity():
+            return list(self.lines[i])
+        return self.expander.expand(self.lines[i])
+
+    def __iter__(self) -> Iterator[list]:
+        for i in range(len(self.lines)):
+            yield self[i]
+
+    def get_sources(self, names: list) -> list:
+        for name in names:
+            if name not in self.columns:
+                raise ValueError('Unknown column \'{}\''.format(name))
+        return self.expander.get_sources(tuple(self.columns.index(name) for name in names))
+
+    def column(self, name: str) -> list:
+        """
+        :return: values of a column in every row (decoded on first access)
+        """
+        if name not in self.__decoded:
+            sources = self.get_sources([name])
+            self.__decoded[name] = [self.expander.project(line, sources)[0] for line in self.lines]
+        return self.__decoded[name]
+
+    def value(self, i: int, name: str):
+        """
+        :return: value of a column in the i-th row, decoding only that value if the column wasn't decoded yet
+        """
+        if name in self.__decoded:
+            return self.__decoded[name][i]
+        return self.expander.project(self.lines[i], self.get_sources([name]))[0]
+
+    def project(self, names: list) -> list:
+        """
+        :return: rows holding only the given columns, in the given order
+        """
+        sources = self.get_sources(names)
+        return [self.expander.project(line, sources) for line in self.lines]
@@ -1,15 +1,19 @@
 import re
 import sys
-from typing import Union
-
-from ..mapper.geneidmapper import GeneIdMapper
-from ..mapper.poolmapper import PoolMapper
-from ..mapper.regionidmapper import RegionIdMapper
-from ..mapper.submitted_region_mapper import SubmittedRegionMapper
-
-
-def flatten(mult_list: list) -> list:
-    return [val for sublist in mult_list for val in sublist]
+from itertools import islice
+from typing import Iterable, Iterator, Union
+
+from ..domain.record import record_type
+from .bgzf import BgzfIndex, BgzfReader, is_bgzf, is_gzip, open_text
+from .cache import ParsedResultCache
+from .columnar import ColumnarTable, columnar_format, import_optional, paused_gc
+from .design_index import DesignIndex
+from .expander import LineExpander
+from .lazy import LazyExpandedLines
+from .mapped import MappedBedFile
+from .parallel import expand_file, expand_file_table
+from .region import Region
+from .vocabulary import Vocabulary
 
 
 class BedFileLoader:
@@ -40,8 +44,40 @@ class BedFileLoader:
     used in order to create a pandas.DataFrame, for example. Expanding those values is interesting because it makes it
     easier to work with pool and gene data.
 
+    Expanded lines can also be converted directly into columnar batches (see iter_batches), a pyarrow.Table (see
+    to_arrow) or a pandas.DataFrame (see to_pandas), without building the list of lists.
+
+
+    Files may be plain text, gzip or BGZF (block gzip) compressed. Giving a region (such as 'chr7' or
+    'chr7:55241600-55241800') loads only the data lines overlapping it; for sorted BGZF files, a tabix-like index is
+    built next to the file on first use (see BgzfIndex), so only the blocks holding the region are decompressed.
+
+    The first time lines are sorted (or is_sorted is read), data lines are checked in a single pass to be sorted by
+    chrom, chrom_start and chrom_end; if they are, is_sorted is True and expanded lines aren't sorted again.
+
+    Chromosomes and gene symbols are dictionary encoded: every occurrence of a value is interned through
+    chrom_vocabulary/gene_vocabulary, so repeated values share a single str object and have an integer code
+    (see Vocabulary). Passing the same vocabularies to many loaders makes their codes comparable.
+
+    Giving use_mmap parses uncompressed files from a memory map of the file, as bytes (see MappedBedFile), instead of
+    reading them into a single str. Data lines are still decoded in full, since they're kept as lists of str.
+
+    Parsing can be cached on disk by giving a cache_dir: the detected file type, columns and column indexes are stored
+    there when the file is loaded, and expanded lines (as a ColumnarTable) the first time they're expanded. They're
+    reused as long as the file is unchanged (see ParsedResultCache): loading from the cache reads only what was
+    detected, data lines are parsed again when they're first needed, and expand_columns() rebuilds lines from the
+    cached table instead of expanding them.
 
     :param str filename: the path of the file containing data
+    :param bool strip_chr: whether 'chr' must be removed from the first column
+    :param str cache_dir: directory of an on-disk cache for parsed results (disabled if None)
+    :param int cache_max_size: maximum size of the cache in bytes
+    :param region: region (Region or chr:start-end string, one-based and inclusive) to be loaded
+    :param Vocabulary chrom_vocabulary: vocabulary of chromosomes, which may be shared by many loaders
+    :param Vocabulary gene_vocabulary: vocabulary of gene symbols, which may be shared by many loaders
+    :param bool use_mmap: whether uncompressed files are parsed from a memory map
+    :param bool cache_verify_hash: whether cache entries are checked by content hash even when the file's size and
+    mtime are unchanged (see ParsedResultCache)
     """
     # attributes that must be extracted from different file settings
     __region_id = 'region_id'
@@ -51,6 +87,7 @@ class BedFileLoader:
     # a map indicating attribute's pattern, search result and index column in the given file
     # these are used in order to keep info whether the attributes are described in the file,
     # as well as to compute in which line and columns those attributes can be found
+    # (this is a template: each loader works on its own copy, see new_column_map)
     __column_map = {__region_id: {'index': -1, 'pattern': r'.*_\d*\.\d*', 'search': None},
                     __attributes: {'index': -1, 'pattern': 'Pool=', 'search': None},
                     __submitted_region: {'index': -1, 'pattern': 'SUBMITTED_REGION=', 'search': None}}
@@ -70,6 +107,16 @@ class BedFileLoader:
                   __amplicon_cov: {'code': __amplicon_cov, 'columns': [__region_id, __attributes]},
                   __general_tsv: {'code': __general_tsv, 'columns': []}}
 
+    # lines starting with these are never data lines
+    __header_prefixes = ('#', 'track', 'browser')
+
+    # data lines that aren't recognized by their first characters (see is_data_line): any contig name followed by
+    # numeric chrom_start and chrom_end
+    __data_line_pattern = re.compile(r'[^\t\n]+\t\d+\t\d+(\t|\n|$)')
+
+    # number of data lines used to detect the file type and column indexes
+    sample_size = 1000
+
     #  three required BED fields (not camelcase)
     __default_bed = ['chrom', 'chrom_start', 'chrom_end']
 
@@ -83,26 +130,180 @@ class BedFileLoader:
                                                   'cov100x', 'cov500x'],
                  __general_tsv: __default_bed}
 
-    def __init__(self, filename: str, strip_chr: bool = False):
+    def __init__(self, filename: str, strip_chr: bool = False, cache_dir: str = None,
+                 cache_max_size: int = 1024 ** 3, region: Union[Region, str] = None,
+                 chrom_vocabulary: Vocabulary = None, gene_vocabulary: Vocabulary = None, use_mmap: bool = False,
+                 cache_verify_hash: bool = False):
         self.filename = filename
         self.strip_chr = strip_chr
+        self.chrom_vocabulary = chrom_vocabulary if chrom_vocabulary is not None else Vocabulary()
+        self.gene_vocabulary = gene_vocabulary if gene_vocabulary is not None else Vocabulary()
+        self.cache = ParsedResultCache(cache_dir, cache_max_size, cache_verify_hash) if cache_dir is not None else None
+        self.region = Region.parse(region) if isinstance(region, str) else region
 
-        # reset indexes
-        for key in self.__column_map.keys():
-            self.__column_map[key]['index'] = -1
-
+        self.check_not_columnar(filename)
         try:
-            with open(filename) as file:
-                content = file.read()
-                self.__column_map = self.get_map_with_searched_patterns(content)
-                self.header_lines, self.bed_lines = self.split_lines(content.split('\n'), self.strip_chr)
-                self.__column_map = self.get_map_with_column_indexes()
-                self.file_type = self.predict_file_type()
-                self.columns = self.get_columns()
+            state = self.cache.get(filename, *self.get_cache_options()) if self.cache is not None else None
+            if state is not None:
+                self.set_state(state)
+            elif use_mmap and not is_gzip(filename):
+                with MappedBedFile(filename) as mapped:
+                    self.load_lines(*mapped.split_lines(self.strip_chr, self.region))
+            else:
+                self.load(''.join(self.iter_lines(self.region)))
+            if state is None and self.cache is not None:
+                self.cache.put(filename, self.get_state(), *self.get_cache_options())
         except FileNotFoundError:
-            print('Couldn\'t open \'{}\'. File not found!'.format(filename))
+            print('Couldn\'t open \'{}\'. File not found!'.format(filename), file=sys.stderr)
             sys.exit(1)
 
+    @staticmethod
+    def check_not_columnar(filename: str):
+        """
+        Raise a ValueError if filename is a columnar (Parquet or Feather) file, which isn't text
+        :param filename: path of the file
+        """
+        format = columnar_format(filename)
+        if format is not None:
+            raise ValueError('\'{}\' is a {} file, load it with ColumnarFileLoader'.format(filename, format))
+
+    def iter_lines(self, region: Region = None) -> Iterator[str]:
+        """
+        Read lines of the file, decompressing it if needed. When a region is given, data lines that don't overlap
+        it are skipped (header lines are kept)
+        :param region: region to be read (the whole file if None)
+        :return: iterator over lines
+        """
+        index = None
+        if region is not None and is_bgzf(self.filename):
+            try:
+                index = BgzfIndex.load(self.filename)
+            except ValueError:
+                # unsorted files can't be indexed, so their lines are filtered one by one
+                pass
+        if index is not None:
+            with BgzfReader(self.filename) as reader:
+                for line in reader:
+                    if self.split_line(line, False) is not None:
+                        break
+                    yield line
+                yield from index.read_region(reader, region)
+            return
+
+        with open_text(self.filename) as file:
+            yield from self.filter_lines(file, region)
+
+    @classmethod
+    def filter_lines(cls, lines: Iterable[str], region: Region = None) -> Iterator[str]:
+        """
+        Skip data lines that don't overlap a region (header lines are kept)
+        :param lines: lines themselves
+        :param region: region to be kept (every line is kept if None)
+        :return: iterator over lines
+        """
+        for line in lines:
+            if region is not None:
+                bed_line = cls.split_line(line, False)
+                if bed_line is not None and not region.overlaps(bed_line[0], int(bed_line[1]), int(bed_line[2])):
+                    continue
+            yield line
+
+    def load(self, content: str):
+        """
+        Detect the file type and column indexes of the given content and keep its header and data lines
+        :param content: file content (or a prefix of it)
+        """
+        self.load_lines(*self.split_lines(content.split('\n'), self.strip_chr))
+
+    def load_lines(self, header_lines: list, bed_lines: list):
+        """
+        Detect the file type and column indexes of already split lines and keep them
+        :param header_lines: header lines
+        :param bed_lines: data lines, split into columns
+        """
+        self.__column_map = self.new_column_map()
+        self.header_lines, self.bed_lines = header_lines, bed_lines
+        self.intern_chroms(self.bed_lines)
+        self.__column_map = self.get_map_with_column_indexes()
+        self.file_type = self.predict_file_type()
+        self.columns = self.get_columns()
+        self.is_sorted = None
+        self.__expanded_table = None
+        self.__design_index = None
+
+    @property
+    def bed_lines(self) -> list:
+        """
+        Data lines, split into columns. When the loader's state was read from the cache, they're parsed again on
+        first access
+        """
+        if self.__bed_lines is None:
+            _, self.__bed_lines = self.split_lines(''.join(self.iter_lines(self.region)).split('\n'), self.strip_chr)
+            self.intern_chroms(self.__bed_lines)
+        return self.__bed_lines
+
+    @bed_lines.setter
+    def bed_lines(self, bed_lines: list):
+        self.__bed_lines = bed_lines
+
+    @property
+    def is_sorted(self) -> bool:
+        """
+        Whether data lines are sorted by sort_key. It's checked on first access (see check_sorted)
+        """
+        if self.__is_sorted is None:
+            self.__is_sorted = self.check_sorted(self.bed_lines)
+        return self.__is_sorted
+
+    @is_sorted.setter
+    def is_sorted(self, is_sorted: Union[bool, None]):
+        self.__is_sorted = is_sorted
+
+    @classmethod
+    def new_column_map(cls) -> dict:
+        """
+        :return: a copy of the column map owned by a single loader, so loaders don't share detection state
+        """
+        return {key: dict(value) for key, value in cls.__column_map.items()}
+
+    def get_cache_options(self) -> tuple:
+        """
+        :return: loading options that change what is parsed from the file
+        """
+        if self.region is None:
+            return self.strip_chr,
+        return self.strip_chr, repr(self.region)
+
+    def get_state(self) -> dict:
+        """
+        :return: what was detected in the file (but not its lines), in a picklable form (is_sorted is None if it
+        wasn't checked yet)
+        """
+        column_map = {key: {'index': value['index'],
+                            'match': value['search'].group(0) if value['search'] is not None else None}
+                      for key, value in self.__column_map.items()}
+        return {'header_lines': self.header_lines, 'column_map': column_map, 'file_type': self.file_type,
+                'columns': self.columns, 'is_sorted': self.__is_sorted}
+
+    def set_state(self, state: dict):
+        """
+        Restore what was detected in a file, as returned by get_state(). Data lines are parsed again when they're
+        needed (see bed_lines)
+        :param state: parsed state
+        """
+        self.__column_map = self.new_column_map()
+        for key, value in state['column_map'].items():
+            self.__column_map[key]['index'] = value['index']
+            self.__column_map[key]['search'] = re.search(self.__column_map[key]['pattern'], value['match']) \
+                if value['match'] is not None else None
+        self.header_lines = state['header_lines']
+        self.bed_lines = None
+        self.file_type = state['file_type']
+        self.columns = state['columns']
+        self.is_sorted = state['is_sorted']
+        self.__expanded_table = None
+        self.__design_index = None
+
     def get_columns(self) -> list:
         try:
             return self.__columns[self.file_type]
@@ -123,7 +324,7 @@ class BedFileLoader:
                 file_type = self.__type_map[key]['code']
                 prev_matched_columns = matched_columns
 
-        if prev_matched_columns >= 1 and len(self.bed_lines[0]) == 6:
+        if prev_matched_columns >= 1 and len(self.bed_lines) > 0 and len(self.bed_lines[0]) == 6:
             return self.__type_map[self.__ampliseq_panel]['code']
 
         if prev_matched_columns == 2:
@@ -134,68 +335,289 @@ class BedFileLoader:
 
         return file_type
 
-    def get_map_with_searched_patterns(self, content) -> dict:
-        for key in self.__column_map.keys():
-            self.__column_map[key]['search'] = re.search(self.__column_map[key]['pattern'], content)
-        return self.__column_map
+    @staticmethod
+    def is_data_line(line: str) -> bool:
+        """
+        Classify a line by its first characters: data lines start with a digit, 'chr' followed by a digit or a
+        single character chromosome ('chrX\t'). Other contigs (such as chrMT, chrUn_gl000220 or GL000220.1) are
+        recognized by the fallback pattern, which requires numeric chrom_start and chrom_end columns
+        :param line: line itself
+        :return: whether it's a data line
+        """
+        if not line:
+            return False
+        if '0' <= line[0] <= '9':
+            return True
+        if line.startswith('chr') and ('0' <= line[3:4] <= '9' or line[4:5] == '\t'):
+            return True
+        if line.startswith(BedFileLoader.__header_prefixes):
+            return False
+        return BedFileLoader.__data_line_pattern.match(line) is not None
+
+    @staticmethod
+    def split_line(line: str, strip_chr: bool) -> Union[list, None]:
+        """
+        Split a data line into its columns
+        :param line: line itself
+        :param strip_chr: whether 'chr' must be removed from the first column
+        :return: the columns of the line or None if it's not a data line
+        """
+        if BedFileLoader.is_data_line(line):
+            bed_line = line.strip('\n').split('\t')
+            if strip_chr:
+                bed_line[0] = bed_line[0].strip('chr')
+            return bed_line
+        return None
 
     @staticmethod
     def split_lines(lines, strip_chr) -> tuple:
         header_lines = []
         bed_lines = []
         for i, line in enumerate(lines):
-            if re.search(r'^chr\d', line) or re.search(r'^\d', line.strip('\n')) or re.search(r'^chr.\t', line):
-                bed_line = line.strip('\n').split('\t')
-                if strip_chr:
-                    bed_line[0] = bed_line[0].strip('chr')
+            bed_line = BedFileLoader.split_line(line, strip_chr)
+            if bed_line is not None:
                 bed_lines.append(bed_line)
             elif len(line) > 0:
                 header_lines.append(line)
         return header_lines, bed_lines
 
-    def get_map_with_column_indexes(self) -> Union[dict, None]:
-        if len(self.bed_lines) < 1:
+    def get_map_with_column_indexes(self) -> dict:
+        """
+        Search each attribute's pattern in the first sample_size data lines, in a single pass. For each attribute,
+        the search result and the index of the matching column (the last one, if many columns match) are taken from
+        the first line where the pattern is found
+        :return: the column map
+        """
+        patterns = {key: re.compile(value['pattern']) for key, value in self.__column_map.items()}
+        pending = list(patterns.keys())
+        for line in islice(self.bed_lines, self.sample_size):
+            for key in list(pending):
+                for j, column in enumerate(line):  # type: str
+                    search = patterns[key].search(column)
+                    if search is not None:
+                        self.__column_map[key]['search'] = search
+                        self.__column_map[key]['index'] = j
+                if self.__column_map[key]['search'] is not None:
+                    pending.remove(key)
+            if not pending:
+                break
+
+        return self.__column_map
+
+    def get_expander(self) -> LineExpander:
+        """
+        Build an expander for the column indexes detected in this file
+        :return: the expander
+        """
+        return LineExpander(self.__column_map[self.__region_id]['index'],
+                            self.__column_map[self.__attributes]['index'],
+                            self.__column_map[self.__submitted_region]['index'],
+                            self.chrom_vocabulary, self.gene_vocabulary)
+
+    def intern_chroms(self, lines: list):
+        """
+        Intern the chromosome of every line through chrom_vocabulary
+        :param lines: lines themselves
+        """
+        intern = self.chrom_vocabulary.intern
+        for line in lines:
+            line[0] = intern(line[0])
+
+    def expand_columns(self, workers: int = None, columns: list = None) -> list:
+        """
+        Expand region id and attributes columns of every data line
+        :param workers: if greater than 1, the file is read again and expanded in this many processes (see
+        parallel.expand_file). Lines are still rebuilt in this process, so this is slower below about 4 CPUs and less
+        than 2 times faster with any number of them; with a cache, the workers' tables are stored as they are
+        :param columns: if given, lines hold only these columns (in this order) and only they are expanded, such as
+        ['chrom', 'chrom_start', 'chrom_end', 'pools'] (workers are ignored then)
+        :return: expanded lines, sorted by chrom, chrom_start and chrom_end
+        """
+        if columns is not None:
+            return self.lazy_expand_columns().project(columns)
+        if self.cache is None:
+            return self.expand_lines(workers)
+
+        if self.__expanded_table is None:
+            self.__expanded_table = self.cache.get_expanded(self.filename, *self.get_cache_options())
+        if self.__expanded_table is not None:
+            return self.__expanded_table.to_lines(self.chrom_vocabulary, self.gene_vocabulary)
+        if self.uses_workers(workers) and not self.get_expander().is_identity():
+            # the workers' tables are kept as they are when they're in order, instead of building one from the lines
+            expanded, table = expand_file_table(self.filename, self.get_expander(), self.split_line, self.sort_key,
+                                                self.strip_chr, workers, self.columns)
+            if table is None:
+                table = self.get_expanded_table(expanded)
+        else:
+            expanded = self.expand_lines(workers)
+            table = self.get_expanded_table(expanded)
+        if table is not None and self.cache.put_expanded(self.filename, table, *self.get_cache_options()):
+            self.__expanded_table = table
+        return expanded
+
+    def get_expanded_table(self, expanded: list) -> Union[ColumnarTable, None]:
+        """
+        Keep expanded lines as an untyped ColumnarTable, so they can be cached and rebuilt without parsing them
+        :param expanded: lines returned by expand_lines()
+        :return: the table, or None if there's nothing to keep (lines aren't expanded) or lines don't have a value
+        for each column
+        """
+        if self.get_expander().is_identity() or any(len(line) != len(self.columns) for line in expanded):
             return None
+        table = ColumnarTable(self.columns, self.file_type, typed=False)
+        table.extend(expanded)
+        return table
 
-        for key in self.__column_map.keys():
-            if self.__column_map[key]['search'] is not None:
-                number_chars = len(flatten(self.header_lines))
-                for i, line in enumerate(self.bed_lines):
-                    number_chars += len(flatten(line))
-                    if number_chars >= self.__column_map[key]['search'].start():
-                        for j, column in enumerate(line):  # type: str
-                            if re.search(self.__column_map[key]['pattern'], column) is not None:
-                                self.__column_map[key]['index'] = j
-                        break
+    def expand_lines(self, workers: int = None) -> list:
+        """
+        Expand every data line (see expand_columns), without looking them up in the cache
+        :param workers: if greater than 1, the file is read again and expanded in this many processes
+        :return: expanded lines, sorted by chrom, chrom_start and chrom_end
+        """
+        expander = self.get_expander()
+        if self.uses_workers(workers):
+            return expand_file(self.filename, expander, self.split_line, self.sort_key, self.strip_chr, workers,
+                               self.columns)
+        if expander.is_identity():
+            return [list(line) for line in self.sorted_lines(self.bed_lines)]
+        with paused_gc():
+            return self.sorted_lines([expander.expand(line) for line in self.bed_lines])
+
+    def uses_workers(self, workers: int = None) -> bool:
+        """
+        :return: whether lines are expanded in a pool of workers processes, which read the file again (so it can't be
+        restricted to a region or compressed)
+        """
+        return workers is not None and workers > 1 and self.region is None and not is_gzip(self.filename)
 
-        return self.__column_map
+    def get_column_index(self, name: str) -> int:
+        if name not in self.columns:
+            raise ValueError('Unknown column \'{}\' for {}'.format(name, self.file_type))
+        return self.columns.index(name)
+
+    def lazy_expand_columns(self) -> LazyExpandedLines:
+        """
+        Expanded lines that are decoded only when they're accessed, by row or by column (see LazyExpandedLines)
+        :return: lazily expanded lines, sorted the same way as expand_columns()
+        """
+        return LazyExpandedLines(self.sorted_lines(self.bed_lines), self.columns, self.get_expander())
+
+    def get_design_index(self) -> DesignIndex:
+        """
+        Get the gene, pool and region id inverted indexes of this file. They're built once, on first use, over the
+        expanded lines, which are then kept by the loader (row ids are positions in expand_columns())
+        :return: the index
+        """
+        if self.__design_index is None:
+            self.__design_index = DesignIndex(self.expand_columns(), self.columns)
+        return self.__design_index
+
+    def get_rows_by_gene(self, gene: str) -> list:
+        """
+        :return: expanded lines of amplicons targeting gene
+        """
+        index = self.get_design_index()
+        return [list(index.lines[i]) for i in index.gene_row_ids(gene)]
+
+    def get_rows_by_pool(self, pool: int) -> list:
+        """
+        :return: expanded lines of amplicons in pool
+        """
+        index = self.get_design_index()
+        return [list(index.lines[i]) for i in index.pool_row_ids(pool)]
+
+    def get_row_by_region_id(self, region_id: str) -> Union[list, None]:
+        """
+        :return: expanded line of region_id or None if it isn't described in the file
+        """
+        index = self.get_design_index()
+        row_id = index.region_id_row_id(region_id)
+        return list(index.lines[row_id]) if row_id != -1 else None
+
+    def iter_expanded(self) -> Iterator[list]:
+        """
+        Expand lines one at a time, sorted the same way as expand_columns()
+        :return: iterator over expanded lines
+        """
+        expander = self.get_expander()
+        for line in self.sorted_lines(self.bed_lines):
+            yield list(line) if expander.is_identity() else expander.expand(line)
+
+    def to_columnar(self) -> ColumnarTable:
+        """
+        Expand lines into a ColumnarTable, sorted the same way as expand_columns(). Lines are expanded one at a
+        time, so the list of expanded lines is never built
+        :return: the table
+        """
+        table = ColumnarTable(self.columns, self.file_type, self.chrom_vocabulary, self.gene_vocabulary)
+        table.extend(self.iter_expanded())
+        return table
+
+    def iter_batches(self, batch_size: int = 65536) -> Iterator[ColumnarTable]:
+        """
+        Expand lines into ColumnarTables of at most batch_size rows, sharing the loader's vocabularies
+        :param batch_size: maximum number of rows of a batch
+        :return: iterator over batches
+        """
+        table = None
+        for line in self.iter_expanded():
+            if table is None:
+                table = ColumnarTable(self.columns, self.file_type, self.chrom_vocabulary, self.gene_vocabulary)
+            table.append(line)
+            if len(table) == batch_size:
+                yield table
+                table = None
+        if table is not None:
+            yield table
+
+    def to_arrow(self, batch_size: int = 65536):
+        """
+        Expand lines into a pyarrow Table (requires pyarrow), built from record batches of at most batch_size rows
+        (see ColumnarTable.to_arrow)
+        :param batch_size: maximum number of rows of a batch
+        :return: the table
+        """
+        pa = import_optional('pyarrow')
+        batches = [batch.to_arrow() for batch in self.iter_batches(batch_size)]
+        if not batches:
+            return pa.Table.from_batches([], schema=pa.schema([]))
+        return pa.Table.from_batches(batches)
+
+    def to_pandas(self):
+        """
+        Expand lines into a pandas DataFrame (requires pandas), with loader.columns as its columns (see
+        ColumnarTable.to_pandas)
+        :return: the data frame
+        """
+        return self.to_columnar().to_pandas()
 
-    def expand_columns(self) -> list:
-        region_id_index = self.__column_map[self.__region_id]['index']
-        attributes_index = self.__column_map[self.__attributes]['index']
-        submitted_region_index = self.__column_map[self.__submitted_region]['index']
-        if region_id_index == -1 and attributes_index == -1:
-            return self.sort_chroms(self.bed_lines)
-
-        gene_id_mapper = GeneIdMapper()
-        pool_mapper = PoolMapper()
-        region_id_mapper = RegionIdMapper()
-        submitted_region_mapper = SubmittedRegionMapper()
-        expanded = []
-        for i, line in enumerate(self.bed_lines):  # type: list
-            if region_id_index != -1:
-                expanded_region_column = [region_id_mapper.to_entity_list(line[region_id_index])]
-                line = line[0:region_id_index] + expanded_region_column + line[region_id_index + 1:]
-            if attributes_index != -1:
-                attr_columns = []
-                column = line[attributes_index]
-                attr_columns.extend([gene_id_mapper.to_entity_list(column),
-                                     pool_mapper.to_entity_list(column)])
-                if submitted_region_index != -1:
-                    attr_columns.extend([submitted_region_mapper.to_entity_list(column)])
-                line = line[0:attributes_index] + attr_columns + line[attributes_index + 1:]
-            expanded.append(line)
-        return self.sort_chroms(expanded)
+    def get_record_type(self) -> type:
+        """
+        :return: the compact record class (see bedhandler.domain.record_type) of this file type
+        """
+        return record_type(self.file_type, self.columns, self.get_expanded_columns())
+
+    def get_expanded_columns(self) -> list:
+        """
+        :return: columns that expanded lines hold as entity lists (see LineExpander)
+        """
+        expanded_columns = []
+        if self.__column_map[self.__region_id]['index'] != -1:
+            expanded_columns.append('region_id')
+        if self.__column_map[self.__attributes]['index'] != -1:
+            expanded_columns += ['gene', 'pools']
+            if self.__column_map[self.__submitted_region]['index'] != -1:
+                expanded_columns.append('submitted_region')
+        return expanded_columns
+
+    def expand_records(self) -> list:
+        """
+        Expand lines into compact records, sorted the same way as expand_columns(). Lines are expanded one at a
+        time, so the list of expanded lines is never built
+        :return: list of records
+        """
+        record = self.get_record_type()
+        return [record.from_expanded(line) for line in self.iter_expanded()]
 
     @staticmethod
     def sortable_chromosome(chromosome: str) -> str:
@@ -209,13 +631,55 @@ class BedFileLoader:
         except ValueError:
             return chromosome
 
+    @staticmethod
+    def sort_key(line: list) -> tuple:
+        """
+        Sort key of a line: chromosome (sortable), chrom_start and chrom_end
+        :param line: line itself
+        :return: the key
+        """
+        return BedFileLoader.sortable_chromosome(line[0].strip('chr')), int(line[1]), int(line[2])
+
+    @staticmethod
+    def check_sorted(lines: list) -> bool:
+        """
+        Check, in a single pass, whether lines are already sorted by sort_key. The sortable chromosome is only
+        computed when the chromosome changes; otherwise, only chrom_start and chrom_end are compared
+        :param lines: lines themselves
+        :return: True if lines are sorted
+        """
+        previous_chrom = previous_key = previous_position = None
+        for line in lines:
+            position = int(line[1]), int(line[2])
+            if line[0] != previous_chrom:
+                previous_chrom = line[0]
+                key = BedFileLoader.sortable_chromosome(previous_chrom.strip('chr'))
+                if previous_key is not None and key < previous_key:
+                    return False
+                if key != previous_key:
+                    previous_key, previous_position = key, position
+                    continue
+            if position < previous_position:
+                return False
+            previous_position = position
+        return True
+
+    def sorted_lines(self, lines: list) -> list:
+        """
+        Sort lines of this file, skipping the sort when the file is known to be sorted (see is_sorted). Unlike
+        sort_chroms, lines aren't copied: the returned list holds the given line objects
+        :param lines: data lines of this file (or their expanded versions)
+        :return: sorted list
+        """
+        if self.is_sorted:
+            return list(lines)
+        return sorted(lines, key=self.sort_key)
+
     def sort_chroms(self, chrom_list: list) -> list:
         """
-        Sort chromosomes in a list
+        Sort chromosomes in a list. Lines are sorted by sort_key, without building decorated copies of them, and
+        the sorted list holds copies of the lines, so it can be changed without changing chrom_list
         :param chrom_list: list itself
         :return: sorted list
         """
-        to_sort = [[self.sortable_chromosome(chrom_sublist[0].strip('chr'))] + chrom_sublist for chrom_sublist in
-                   chrom_list]
-        to_sort.sort(key=lambda x: (x[0], int(x[2]), int(x[3])))
-        return [sublist[1:] for sublist in to_sort]
+        return [list(line) for line in sorted(chrom_list, key=self.sort_key)]
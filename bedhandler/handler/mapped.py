@@ -0,0 +1,131 @@
+import mmap
+import re
+from array import array
+from typing import Iterator, Union
+
+from .region import Region
+
+digits = b'0123456789'
+
+# byte-level versions of BedFileLoader's header prefixes and fallback data line pattern
+header_prefixes = (b'#', b'track', b'browser')
+data_line_pattern = re.compile(rb'[^\t\n]+\t\d+\t\d+(\t|\n|$)')
+
+
+def is_data_line(buffer: Union[bytes, mmap.mmap], start: int, end: int) -> bool:
+    """
+    Byte-level equivalent of BedFileLoader.is_data_line
+    :param buffer: file content
+    :param start: offset of the line
+    :param end: offset of the end of the line (excluding the newline)
+    """
+    if start >= end:
+        return False
+    if buffer[start] in digits:
+        return True
+    if buffer[start:start + 3] == b'chr' and ((start + 3 < end and buffer[start + 3] in digits) or
+                                              (start + 4 < end and buffer[start + 4] == 9)):  # 9 is '\t'
+        return True
+    if buffer[start:start + 7].startswith(header_prefixes):
+        return False
+    return data_line_pattern.match(buffer, start, end) is not None
+
+
+class MappedBedFile:
+    """
+    A memory-mapped (uncompressed) BED/TSV file, parsed as bytes. Line boundaries are found by scanning for
+    newlines, so repeated loads of the same file (even by different processes) are served from the page cache without
+    reading it into a str first. line(), fields() and column() decode only what they return.
+
+    split_lines(), which BedFileLoader uses with use_mmap, still decodes every field of every data line (only the
+    coordinates of lines outside a region are skipped): loaders keep data lines as lists of str and expanding them
+    needs all of their fields, so use_mmap saves reading the file into a single str, not decoding it.
+
+    :param str filename: path of the file
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        with open(filename, 'rb') as file:
+            try:
+                self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty files can't be mapped
+                self.buffer = b''
+        self.header_lines = []
+        self.starts = array('q')
+        self.ends = array('q')
+        for start, end in self.iter_line_bounds():
+            if is_data_line(self.buffer, start, end):
+                self.starts.append(start)
+                self.ends.append(end)
+            elif end > start:
+                self.header_lines.append(self.buffer[start:end].decode('utf-8'))
+
+    def iter_line_bounds(self) -> Iterator[tuple]:
+        """
+        :return: iterator over (start, end) offsets of every line, excluding newlines
+        """
+        buffer, start, size = self.buffer, 0, len(self.buffer)
+        while start < size:
+            end = buffer.find(b'\n', start)
+            if end == -1:
+                end = size
+            yield start, end
+            start = end + 1
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line(self, i: int) -> list:
+        """
+        :return: all the fields of the i-th data line
+        """
+        return self.buffer[self.starts[i]:self.ends[i]].decode('utf-8').split('\t')
+
+    def fields(self, i: int, indexes: list) -> list:
+        """
+        Decode only some fields of the i-th data line
+        :param i: data line index
+        :param indexes: field indexes
+        :return: the fields (None for missing ones)
+        """
+        fields = self.buffer[self.starts[i]:self.ends[i]].split(b'\t', max(indexes) + 1)
+        return [fields[j].decode('utf-8') if j < len(fields) else None for j in indexes]
+
+    def column(self, index: int) -> Iterator[str]:
+        """
+        :return: iterator over a single field of every data line
+        """
+        for i in range(len(self.starts)):
+            yield self.fields(i, [index])[0]
+
+    def split_lines(self, strip_chr: bool = False, region: Region = None) -> tuple:
+        """
+        Decode the file like BedFileLoader.split_lines. Every field of every data line is decoded; when a region is
+        given, only the coordinates of lines are decoded to check whether they overlap it, and the lines that do are
+        decoded in full
+        :param strip_chr: whether 'chr' must be removed from the first column
+        :param region: region to be read (the whole file if None)
+        :return: (header lines, data lines)
+        """
+        bed_lines = []
+        for i in range(len(self.starts)):
+            if region is not None:
+                chrom, start, end = self.fields(i, [0, 1, 2])
+                if not region.overlaps(chrom, int(start), int(end)):
+                    continue
+            bed_line = self.line(i)
+            if strip_chr:
+                bed_line[0] = bed_line[0].strip('chr')
+            bed_lines.append(bed_line)
+        return list(self.header_lines), bed_lines
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self) -> 'MappedBedFile':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,135 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Callable
+
+from .columnar import ColumnarTable, paused_gc
+from .expander import LineExpander
+
+
+def byte_ranges(filename: str, chunks: int) -> list:
+    """
+    Split a file into byte ranges that start and end at line boundaries
+    :param filename: path of the file
+    :param chunks: number of ranges wanted (fewer are returned for small files)
+    :return: list of (start, end) offsets
+    """
+    size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, 'rb') as file:
+        for i in range(1, chunks):
+            offset = max(size * i // chunks, boundaries[-1])
+            if offset > 0:
+                # move to the start of the next line, unless offset is already there
+                file.seek(offset - 1)
+                file.readline()
+            boundaries.append(min(file.tell(), size))
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def expand_range(filename: str, start: int, end: int, expander: LineExpander, split_line: Callable,
+                 sort_key: Callable, strip_chr: bool, columns: list) -> tuple:
+    """
+    Expand and sort the data lines in a byte range of a file. Lines are returned as an untyped ColumnarTable, whose
+    offset arrays and vocabulary codes are pickled back to the parent far faster than entity objects
+    :return: (table, or the lines themselves if they don't have a value for each column, sort key of the first line,
+    sort key of the last line), or None if there aren't data lines in the range
+    """
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        lines = file.read(end - start).decode('utf-8').split('\n')
+
+    with paused_gc():
+        expanded = []
+        for line in lines:
+            bed_line = split_line(line, strip_chr)
+            if bed_line is not None:
+                expanded.append(bed_line if expander.is_identity() else expander.expand(bed_line))
+        expanded.sort(key=sort_key)
+        if not expanded:
+            return None
+        keys = sort_key(expanded[0]), sort_key(expanded[-1])
+        if any(len(line) != len(columns) for line in expanded):
+            return (expanded,) + keys
+        table = ColumnarTable(columns, None, typed=False)
+        table.extend(expanded)
+        return (table,) + keys
+
+
+def expand_chunks(filename: str, expander: LineExpander, split_line: Callable, sort_key: Callable, strip_chr: bool,
+                  workers: int, columns: list) -> list:
+    """
+    Expand the data lines of a file in a pool of processes. The file is split into one newline-aligned byte range
+    per worker, and each range is expanded and sorted by a worker (see expand_range)
+    :return: results of expand_range for the ranges holding data lines, in file order
+    """
+    ranges = byte_ranges(filename, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(expand_range, filename, start, end, expander, split_line, sort_key, strip_chr,
+                                   columns) for start, end in ranges]
+        return [result for result in (future.result() for future in futures) if result is not None]
+
+
+def in_order(chunks: list) -> bool:
+    """
+    :return: whether every chunk returned by expand_range ends before (or where) the next one starts
+    """
+    return all(previous[2] <= following[1] for previous, following in zip(chunks, chunks[1:]))
+
+
+def merge_chunks(chunks: list, expander: LineExpander, sort_key: Callable) -> list:
+    """
+    Rebuild lines from the chunks returned by expand_range, one column at a time (see ColumnarTable.to_lines).
+    Chunks are concatenated when they're already in order (such as for sorted files) and merged otherwise, resulting
+    in the same order a stable sort over the whole file would produce
+    :return: sorted expanded lines
+    """
+    with paused_gc():
+        lines = [chunk.to_lines(expander.chrom_vocabulary, expander.gene_vocabulary)
+                 if isinstance(chunk, ColumnarTable) else [expander.intern(line) for line in chunk]
+                 for chunk, _, _ in chunks]
+        if in_order(chunks):
+            return list(chain.from_iterable(lines))
+        return list(heapq.merge(*lines, key=sort_key))
+
+
+def expand_file(filename: str, expander: LineExpander, split_line: Callable, sort_key: Callable, strip_chr: bool,
+                workers: int, columns: list) -> list:
+    """
+    Expand the data lines of a file in a pool of processes (see expand_chunks and merge_chunks).
+
+    Lines are rebuilt in the parent process, which takes about half the time of expanding them sequentially, and
+    workers do about twice the work of a sequential expansion (they also build and pickle their tables), so workers
+    only pay off from about 4 CPUs and no number of them makes this 2 times faster (see benchmarks/run.py)
+    :param filename: path of the file
+    :param expander: expander built for the file's column indexes (values are interned through its vocabularies)
+    :param split_line: function splitting a line into columns (None for non data lines)
+    :param sort_key: sort key of expanded lines
+    :param strip_chr: whether 'chr' must be removed from the first column
+    :param workers: number of processes
+    :param columns: column names of expanded lines
+    :return: sorted expanded lines
+    """
+    chunks = expand_chunks(filename, expander, split_line, sort_key, strip_chr, workers, columns)
+    return merge_chunks(chunks, expander, sort_key)
+
+
+def expand_file_table(filename: str, expander: LineExpander, split_line: Callable, sort_key: Callable,
+                      strip_chr: bool, workers: int, columns: list) -> tuple:
+    """
+    Expand the data lines of a file in a pool of processes (see expand_file), also keeping them as a single untyped
+    ColumnarTable (such as the one stored by the loader's cache). When the workers' tables are in order, they're
+    concatenated one column at a time (see ColumnarTable.extend_from) and lines are rebuilt from the result, so the
+    table isn't built again from the lines
+    :return: (sorted expanded lines, their table, or None if workers' chunks aren't in order or aren't tables)
+    """
+    chunks = expand_chunks(filename, expander, split_line, sort_key, strip_chr, workers, columns)
+    if not in_order(chunks) or not all(isinstance(chunk, ColumnarTable) for chunk, _, _ in chunks):
+        return merge_chunks(chunks, expander, sort_key), None
+    with paused_gc():
+        table = ColumnarTable(columns, None, typed=False)
+        for chunk, _, _ in chunks:
+            table.extend_from(chunk)
+        return table.to_lines(expander.chrom_vocabulary, expander.gene_vocabulary), table
@@ -0,0 +1,47 @@
+import re
+from typing import Union
+
+
+class Region:
+    """
+    A genomic region. Coordinates are zero-based and half-open (as in BED files); end is None for a whole chromosome.
+
+    :param str chrom: chromosome
+    :param int start: region start
+    :param int end: region end (exclusive)
+    """
+    __pattern = re.compile(r'^(?P<chrom>[^:\s]+)(:(?P<start>[\d,]+)(-(?P<end>[\d,]+))?)?$')
+
+    def __init__(self, chrom: str, start: int = 0, end: Union[int, None] = None):
+        self.chrom = chrom
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def parse(cls, region: str) -> 'Region':
+        """
+        Parse a region in the chr:start-end notation, where start and end are one-based and inclusive
+        (as in samtools and tabix). 'chr' and 'chr:pos' are also accepted
+        :param region: region itself
+        :return: the region
+        """
+        match = cls.__pattern.match(region.strip())
+        if match is None:
+            raise ValueError('Invalid region: \'{}\''.format(region))
+        start = match.group('start')
+        end = match.group('end')
+        if start is None:
+            return cls(match.group('chrom'))
+        start = int(start.replace(',', ''))
+        end = int(end.replace(',', '')) if end is not None else start
+        if start < 1 or end < start:
+            raise ValueError('Invalid region: \'{}\''.format(region))
+        return cls(match.group('chrom'), start - 1, end)
+
+    def overlaps(self, chrom: str, start: int, end: int) -> bool:
+        return chrom == self.chrom and end > self.start and (self.end is None or start < self.end)
+
+    def __repr__(self) -> str:
+        if self.end is None:
+            return self.chrom
+        return '{}:{}-{}'.format(self.chrom, self.start + 1, self.end)
@@ -0,0 +1,166 @@
+from typing import Iterable, Iterator, Union
+
+from ..domain import BaseMultList
+from .loader import BedFileLoader
+from .streaming import StreamingBedFileLoader
+
+
+def sorted_records(source: Union[BedFileLoader, Iterable[list]]) -> Iterator[list]:
+    """
+    Expanded lines of a source, sorted by BedFileLoader.sort_key
+    :param source: a loader (streaming loaders are sorted externally), or expanded lines that are already sorted
+    :return: iterator over the lines
+    """
+    if isinstance(source, StreamingBedFileLoader):
+        return source.iter_sorted_records()
+    if isinstance(source, BedFileLoader):
+        return iter(source.expand_columns())
+    return iter(source)
+
+
+def chrom_key(chrom: str) -> str:
+    return BedFileLoader.sortable_chromosome(chrom.strip('chr'))
+
+
+class Sweep:
+    """
+    Sweeps the (sorted) lines of b along the (sorted) lines of a: for each line of a, overlapping() gives the lines
+    of b it overlaps. Lines of b are read once and kept only while they may still overlap a later line of a.
+
+    :param Iterable b: sorted expanded lines
+    """
+
+    def __init__(self, b: Iterable[list]):
+        self.__b = iter(b)
+        self.__next = None
+        self.__chrom = None
+        self.__active = []
+        self.advance()
+
+    def advance(self):
+        line = next(self.__b, None)
+        self.__next = None if line is None else (BedFileLoader.sort_key(line), line)
+
+    def overlapping(self, chrom: str, start: int, end: int) -> list:
+        """
+        Lines of b overlapping [start, end) in chrom. Must be called with positions sorted by (chrom, start)
+        :return: list of (start, end, line), sorted by start
+        """
+        if chrom != self.__chrom:
+            self.__chrom = chrom
+            self.__active = []
+        while self.__next is not None and (self.__next[0][0] < chrom or
+                                           (self.__next[0][0] == chrom and self.__next[0][1] < end)):
+            key, line = self.__next
+            if key[0] == chrom:
+                self.__active.append((key[1], key[2], line))
+            self.advance()
+        self.__active = [interval for interval in self.__active if interval[1] > start]
+        return [interval for interval in self.__active if interval[0] < end]
+
+
+def intersect(a: Union[BedFileLoader, Iterable[list]], b: Union[BedFileLoader, Iterable[list]]) -> Iterator[list]:
+    """
+    Overlapping portions of the regions of a and b, in a single pass over both. Each portion carries the columns of
+    the line of a it comes from
+    :param a: a loader, or sorted expanded lines
+    :param b: a loader, or sorted expanded lines
+    :return: iterator over expanded lines, sorted
+    """
+    sweep = Sweep(sorted_records(b))
+    for line in sorted_records(a):
+        chrom, start, end = BedFileLoader.sort_key(line)
+        for b_start, b_end, _ in sweep.overlapping(chrom, start, end):
+            yield [line[0], str(max(start, b_start)), str(min(end, b_end))] + line[3:]
+
+
+def subtract(a: Union[BedFileLoader, Iterable[list]], b: Union[BedFileLoader, Iterable[list]]) -> Iterator[list]:
+    """
+    Portions of the regions of a not covered by any region of b, in a single pass over both. Each portion carries
+    the columns of the line of a it comes from
+    :param a: a loader, or sorted expanded lines
+    :param b: a loader, or sorted expanded lines
+    :return: iterator over expanded lines, sorted by chromosome (portions of a line may start before the next line)
+    """
+    sweep = Sweep(sorted_records(b))
+    for line in sorted_records(a):
+        chrom, start, end = BedFileLoader.sort_key(line)
+        position = start
+        for b_start, b_end, _ in sweep.overlapping(chrom, start, end):
+            if b_start > position:
+                yield [line[0], str(position), str(b_start)] + line[3:]
+            position = max(position, b_end)
+        if position < end:
+            yield [line[0], str(position), str(end)] + line[3:]
+
+
+def union(values: list) -> Union[BaseMultList, object]:
+    """
+    Union of the values of a column: distinct targets of multi-valued columns (such as genes or pools), in order of
+    appearance, or the first value of other columns
+    """
+    first = values[0]
+    if not isinstance(first, BaseMultList):
+        return first
+    seen = set()
+    merged = type(first)()
+    for value in values:
+        for entity in value:
+            if tuple(entity) not in seen:
+                seen.add(tuple(entity))
+                merged.append(entity)
+    return merged
+
+
+def merge_group(group: list, start: int, end: int) -> list:
+    columns = min(len(line) for line in group)
+    return [group[0][0], str(start), str(end)] + [union([line[i] for line in group]) for i in range(3, columns)]
+
+
+def merge(lines: Union[BedFileLoader, Iterable[list]], distance: int = 0) -> Iterator[list]:
+    """
+    Merge overlapping (or book-ended) regions, in a single pass. Multi-valued columns (such as gene and pools) of a
+    merged region are the union of the merged lines' ones; other columns are those of its first line
+    :param lines: a loader, or sorted expanded lines
+    :param distance: maximum distance between regions that are merged
+    :return: iterator over expanded lines, sorted
+    """
+    group, group_chrom, group_start, group_end = [], None, 0, 0
+    for line in sorted_records(lines):
+        chrom, start, end = BedFileLoader.sort_key(line)
+        if group and chrom == group_chrom and start <= group_end + distance:
+            group.append(line)
+            group_end = max(group_end, end)
+            continue
+        if group:
+            yield merge_group(group, group_start, group_end)
+        group, group_chrom, group_start, group_end = [line], chrom, start, end
+    if group:
+        yield merge_group(group, group_start, group_end)
+
+
+def complement(lines: Union[BedFileLoader, Iterable[list]], chrom_sizes: dict) -> Iterator[list]:
+    """
+    Regions of a genome not covered by any line, in a single pass
+    :param lines: a loader, or sorted expanded lines
+    :param chrom_sizes: chromosome -> size. Lines on other chromosomes are ignored
+    :return: iterator over [chrom, chrom_start, chrom_end] lines, sorted
+    """
+    chroms = sorted(chrom_sizes, key=chrom_key)
+    keys = [chrom_key(chrom) for chrom in chroms]
+    i, position = 0, 0
+    for line in sorted_records(lines):
+        key, start, end = BedFileLoader.sort_key(line)
+        while i < len(chroms) and keys[i] < key:
+            if position < chrom_sizes[chroms[i]]:
+                yield [chroms[i], str(position), str(chrom_sizes[chroms[i]])]
+            i, position = i + 1, 0
+        if i == len(chroms) or keys[i] != key:
+            continue
+        if start > position:
+            yield [chroms[i], str(position), str(min(start, chrom_sizes[chroms[i]]))]
+        position = min(max(position, end), chrom_sizes[chroms[i]])
+    for chrom in chroms[i:]:
+        if position < chrom_sizes[chrom]:
+            yield [chrom, str(position), str(chrom_sizes[chrom])]
+        position = 0
@@ -0,0 +1,154 @@
+import sys
+from itertools import chain
+from typing import Iterator, TextIO, Union
+
+from .external_sort import external_sort
+from .loader import BedFileLoader
+from .region import Region
+from .vocabulary import Vocabulary
+
+
+class StreamingBedFileLoader(BedFileLoader):
+    """
+    A BedFileLoader that doesn't keep the whole file in memory.
+
+    The file type and the column indexes are detected from a bounded prefix of the file (the header lines and the
+    first sample_size data lines). After that, iter_records() reads the file one line at a time and yields each data
+    line already expanded, so memory usage doesn't depend on the size of the file.
+
+    Records are yielded in the same order they're found in the file (expand_columns() is still available, but it
+    only covers the sampled prefix). is_sorted is only known for the sampled prefix until iter_records() has read the
+    whole file.
+
+    The file may also be a text stream (such as sys.stdin), which is read only once: the sampled prefix is kept and
+    iter_records() goes on from where sampling stopped, so it can be called a single time.
+
+    :param filename: the path of the file containing data, or a text file object
+    :param bool strip_chr: whether 'chr' must be removed from the first column
+    :param int sample_size: number of data lines used to detect the file type and column indexes
+    :param region: region (Region or chr:start-end string, one-based and inclusive) to be read
+    :param Vocabulary chrom_vocabulary: vocabulary of chromosomes, which may be shared by many loaders
+    :param Vocabulary gene_vocabulary: vocabulary of gene symbols, which may be shared by many loaders
+    """
+
+    def __init__(self, filename: Union[str, TextIO], strip_chr: bool = False, sample_size: int = 1000,
+                 region: Union[Region, str] = None, chrom_vocabulary: Vocabulary = None,
+                 gene_vocabulary: Vocabulary = None):
+        self.file = None if isinstance(filename, str) else filename
+        self.filename = filename if self.file is None else getattr(self.file, 'name', '<stream>')
+        self.strip_chr = strip_chr
+        self.chrom_vocabulary = chrom_vocabulary if chrom_vocabulary is not None else Vocabulary()
+        self.gene_vocabulary = gene_vocabulary if gene_vocabulary is not None else Vocabulary()
+        self.sample_size = sample_size
+        self.cache = None
+        self.region = Region.parse(region) if isinstance(region, str) else region
+
+        if self.file is not None:
+            self.__lines = self.filter_lines(self.file, self.region)
+            self.__prefix = self.read_prefix(self.__lines)
+            self.load(''.join(self.__prefix))
+            return
+
+        self.check_not_columnar(filename)
+        try:
+            lines = self.iter_lines(self.region)
+            try:
+                self.load(''.join(self.read_prefix(lines)))
+            finally:
+                lines.close()
+        except FileNotFoundError:
+            print('Couldn\'t open \'{}\'. File not found!'.format(filename), file=sys.stderr)
+            sys.exit(1)
+
+    def iter_lines(self, region: Region = None) -> Iterator[str]:
+        """
+        Read lines of the file (see BedFileLoader.iter_lines). Streams are read only once: the sampled prefix and
+        then the rest of the stream, filtered by the loader's region
+        :param region: region to be read (the whole file if None)
+        :return: iterator over lines
+        """
+        if self.file is None:
+            return super().iter_lines(region)
+        if self.__lines is None:
+            raise ValueError('\'{}\' can only be read once'.format(self.filename))
+        lines, self.__lines = chain(self.__prefix, self.__lines), None
+        self.__prefix = []
+        return lines
+
+    def read_prefix(self, lines: Iterator[str]) -> list:
+        """
+        Read lines until sample_size data lines are found
+        :param lines: lines of the file
+        :return: the lines read
+        """
+        prefix = []
+        data_lines = 0
+        for line in lines:
+            prefix.append(line)
+            if self.split_line(line, self.strip_chr) is not None:
+                data_lines += 1
+                if data_lines >= self.sample_size:
+                    break
+        return prefix
+
+    def iter_data_lines(self) -> Iterator[tuple]:
+        """
+        Read the file line by line, yielding each data line both as it's found in the file (without its newline, and
+        with 'chr' removed from the first column when strip_chr is True) and split into columns
+        :return: an iterator over (line, data line split into columns)
+        """
+        previous = None
+        is_sorted = True
+        for line in self.iter_lines(self.region):
+            bed_line = self.split_line(line, self.strip_chr)
+            if bed_line is None:
+                continue
+            bed_line[0] = self.chrom_vocabulary.intern(bed_line[0])
+            if is_sorted:
+                key = self.sort_key(bed_line)
+                is_sorted = previous is None or key >= previous
+                previous = key
+            line = line.rstrip('\n')
+            yield line if not self.strip_chr else bed_line[0] + line[line.find('\t'):], bed_line
+        self.is_sorted = is_sorted
+
+    def iter_records(self) -> Iterator[list]:
+        """
+        Read the file line by line, yielding each data line expanded
+        :return: an iterator over expanded lines
+        """
+        expander = self.get_expander()
+        for _, bed_line in self.iter_data_lines():
+            yield bed_line if expander.is_identity() else expander.expand(bed_line)
+
+    def iter_expanded(self) -> Iterator[list]:
+        """
+        Expand lines one at a time, in file order (see iter_records), so batches and tables are built in a single
+        pass over the file
+        :return: iterator over expanded lines
+        """
+        return self.iter_records()
+
+    def iter_sorted_records(self, max_lines_in_memory: int = 1000000, tmp_dir: str = None) -> Iterator[list]:
+        """
+        Yield expanded lines sorted the same way as expand_columns(). Files with more than max_lines_in_memory data
+        lines are sorted externally: sorted runs are spilled to temporary files and merged (see external_sort)
+        :param max_lines_in_memory: maximum number of lines kept in memory
+        :param tmp_dir: directory of temporary files
+        :return: an iterator over sorted expanded lines
+        """
+        return external_sort(self.iter_records(), self.sort_key, max_lines_in_memory, tmp_dir)
+
+    def iter_sorted_data_lines(self, max_lines_in_memory: int = 1000000, tmp_dir: str = None) -> Iterator[str]:
+        """
+        Yield data lines as they're found in the file (see iter_data_lines), sorted the same way as expand_columns().
+        Lines aren't expanded, and they're sorted externally like in iter_sorted_records
+        :param max_lines_in_memory: maximum number of lines kept in memory while sorting
+        :param tmp_dir: directory of temporary files
+        :return: an iterator over sorted lines
+        """
+        return external_sort((line for line, _ in self.iter_data_lines()),
+                             lambda line: self.sort_key(line.split('\t', 3)), max_lines_in_memory, tmp_dir)
+
+    def __iter__(self) -> Iterator[list]:
+        return self.iter_records()
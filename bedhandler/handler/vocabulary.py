@@ -0,0 +1,61 @@
+import threading
+
+
+class Vocabulary:
+    """
+    A dictionary encoding of strings (such as chromosomes or gene symbols): each distinct value gets an integer
+    code, in order of appearance, and a single canonical str object. Interning values through a vocabulary makes
+    repeated values share memory, and comparing or grouping by codes is an integer operation.
+
+    A vocabulary may be shared by many loaders, even when they're loading concurrently.
+
+    :param values: initial values
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self.__codes = {}
+        self.__lock = threading.Lock()
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        """
+        :return: the code of value, adding it to the vocabulary if needed
+        """
+        code = self.__codes.get(value)
+        if code is None:
+            with self.__lock:
+                code = self.__codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self.__codes[value] = code
+        return code
+
+    def intern(self, value: str) -> str:
+        """
+        :return: the canonical object equal to value
+        """
+        return self.values[self.code(value)]
+
+    def get_code(self, value: str, default: int = -1) -> int:
+        """
+        :return: the code of value, or default if it isn't in the vocabulary
+        """
+        return self.__codes.get(value, default)
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.__codes
+
+    def __getstate__(self) -> dict:
+        return {'values': self.values}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state['values'])
@@ -0,0 +1,117 @@
+import gzip
+from typing import Iterable, TextIO, Union
+
+from ..domain.record import BedRecord
+from ..mapper import GeneIdMapper
+from ..mapper import PoolMapper
+from ..mapper import SubmittedRegionMapper
+from .bgzf import BgzfWriter
+
+
+class BedFileWriter:
+    """
+    Buffered writer of expanded lines (or compact records) back to the layout of the file they were loaded from:
+    header lines first, then one tab separated line per record, where the gene, pools and submitted_region columns
+    are collapsed into a single attributes column (GENE_ID=...;SUBMITTED_REGION=...;Pool=...). Attributes other than
+    these ones (such as PURPOSE=CDS) aren't kept by expanding, so they aren't written back.
+
+    Lines are joined and written every buffer_size records, so the output is never built in memory as a whole.
+
+    :param file: path of the output file, a text file object (which isn't closed by the writer), or None to only
+    serialize records (see to_fields)
+    :param list columns: column names of the records (such as BedFileLoader.columns)
+    :param list header_lines: lines written before the records
+    :param str compression: None, 'gzip' or 'bgzf' (ignored when file is a file object)
+    :param int buffer_size: number of lines kept before writing them
+    """
+    __attribute_mappers = {'gene': GeneIdMapper(), 'submitted_region': SubmittedRegionMapper(), 'pools': PoolMapper()}
+    __compressions = [None, 'gzip', 'bgzf']
+
+    def __init__(self, file: Union[str, TextIO], columns: list, header_lines: list = (), compression: str = None,
+                 buffer_size: int = 10000):
+        if compression not in self.__compressions:
+            raise ValueError('Unknown compression \'{}\''.format(compression))
+        self.columns = columns
+        self.buffer_size = buffer_size
+        self.count = 0
+        self.__buffer = []
+        self.__owns_file = isinstance(file, str)
+        if not self.__owns_file:
+            self.file = file
+        elif compression == 'gzip':
+            self.file = gzip.open(file, 'wt')
+        elif compression == 'bgzf':
+            self.file = BgzfWriter(file)
+        else:
+            self.file = open(file, 'w')
+
+        attribute_columns = [name for name in self.__attribute_mappers if name in columns]
+        self.attribute_indexes = [(columns.index(name), self.__attribute_mappers[name]) for name in attribute_columns]
+        self.attributes_index = min(index for index, _ in self.attribute_indexes) if attribute_columns else -1
+        for line in header_lines:
+            self.__buffer.append(line + '\n')
+
+    @classmethod
+    def from_loader(cls, file: Union[str, TextIO], loader, **kwargs) -> 'BedFileWriter':
+        """
+        :param file: path of the output file, or a text file object
+        :param loader: loader whose columns and header lines are used
+        :return: the writer
+        """
+        return cls(file, loader.columns, loader.header_lines, **kwargs)
+
+    def to_fields(self, record: Union[list, BedRecord]) -> list:
+        """
+        Serialize a record
+        :param record: expanded line or compact record
+        :return: fields of the line (as str)
+        """
+        if isinstance(record, BedRecord):
+            record = record.to_expanded()
+        if self.attributes_index == -1:
+            return [str(value) for value in record]
+
+        skipped = {index for index, _ in self.attribute_indexes}
+        fields = []
+        for i, value in enumerate(record):
+            if i == self.attributes_index:
+                fields.append(';'.join(attribute for attribute in (mapper.to_string(record[index]) for index, mapper
+                                                                   in self.attribute_indexes if index < len(record))
+                                       if attribute != ''))
+            elif i not in skipped:
+                fields.append(str(value))
+        return fields
+
+    def write(self, record: Union[list, BedRecord]):
+        self.__buffer.append('\t'.join(self.to_fields(record)) + '\n')
+        self.count += 1
+        if len(self.__buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, records: Iterable[Union[list, BedRecord]]) -> int:
+        """
+        Write many records
+        :param records: expanded lines or compact records
+        :return: number of records written so far
+        """
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def flush(self):
+        if self.__buffer:
+            self.file.write(''.join(self.__buffer))
+            self.__buffer.clear()
+
+    def close(self):
+        self.flush()
+        if self.__owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self) -> 'BedFileWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
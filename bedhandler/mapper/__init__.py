@@ -3,3 +3,4 @@ from .geneidmapper import GeneIdMapper
 from .poolmapper import PoolMapper
 from .regionidmapper import RegionIdMapper
 from .submitted_region_mapper import SubmittedRegionMapper
+from .attributemapper import AttributeMapper
@@ -0,0 +1,40 @@
+from ..domain import GeneId, GeneIdList
+from ..domain import Pool, Pools
+from ..domain import SubmittedRegion, SubmittedRegionList
+from ..mapper import BaseMapper
+from ..mapper import GeneIdMapper
+from ..mapper import PoolMapper
+from ..mapper import SubmittedRegionMapper
+
+
+class AttributeMapper(BaseMapper):
+    """
+    Maps an attributes column (GENE_ID=...;SUBMITTED_REGION=...;Pool=...) to all of its entities at once.
+
+    The column is split into fields a single time and each field is parsed only once, giving the same entities as
+    GeneIdMapper, PoolMapper and SubmittedRegionMapper would give when called one after the other.
+    """
+    pattern = ''
+    gene_id_pattern = GeneIdMapper.pattern
+    pool_pattern = PoolMapper.pattern
+    submitted_region_pattern = SubmittedRegionMapper.pattern
+
+    def to_entity_list(self, string: str) -> tuple:
+        """
+        Map an attributes column
+        :param string: column itself
+        :return: (GeneIdList, Pools, SubmittedRegionList)
+        """
+        fields = string.split(';')
+        # the gene is always described by the first field
+        genes = GeneIdList([GeneId(s.split(self.gene_id_pattern)[-1].split(',')) for s in fields[0].split('&')])
+        pools = Pools([])
+        submitted_regions = SubmittedRegionList([])
+        for field in fields:
+            if field.startswith(self.pool_pattern):
+                values = field[len(self.pool_pattern):].split('&')
+                pools = Pools([Pool([int(pool) for pool in s.split(',')]) for s in values])
+            elif field.startswith(self.submitted_region_pattern):
+                values = field[len(self.submitted_region_pattern):].split('&')
+                submitted_regions = SubmittedRegionList([SubmittedRegion(s.split(',')) for s in values])
+        return genes, pools, submitted_regions
@@ -0,0 +1,38 @@
+"""
+Compare the fused AttributeMapper against calling GeneIdMapper, PoolMapper and SubmittedRegionMapper one after the
+other on the same attributes column.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/attribute_mapper.py [number]
+"""
+import sys
+import timeit
+
+from bedhandler.mapper import AttributeMapper
+from bedhandler.mapper import GeneIdMapper
+from bedhandler.mapper import PoolMapper
+from bedhandler.mapper import SubmittedRegionMapper
+
+attributes = ['GENE_ID=OR4F5;Pool=1',
+              'GENE_ID=SAMD11&SAMD11&SAMD11;SUBMITTED_REGION=&&;Pool=11&12&1',
+              'GENE_ID=GENE1;Pool=2;PURPOSE=CDS;CNV_ID=GENE1;CNV_HS=2;TRIM_LEFT=10']
+
+
+def single_mappers(gene_id_mapper=GeneIdMapper(), pool_mapper=PoolMapper(),
+                   submitted_region_mapper=SubmittedRegionMapper()):
+    for string in attributes:
+        gene_id_mapper.to_entity_list(string)
+        pool_mapper.to_entity_list(string)
+        submitted_region_mapper.to_entity_list(string)
+
+
+def fused_mapper(attribute_mapper=AttributeMapper()):
+    for string in attributes:
+        attribute_mapper.to_entity_list(string)
+
+
+if __name__ == '__main__':
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    single = min(timeit.repeat(single_mappers, number=number, repeat=3))
+    fused = min(timeit.repeat(fused_mapper, number=number, repeat=3))
+    print('single mappers: {:.3f}s'.format(single))
+    print('fused mapper:   {:.3f}s ({:.2f}x)'.format(fused, single / fused))
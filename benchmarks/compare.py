@@ -0,0 +1,34 @@
+"""
+Compare two result files written by benchmarks/run.py, printing the ratio (new / old) of every measurement.
+
+Usage: python benchmarks/compare.py old.json new.json
+"""
+import argparse
+import json
+
+
+def measurements(filename: str) -> dict:
+    with open(filename) as file:
+        report = json.load(file)
+    values = {}
+    for result in report['results']:
+        for metric in ['seconds', 'peak_memory']:
+            for phase, value in result.get(metric, {}).items():
+                # results of older versions only have sorted files
+                values[(result['file_type'], result['lines'], result.get('order', 'sorted'), phase, metric)] = value
+    return values
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args()
+
+    old, new = measurements(args.old), measurements(args.new)
+    print('{:<18} {:>8} {:<13} {:<22} {:<12} {:>14} {:>14} {:>7}'.format('file_type', 'lines', 'order', 'phase',
+                                                                        'metric', 'old', 'new', 'ratio'))
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key] if old[key] else float('nan')
+        print('{:<18} {:>8} {:<13} {:<22} {:<12} {:>14.4g} {:>14.4g} {:>7.2f}'.format(*key, old[key], new[key],
+                                                                                      ratio))
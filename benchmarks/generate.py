@@ -0,0 +1,111 @@
+"""
+Synthetic generators for every file type supported by BedFileLoader.
+
+Usage (from the repository root): PYTHONPATH=. python benchmarks/generate.py file_type lines output
+                                                         [--order sorted|shuffled|lexicographic]
+"""
+import argparse
+import random
+
+chromosomes = ['chr{}'.format(c) for c in list(range(1, 23)) + ['X', 'Y']]
+genes = 20000
+
+# orders of lines: by coordinates, random, or by coordinates within chromosomes that are sorted as text (chr1, chr10,
+# chr11, ...), like the output of a plain sort -k1,1 -k2,2n
+orders = ['sorted', 'shuffled', 'lexicographic']
+
+
+def coordinates(lines: int, order: str = 'sorted', seed: int = 0):
+    """
+    Yield (chrom, start, end, n) for lines amplicons spread over all chromosomes, in the given order (see orders)
+    """
+    rng = random.Random(seed)
+    per_chromosome = max(lines // len(chromosomes), 1)
+    rows = []
+    n = 0
+    for chrom in chromosomes:
+        start = 10000
+        for _ in range(per_chromosome):
+            if n == lines:
+                break
+            start += rng.randint(50, 400)
+            rows.append((chrom, start, start + rng.randint(100, 300), n))
+            n += 1
+    while n < lines:
+        start += rng.randint(50, 400)
+        rows.append((chromosomes[-1], start, start + rng.randint(100, 300), n))
+        n += 1
+    if order == 'shuffled':
+        rng.shuffle(rows)
+    elif order == 'lexicographic':
+        rows.sort(key=lambda row: row[0])
+    elif order != 'sorted':
+        raise ValueError('Unknown order \'{}\''.format(order))
+    return rows
+
+
+def gene(n: int) -> str:
+    return 'GENE{}'.format(n * 7 % genes)
+
+
+def ampliseq_exome(lines: int, order: str = 'sorted'):
+    yield 'track name="AmpliSeqExome" description="synthetic" type=bedDetail ionVersion=4.0\n'
+    for chrom, start, end, n in coordinates(lines, order):
+        yield '{}\t{}\t{}\t{}_{}.1.{}\t0\t+\t.\tGENE_ID={};Pool={}\n'.format(
+            chrom, start, end, gene(n), n % 30, n, gene(n), n % 12 + 1)
+
+
+def ampliseq_panel(lines: int, order: str = 'sorted'):
+    yield 'track name="Panel" description="synthetic" type=bedDetail ionVersion=4.0\n'
+    for chrom, start, end, n in coordinates(lines, order):
+        yield '{}\t{}\t{}\t{}_{}.1.{}\t.\tGENE_ID={};Pool={};PURPOSE=CDS;CNV_ID={};CNV_HS=2\n'.format(
+            chrom, start, end, gene(n), n % 30, n, gene(n), n % 2 + 1, gene(n))
+
+
+def effective_regions(lines: int, order: str = 'sorted'):
+    yield 'track type=bedDetail ionVersion=4.0 name="effective_regions"\n'
+    for chrom, start, end, n in coordinates(lines, order):
+        if n % 10 == 0:
+            # merged targets
+            yield '{0}\t{1}\t{2}\t{3}_{5}.1.{6}&{4}_{5}.2.{6}\t0\t+\t.\tGENE_ID={3}&{4};SUBMITTED_REGION=&;' \
+                  'Pool={7}&{8},{9}\n'.format(chrom, start, end, gene(n), gene(n + 1), n % 30, n, n % 12 + 1,
+                                             (n + 1) % 12 + 1, (n + 2) % 12 + 1)
+        else:
+            yield '{}\t{}\t{}\t{}_{}.1.{}\t0\t+\t.\tGENE_ID={};SUBMITTED_REGION=;Pool={}\n'.format(
+                chrom, start, end, gene(n), n % 30, n, gene(n), n % 12 + 1)
+
+
+def amplicon_cov(lines: int, order: str = 'sorted'):
+    rng = random.Random(1)
+    yield 'contig_id\tcontig_srt\tcontig_end\tregion_id\tattributes\tgc_count\toverlaps\tfwd_e2e\trev_e2e\t' \
+          'total_reads\tfwd_reads\trev_reads\tcov20x\tcov100x\tcov500x\n'
+    for chrom, start, end, n in coordinates(lines, order):
+        fwd, rev = rng.randint(0, 2000), rng.randint(0, 2000)
+        yield '{}\t{}\t{}\t{}_{}.1.{}\tGENE_ID={};Pool={}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\n'.format(
+            chrom, start, end, gene(n), n % 30, n, gene(n), n % 12 + 1, rng.randint(40, 150), fwd + rev,
+            fwd // 2, rev // 2, fwd + rev, fwd, rev, end - start, end - start, end - start)
+
+
+def general_tsv(lines: int, order: str = 'sorted'):
+    yield 'browser position chr1:1-1000\n'
+    for chrom, start, end, n in coordinates(lines, order):
+        yield '{}\t{}\t{}\n'.format(chrom, start, end)
+
+
+generators = {'ampliseq_exome': ampliseq_exome, 'ampliseq_panel': ampliseq_panel,
+              'effective_regions': effective_regions, 'amplicon_cov': amplicon_cov, 'general_tsv': general_tsv}
+
+
+def write(file_type: str, lines: int, filename: str, order: str = 'sorted'):
+    with open(filename, 'w') as file:
+        file.writelines(generators[file_type](lines, order))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic BED/TSV file')
+    parser.add_argument('file_type', choices=sorted(generators))
+    parser.add_argument('lines', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--order', choices=orders, default='sorted', help='order of lines (sorted by default)')
+    args = parser.parse_args()
+    write(args.file_type, args.lines, args.output, args.order)
@@ -0,0 +1,146 @@
+"""
+Benchmark BedFileLoader on synthetic files of every supported type.
+
+For each file type, size and order of lines (sorted, shuffled, or lexicographic: sorted by coordinates within
+chromosomes sorted as text), BedFileLoader.split_lines (over the lines of the file, already read), __init__ (with and
+without use_mmap), expand_columns (sequential and in a pool of processes, for each of --workers; on unsorted files,
+this includes sorting), sort_chroms over the data lines in file order and sort_chroms over the expanded lines (which
+are already sorted) are timed separately, and the peak memory of each phase is measured with tracemalloc in a second,
+separate run (so tracing doesn't affect timings; it only sees the parent process). The speedup of each number of
+workers over the sequential expand_columns is reported too, which shows when workers pay off on the machine (they
+can't on a single CPU). Results are written as JSON, so runs of different versions can be compared.
+
+Usage (from the repository root):
+    PYTHONPATH=. python benchmarks/run.py [--sizes 10000 100000 1000000] [--types ampliseq_exome ...]
+                                          [--orders sorted shuffled lexicographic] [--repeat 3] [--workers 2 4 8]
+                                          [--no-memory] [--output results.json]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from importlib import metadata
+
+from bedhandler.handler import BedFileLoader
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate  # noqa: E402
+
+
+def package_version() -> str:
+    try:
+        return metadata.version('bedhandler')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def workers_phase(workers: int):
+    return lambda result: (result[0], result[0].expand_columns(workers=workers))
+
+
+def phases(filename: str, workers: list) -> dict:
+    """
+    :return: a function for each benchmarked phase; each one gets the result of the previous phase
+    """
+    with open(filename) as file:
+        lines = file.read().split('\n')
+    functions = {'split_lines': lambda _: BedFileLoader.split_lines(lines, False),
+                 'init_mmap': lambda _: BedFileLoader(filename, use_mmap=True),
+                 'init': lambda _: BedFileLoader(filename),
+                 'expand_columns': lambda loader: (loader, loader.expand_columns())}
+    for count in workers:
+        functions['expand_columns_workers_{}'.format(count)] = workers_phase(count)
+    functions.update({'sort_chroms_file_order': lambda result: result + (result[0].sort_chroms(result[0].bed_lines),),
+                      'sort_chroms': lambda result: result[0].sort_chroms(result[1])})
+    return functions
+
+
+def time_phases(filename: str, repeat: int, workers: list) -> dict:
+    best = {}
+    for _ in range(repeat):
+        result = None
+        for name, phase in phases(filename, workers).items():
+            gc.collect()
+            start = time.perf_counter()
+            result = phase(result)
+            elapsed = time.perf_counter() - start
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return best
+
+
+def peak_memory(filename: str, workers: list) -> dict:
+    peaks = {}
+    result = None
+    for name, phase in phases(filename, workers).items():
+        gc.collect()
+        tracemalloc.start()
+        result = phase(result)
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peaks
+
+
+def run(file_types: list, sizes: list, orders: list, repeat: int, workers: list, memory: bool, data_dir: str) -> list:
+    results = []
+    for file_type in file_types:
+        for size in sizes:
+            for order in orders:
+                filename = os.path.join(data_dir, '{}.{}.{}.bed'.format(file_type, size, order))
+                if not os.path.exists(filename):
+                    generate.write(file_type, size, filename, order)
+                result = {'file_type': file_type, 'lines': size, 'order': order,
+                          'file_size': os.path.getsize(filename), 'workers': workers,
+                          'seconds': time_phases(filename, repeat, workers)}
+                seconds = result['seconds']
+                result['speedup'] = {count: seconds['expand_columns'] / seconds['expand_columns_workers_{}'.format(
+                    count)] for count in workers}
+                if memory:
+                    result['peak_memory'] = peak_memory(filename, workers)
+                results.append(result)
+                timings = ['{} {:.3f}s'.format(name, seconds) for name, seconds in result['seconds'].items()]
+                speedups = ['speedup with {} workers {:.2f}x'.format(count, speedup)
+                            for count, speedup in result['speedup'].items()]
+                print('{:<18} {:>8} lines, {:<13}: {}'.format(file_type, size, order, ', '.join(timings + speedups)),
+                      file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bedhandler loading, expansion and sorting')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--types', nargs='+', choices=sorted(generate.generators),
+                        default=list(generate.generators))
+    parser.add_argument('--orders', nargs='+', choices=generate.orders, default=generate.orders,
+                        help='orders of lines of the synthetic files (all of them by default)')
+    parser.add_argument('--repeat', type=int, default=3, help='best of this many runs is reported')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({2, max(os.cpu_count() or 1, 2)}),
+                        help='numbers of processes of expand_columns_workers_<n> (2 and the number of CPUs by default)')
+    parser.add_argument('--no-memory', action='store_true', help='skip peak memory measurements')
+    parser.add_argument('--data-dir', help='where synthetic files are kept (a temporary directory by default)')
+    parser.add_argument('--output', help='JSON results file (stdout by default)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        results = run(args.types, args.sizes, args.orders, args.repeat, args.workers, not args.no_memory, data_dir)
+    report = {'date': datetime.now(timezone.utc).isoformat(), 'version': package_version(),
+              'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+              'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -50,9 +50,11 @@ setup(
         # Specify the Python versions you support here. In particular, ensure
         # that you indicate whether you support Python 2, Python 3 or both.
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
     ],
     # What does your project relate to?
     keywords='file parsing',
@@ -75,10 +77,15 @@ setup(
     # dependencies). You can install these using the following syntax,
     # for example:
     # $ pip install -e .[dev,test]
-    # extras_require={
-    #    'dev': ['check-manifest'],
-    #    'test': ['coverage'],
-    # },
+    extras_require={
+        'arrow': ['pyarrow'],
+        'pandas': ['pandas'],
+    },
 
-    python_requires='>=3'
+    # console scripts installed with the package
+    entry_points={
+        'console_scripts': ['bedhandler=bedhandler.cli:main'],
+    },
+
+    python_requires='>=3.8'
 )
@@ -0,0 +1,76 @@
+import pytest
+
+from bedhandler.domain import BedRecord
+from bedhandler.domain import GeneId, GeneIdList
+from bedhandler.domain import Pool, Pools
+from bedhandler.domain import record_type
+
+columns = ['chrom', 'chrom_start', 'chrom_end', 'region_id', 'score', 'gene', 'pools']
+record_class = record_type('ampliseq_panel', columns)
+
+
+def test_record_type_is_cached():
+    assert record_type('ampliseq_panel', columns) is record_class
+    assert record_class.__name__ == 'AmpliseqPanelRecord'
+
+
+def test_record_has_no_instance_dict():
+    record = record_class.from_expanded(['chr1', '10', '20', 'R', '.', GeneIdList([GeneId(['A'])]),
+                                         Pools([Pool([1])])])
+    assert isinstance(record, BedRecord)
+    with pytest.raises(AttributeError):
+        record.__dict__
+
+
+def test_record_stores_coordinates_as_int():
+    record = record_class.from_expanded(['chr1', '10', '20', 'R', '.', GeneIdList([]), Pools([])])
+    assert record.chrom_start == 10
+    assert record.chrom_end == 20
+
+
+def test_record_stores_single_values_without_wrappers():
+    record = record_class.from_expanded(['chr1', '10', '20', 'R', '.', GeneIdList([GeneId(['A'])]),
+                                         Pools([Pool([2])])])
+    assert record.gene == 'A'
+    assert record.pools == 2
+
+
+def test_record_stores_multiple_values_as_tuples():
+    record = record_class.from_expanded(['chr1', '10', '20', 'R', '.', GeneIdList([GeneId(['A']), GeneId(['B'])]),
+                                         Pools([Pool([2]), Pool([3, 6])])])
+    assert record.gene == (('A',), ('B',))
+    assert record.pools == ((2,), (3, 6))
+
+
+def test_record_entity_rebuilds_domain_objects():
+    record = record_class.from_expanded(['chr1', '10', '20', 'R', '.', GeneIdList([GeneId(['A'])]),
+                                         Pools([Pool([2]), Pool([3, 6])])])
+    assert isinstance(record.entity('gene'), GeneIdList)
+    assert record.entity('gene').flattened() == ['A']
+    assert isinstance(record.entity('pools'), Pools)
+    assert str(record.entity('pools')) == '2&3,6'
+    assert record.entity('chrom') == 'chr1'
+
+
+def test_record_pads_missing_columns():
+    record = record_class.from_expanded(['chr1', '10', '20'])
+    assert record.gene is None
+    assert record.entity('gene') is None
+
+
+def test_record_keeps_columns_that_are_not_expanded():
+    panel_record = record_type('ampliseq_panel', columns, ['gene', 'pools'])
+    line = ['chr1', '10', '20', 'GENE1_1.1', '.', GeneIdList([GeneId(['A'])]), Pools([Pool([2])])]
+    record = panel_record.from_expanded(line)
+    assert record.entity('region_id') == 'GENE1_1.1'
+    assert record.to_expanded() == line
+    assert isinstance(record.to_expanded()[3], str)
+
+
+def test_record_keeps_positions_of_none_values():
+    line = ['chr1', '10', '20', None, '.', GeneIdList([GeneId(['A'])]), Pools([Pool([2])])]
+    assert record_class.from_expanded(line).to_expanded() == line
+
+
+def test_record_drops_missing_columns():
+    assert record_class.from_expanded(['chr1', '10', '20']).to_expanded() == ['chr1', '10', '20']
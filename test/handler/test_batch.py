@@ -0,0 +1,34 @@
+import os
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+from bedhandler.handler import load_many
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = {'ampliseq_panel.bed': 'ampliseq_panel', 'ampliseq_panel_v2.bed': 'ampliseq_panel',
+         'ampliseq_exome.bed': 'ampliseq_exome', 'general.bed': 'general_tsv',
+         'effective_regions.bed': 'effective_regions', 'amplicon_cov.tsv': 'amplicon_cov'}
+
+
+def test_loaders_do_not_share_column_indexes():
+    exome = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed')
+    expanded = exome.expand_columns()
+    BedFileLoader(f'{mock_dir_path}/general.bed')
+    assert exome.expand_columns() == expanded
+    assert exome.get_map_with_column_indexes() is not BedFileLoader(
+        f'{mock_dir_path}/ampliseq_exome.bed').get_map_with_column_indexes()
+
+
+def test_load_many_detects_each_file_type():
+    filenames = [f'{mock_dir_path}/{mock}' for mock in mocks] * 20
+    loaders = load_many(filenames, max_workers=8)
+    assert [loader.filename for loader in loaders] == filenames
+    assert [loader.file_type for loader in loaders] == list(mocks.values()) * 20
+    for loader in loaders:
+        assert loader.expand_columns() == BedFileLoader(loader.filename).expand_columns()
+
+
+def test_load_many_gives_arguments_to_loaders():
+    loaders = load_many([f'{mock_dir_path}/general.bed'], loader_class=StreamingBedFileLoader, strip_chr=True)
+    assert isinstance(loaders[0], StreamingBedFileLoader)
+    assert next(loaders[0].iter_records())[0] == '7'
@@ -0,0 +1,136 @@
+import gzip
+import os
+import random
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+from bedhandler.handler.bgzf import BgzfIndex, BgzfReader, BgzfWriter, is_bgzf, is_gzip
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_panel.bed', 'ampliseq_exome.bed', 'general.bed', 'effective_regions.bed', 'amplicon_cov.tsv']
+
+
+def read_mock(mock):
+    with open(f'{mock_dir_path}/{mock}') as file:
+        return file.read()
+
+
+def write_bgzf(filename, content):
+    with BgzfWriter(filename) as writer:
+        writer.write(content)
+    return filename
+
+
+def write_gzip(filename, content):
+    with gzip.open(filename, 'wt') as file:
+        file.write(content)
+    return filename
+
+
+def sorted_bed(lines=20000):
+    random.seed(2)
+    content = ['track name="sorted"\n']
+    for chrom in ['chr1', 'chr2', 'chr3']:
+        start = 0
+        for _ in range(lines // 3):
+            start += random.randint(0, 300)
+            content.append(f'{chrom}\t{start}\t{start + random.randint(1, 2000)}\tGENE_{start}.1\t.\t'
+                           f'GENE_ID=GENE;Pool=1\n')
+    return ''.join(content)
+
+
+@pytest.mark.parametrize('mock', mocks)
+def test_loader_reads_gzip_files(tmp_path, mock):
+    filename = write_gzip(str(tmp_path / f'{mock}.gz'), read_mock(mock))
+    plain = BedFileLoader(f'{mock_dir_path}/{mock}')
+    compressed = BedFileLoader(filename)
+    assert is_gzip(filename) and not is_bgzf(filename)
+    assert compressed.file_type == plain.file_type
+    assert compressed.expand_columns() == plain.expand_columns()
+
+
+@pytest.mark.parametrize('mock', mocks)
+def test_loader_reads_bgzf_files(tmp_path, mock):
+    filename = write_bgzf(str(tmp_path / f'{mock}.gz'), read_mock(mock))
+    plain = BedFileLoader(f'{mock_dir_path}/{mock}')
+    compressed = BedFileLoader(filename)
+    assert is_bgzf(filename)
+    assert compressed.file_type == plain.file_type
+    assert compressed.expand_columns() == plain.expand_columns()
+
+
+def test_bgzf_reader_spans_blocks(tmp_path):
+    content = sorted_bed()
+    filename = write_bgzf(str(tmp_path / 'sorted.bed.gz'), content)
+    with gzip.open(filename, 'rt') as file:
+        assert file.read() == content
+    with BgzfReader(filename) as reader:
+        assert ''.join(reader) == content
+
+
+def test_bgzf_reader_seeks_to_virtual_offsets(tmp_path):
+    filename = write_bgzf(str(tmp_path / 'sorted.bed.gz'), sorted_bed())
+    offsets = []
+    with BgzfReader(filename) as reader:
+        while True:
+            offset = reader.tell()
+            line = reader.readline()
+            if not line:
+                break
+            offsets.append((offset, line))
+        for offset, line in offsets[::997]:
+            reader.seek(offset)
+            assert reader.readline() == line
+
+
+@pytest.mark.parametrize('region', ['chr2', 'chr2:150000-160000', 'chr1:1-1', 'chr3:999999999-1000000000',
+                                    'chrX'])
+def test_loader_region_matches_linear_filter(tmp_path, region):
+    content = sorted_bed()
+    filename = write_bgzf(str(tmp_path / 'sorted.bed.gz'), content)
+    plain = str(tmp_path / 'sorted.bed')
+    with open(plain, 'w') as file:
+        file.write(content)
+    indexed = BedFileLoader(filename, region=region)
+    filtered = BedFileLoader(plain, region=region)
+    assert indexed.bed_lines == filtered.bed_lines
+    assert indexed.header_lines == ['track name="sorted"']
+    assert os.path.exists(filename + BgzfIndex.suffix)
+
+
+def test_region_lines_overlap_region(tmp_path):
+    filename = write_bgzf(str(tmp_path / 'sorted.bed.gz'), sorted_bed())
+    bed_lines = BedFileLoader(filename, region='chr2:150001-160000').bed_lines
+    assert len(bed_lines) > 0
+    assert all(line[0] == 'chr2' and int(line[1]) < 160000 and int(line[2]) > 150000 for line in bed_lines)
+
+
+def test_streaming_loader_reads_bgzf_region(tmp_path):
+    filename = write_bgzf(str(tmp_path / 'sorted.bed.gz'), sorted_bed())
+    streaming = StreamingBedFileLoader(filename, region='chr3:100000-110000')
+    assert [line[:3] for line in streaming.iter_records()] == \
+           [line[:3] for line in BedFileLoader(filename, region='chr3:100000-110000').bed_lines]
+
+
+@pytest.mark.parametrize('content', ['chr1\t100\t200\tA_1.1\nchr2\t100\t200\tB_1.1\nchr1\t300\t400\tC_1.1\n',
+                                     'chr1\t300\t400\tA_1.1\nchr1\t100\t200\tB_1.1\n'])
+def test_index_rejects_unsorted_files(tmp_path, content):
+    filename = write_bgzf(str(tmp_path / 'unsorted.bed.gz'), content)
+    with pytest.raises(ValueError, match='isn\'t sorted'):
+        BgzfIndex.build(filename)
+    with pytest.raises(ValueError, match='isn\'t sorted'):
+        BgzfIndex.load(filename)
+    # the stored result is reused
+    with pytest.raises(ValueError, match='isn\'t sorted'):
+        BgzfIndex.load(filename)
+
+
+def test_loader_region_of_unsorted_bgzf_file(tmp_path):
+    content = 'chr1\t100\t200\tA_1.1\nchr2\t100\t200\tB_1.1\nchr1\t300\t400\tC_1.1\n'
+    filename = write_bgzf(str(tmp_path / 'unsorted.bed.gz'), content)
+    assert [line[:3] for line in BedFileLoader(filename, region='chr1').bed_lines] == \
+           [['chr1', '100', '200'], ['chr1', '300', '400']]
+    assert [line[:3] for line in StreamingBedFileLoader(filename, region='chr1').iter_records()] == \
+           [['chr1', '100', '200'], ['chr1', '300', '400']]
@@ -0,0 +1,121 @@
+import os
+import shutil
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import ParsedResultCache
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+def copy_mock(tmp_path, mock):
+    filename = str(tmp_path / mock)
+    shutil.copy(f'{mock_dir_path}/{mock}', filename)
+    return filename
+
+
+def test_cached_load_matches_uncached_load(tmp_path):
+    filename = copy_mock(tmp_path, 'effective_regions.bed')
+    cache_dir = str(tmp_path / 'cache')
+    first = BedFileLoader(filename, cache_dir=cache_dir)
+    second = BedFileLoader(filename, cache_dir=cache_dir)
+    plain = BedFileLoader(filename)
+    assert second.file_type == plain.file_type == 'effective_regions'
+    assert second.columns == plain.columns
+    assert second.header_lines == plain.header_lines
+    assert second.expand_columns() == first.expand_columns() == plain.expand_columns()
+    assert second.get_map_with_column_indexes()[second._BedFileLoader__submitted_region]['search'] is not None
+
+
+def test_cache_is_used_when_file_is_unchanged(tmp_path):
+    filename = copy_mock(tmp_path, 'ampliseq_exome.bed')
+    cache = ParsedResultCache(str(tmp_path / 'cache'))
+    BedFileLoader(filename, cache_dir=cache.cache_dir)
+    assert cache.get(filename, False) is not None
+    assert cache.get(filename, True) is None
+
+
+def test_cache_is_invalidated_when_file_changes(tmp_path):
+    filename = copy_mock(tmp_path, 'ampliseq_exome.bed')
+    cache = ParsedResultCache(str(tmp_path / 'cache'))
+    BedFileLoader(filename, cache_dir=cache.cache_dir)
+    with open(filename, 'a') as file:
+        file.write('chr2\t100\t200\tGENE4_1.1.1\t0\t+\t.\tGENE_ID=GENE4;Pool=1\n')
+    assert cache.get(filename, False) is None
+    assert len(BedFileLoader(filename, cache_dir=cache.cache_dir).expand_columns()) == 4
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    first = copy_mock(tmp_path, 'ampliseq_exome.bed')
+    second = copy_mock(tmp_path, 'effective_regions.bed')
+    cache = ParsedResultCache(str(tmp_path / 'cache'))
+    cache.put(first, {'state': 'x' * 1000})
+    entry_size = os.path.getsize(cache.entry_path(first))
+    cache.max_size = entry_size + 100
+    os.utime(cache.entry_path(first), ns=(0, 0))
+    cache.put(second, {'state': 'y' * 1000})
+    assert not os.path.exists(cache.entry_path(first))
+    assert cache.get(second) == {'state': 'y' * 1000}
+
+
+def test_cache_hit_parses_data_lines_on_first_access(tmp_path):
+    filename = copy_mock(tmp_path, 'ampliseq_exome.bed')
+    cache_dir = str(tmp_path / 'cache')
+    BedFileLoader(filename, cache_dir=cache_dir)
+    cached = BedFileLoader(filename, cache_dir=cache_dir)
+    assert cached._BedFileLoader__bed_lines is None
+    assert cached.file_type == 'ampliseq_exome'
+    assert cached.bed_lines == BedFileLoader(filename).bed_lines
+
+
+@pytest.mark.parametrize('mock', ['ampliseq_exome.bed', 'ampliseq_panel.bed', 'effective_regions.bed',
+                                  'ampliseq_panel_v2.bed', 'amplicon_cov.tsv', 'general.bed'])
+def test_expanded_lines_are_cached_on_first_expansion(tmp_path, mock):
+    filename = copy_mock(tmp_path, mock)
+    cache = ParsedResultCache(str(tmp_path / 'cache'))
+    first = BedFileLoader(filename, cache_dir=cache.cache_dir)
+    assert cache.get_expanded(filename, False) is None
+    expanded = first.expand_columns()
+    if mock != 'general.bed':
+        assert cache.get_expanded(filename, False) is not None
+
+    cached = BedFileLoader(filename, cache_dir=cache.cache_dir).expand_columns()
+    plain = BedFileLoader(filename).expand_columns()
+    assert cached == expanded == plain
+    assert [[type(value) for value in line] for line in cached] == [[type(value) for value in line] for line in plain]
+
+
+def test_cache_hashes_content_only_when_mtime_changes(tmp_path, monkeypatch):
+    filename = copy_mock(tmp_path, 'ampliseq_exome.bed')
+    cache = ParsedResultCache(str(tmp_path / 'cache'))
+    expanded = BedFileLoader(filename, cache_dir=cache.cache_dir).expand_columns()
+    hashed = []
+    content_hash = ParsedResultCache.content_hash
+    monkeypatch.setattr(ParsedResultCache, 'content_hash',
+                        staticmethod(lambda name: hashed.append(name) or content_hash(name)))
+    assert cache.get(filename, False) is not None
+    assert hashed == []
+    os.utime(filename, ns=(0, 0))
+    assert cache.get(filename, False) is not None
+    assert hashed == [filename]
+    assert cache.get(filename, False) is not None
+    assert hashed == [filename]
+    assert cache.get_expanded(filename, False).to_lines() == expanded
+
+
+def test_cache_verify_hash_detects_same_size_rewrite_with_same_mtime(tmp_path):
+    filename = copy_mock(tmp_path, 'ampliseq_exome.bed')
+    cache_dir = str(tmp_path / 'cache')
+    BedFileLoader(filename, cache_dir=cache_dir)
+    stat = os.stat(filename)
+    with open(filename) as file:
+        content = file.read()
+    with open(filename, 'w') as file:
+        file.write(content.replace('chr1\t', 'chr2\t'))
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert ParsedResultCache(cache_dir).get(filename, False) is not None
+    assert ParsedResultCache(cache_dir, verify_hash=True).get(filename, False) is None
+    loader = BedFileLoader(filename, cache_dir=cache_dir, cache_verify_hash=True)
+    assert loader.cache.verify_hash
+    assert {line[0] for line in loader.expand_columns()} == {line[0] for line in BedFileLoader(filename).bed_lines}
@@ -0,0 +1,127 @@
+import os
+from array import array
+
+import pytest
+
+from bedhandler.domain import GeneId, GeneIdList, Pool, Pools
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import CategoricalColumn
+from bedhandler.handler import ColumnarTable
+from bedhandler.handler import MultiValueColumn
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+def test_columnar_table_has_loader_columns():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed')
+    table = bed_file.to_columnar()
+    assert len(table) == len(bed_file.bed_lines)
+    assert all(column in table for column in bed_file.columns)
+
+
+def test_columnar_chrom_is_categorical():
+    table = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed').to_columnar()
+    assert isinstance(table['chrom'], CategoricalColumn)
+    assert table['chrom'].categories == ['chr1', 'chr2']
+    assert list(table['chrom'].codes) == [0, 0, 1, 1]
+
+
+def test_columnar_coordinates_are_int64_arrays():
+    table = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed').to_columnar()
+    assert table['chrom_start'] == array('q', [68920, 69210, 69380])
+    assert table['chrom_end'] == array('q', [69130, 69420, 69560])
+
+
+def test_columnar_amplicon_cov_metrics_are_numeric():
+    table = BedFileLoader(f'{mock_dir_path}/amplicon_cov.tsv').to_columnar()
+    assert table['total_reads'].typecode == 'q'
+    assert table['cov20x'].typecode == 'd'
+    assert list(table['total_reads']) == [200, 200]
+
+
+def test_columnar_multi_value_columns_match_expanded_columns():
+    bed_file = BedFileLoader(f'{mock_dir_path}/effective_regions.bed')
+    expanded = bed_file.expand_columns()
+    table = bed_file.to_columnar()
+    for name in ['region_id', 'gene', 'pools', 'submitted_region']:
+        column = table[name]
+        assert isinstance(column, MultiValueColumn)
+        index = bed_file.columns.index(name)
+        assert [column[i] for i in range(len(column))] == [line[index] for line in expanded]
+
+
+def test_multi_value_column_offsets():
+    column = MultiValueColumn(Pools, Pool, 'q')
+    column.append(Pools([[2], [3, 6]]))
+    column.append(Pools([[1]]))
+    assert list(column.row_offsets) == [0, 2, 3]
+    assert list(column.target_offsets) == [0, 1, 3, 4]
+    assert list(column.values) == [2, 3, 6, 1]
+
+
+def test_multi_value_column_rebuilds_domain_objects():
+    column = MultiValueColumn(GeneIdList, GeneId)
+    column.append(GeneIdList([['GENE1'], ['GENE2']]))
+    assert isinstance(column[0], GeneIdList)
+    assert str(column[0]) == 'GENE1&GENE2'
+
+
+def test_columnar_table_extend_matches_append():
+    bed_file = BedFileLoader(f'{mock_dir_path}/effective_regions.bed')
+    appended = ColumnarTable(bed_file.columns, bed_file.file_type)
+    for line in bed_file.expand_columns():
+        appended.append(line)
+    extended = ColumnarTable(bed_file.columns, bed_file.file_type)
+    extended.extend(bed_file.expand_columns(), chunk_size=2)
+    assert len(extended) == len(appended)
+    assert extended.to_lines() == appended.to_lines()
+    assert list(extended['gene'].row_offsets) == list(appended['gene'].row_offsets)
+
+
+def test_untyped_columnar_table_rebuilds_expanded_lines():
+    bed_file = BedFileLoader(f'{mock_dir_path}/amplicon_cov.tsv')
+    table = ColumnarTable(bed_file.columns, bed_file.file_type, typed=False)
+    table.extend(bed_file.expand_columns())
+    assert isinstance(table['cov20x'], list)
+    assert table.to_lines() == bed_file.expand_columns()
+
+
+def test_columnar_table_keeps_fields_past_columns(tmp_path):
+    bed6 = tmp_path / 'bed6.bed'
+    bed6.write_text('chr1\t100\t200\tnameA\t5\t+\nchr1\t300\t400\tnameB\t0\t-\n')
+    bed_file = BedFileLoader(str(bed6))
+    assert bed_file.file_type == 'general_tsv'
+    table = bed_file.to_columnar()
+    assert table.names == ['chrom', 'chrom_start', 'chrom_end', 'column_4', 'column_5', 'column_6']
+    assert table['column_6'] == ['+', '-']
+    assert bed_file.columns == ['chrom', 'chrom_start', 'chrom_end']
+    appended = ColumnarTable(bed_file.columns, bed_file.file_type, typed=False)
+    for line in bed_file.expand_columns():
+        appended.append(line)
+    assert appended.to_lines() == bed_file.expand_columns()
+
+
+def test_columnar_table_rejects_wider_lines_after_the_first_ones():
+    table = ColumnarTable(['chrom', 'chrom_start', 'chrom_end'], 'general_tsv')
+    table.append(['chr1', '100', '200'])
+    with pytest.raises(ValueError):
+        table.append(['chr1', '300', '400', 'nameB'])
+    with pytest.raises(ValueError):
+        table.extend([['chr1', '300', '400', 'nameB']])
+
+
+def test_columnar_table_extend_from_matches_extend():
+    bed_file = BedFileLoader(f'{mock_dir_path}/effective_regions.bed')
+    expanded = bed_file.expand_columns()
+    halves = [ColumnarTable(bed_file.columns, bed_file.file_type, typed=False) for _ in range(2)]
+    halves[0].extend(expanded[len(expanded) // 2:])
+    halves[1].extend(expanded[:len(expanded) // 2])
+    table = ColumnarTable(bed_file.columns, bed_file.file_type, typed=False)
+    table.extend_from(halves[1])
+    table.extend_from(halves[0])
+    assert len(table) == len(expanded)
+    assert table.to_lines() == expanded
+    narrower = ColumnarTable(['chrom', 'chrom_start', 'chrom_end'], 'general_tsv')
+    narrower.append(['chr1', '100', '200'])
+    with pytest.raises(ValueError):
+        table.extend_from(narrower)
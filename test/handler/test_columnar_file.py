@@ -0,0 +1,144 @@
+import os
+import sys
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import ColumnarFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+from bedhandler.handler import convert, write_columnar
+from bedhandler.handler.columnar_file import columnar_format, get_format, is_columnar_file
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_exome.bed', 'ampliseq_panel.bed', 'ampliseq_panel_v2.bed', 'effective_regions.bed',
+         'amplicon_cov.tsv', 'general.bed']
+
+
+def test_get_format():
+    assert get_format('design.parquet') == 'parquet'
+    assert get_format('design.FEATHER') == 'feather'
+    assert get_format('design.bed', 'feather') == 'feather'
+    with pytest.raises(ValueError):
+        get_format('design.bed')
+    assert not is_columnar_file(os.path.join(mock_dir_path, 'ampliseq_exome.bed'))
+    assert not is_columnar_file(os.path.join(mock_dir_path, 'missing.parquet'))
+
+
+def test_missing_pyarrow(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ImportError, match='pyarrow'):
+        convert(os.path.join(mock_dir_path, 'ampliseq_exome.bed'), str(tmp_path / 'design.parquet'))
+
+
+@pytest.mark.parametrize('filename', mocks)
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_round_trip(tmp_path, filename, extension):
+    pytest.importorskip('pyarrow')
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    output = str(tmp_path / '{}.{}'.format(filename, extension))
+    assert convert(loader.filename, output, batch_size=2) == len(loader.bed_lines)
+    assert columnar_format(output) == extension
+
+    columnar = ColumnarFileLoader(output)
+    assert columnar.is_sorted == loader.is_sorted
+    assert columnar.file_type == loader.file_type
+    assert columnar.header_lines == loader.header_lines
+    assert columnar.columns == loader.columns[:len(columnar.columns)]
+    assert columnar.expand_columns() == loader.expand_columns()
+    assert columnar.to_arrow().num_rows == len(loader.bed_lines)
+    assert [str(record) for record in columnar.expand_records()] == \
+        [str(record) for record in loader.expand_records()]
+    assert [record.to_expanded() for record in columnar.expand_records()] == loader.expand_columns()
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_round_trip_keeps_fields_past_columns(tmp_path, extension):
+    pytest.importorskip('pyarrow')
+    bed6 = tmp_path / 'bed6.bed'
+    bed6.write_text('chr1\t100\t200\tnameA\t5\t+\nchr1\t300\t400\tnameB\t0\t-\n')
+    output = str(tmp_path / 'bed6.{}'.format(extension))
+    assert convert(str(bed6), output, batch_size=1) == 2
+
+    columnar = ColumnarFileLoader(output)
+    assert columnar.file_type == 'general_tsv'
+    assert columnar.columns == ['chrom', 'chrom_start', 'chrom_end', 'column_4', 'column_5', 'column_6']
+    assert columnar.expand_columns() == [['chr1', '100', '200', 'nameA', '5', '+'],
+                                         ['chr1', '300', '400', 'nameB', '0', '-']]
+    assert columnar.bed_lines == BedFileLoader(str(bed6)).bed_lines
+
+
+def test_lines_with_varying_fields_past_columns(tmp_path):
+    pytest.importorskip('pyarrow')
+    ragged = tmp_path / 'ragged.bed'
+    ragged.write_text('chr1\t100\t200\nchr1\t300\t400\tnameB\n')
+    with pytest.raises(ValueError):
+        convert(str(ragged), str(tmp_path / 'ragged.parquet'), batch_size=1)
+
+
+def test_projection(tmp_path):
+    pytest.importorskip('pyarrow')
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'effective_regions.bed'))
+    output = str(tmp_path / 'design.feather')
+    write_columnar(loader, output)
+    columnar = ColumnarFileLoader(output, columns=['chrom', 'chrom_start', 'chrom_end', 'pools'])
+    assert columnar.columns == ['chrom', 'chrom_start', 'chrom_end', 'pools']
+    assert columnar.to_arrow().column_names == columnar.columns
+    assert columnar.expand_columns() == loader.expand_columns(columns=columnar.columns)
+    assert columnar.expand_columns(columns=['pools', 'chrom']) == loader.expand_columns(columns=['pools', 'chrom'])
+    with pytest.raises(ValueError):
+        columnar.lazy_expand_columns()
+    with pytest.raises(ValueError):
+        ColumnarFileLoader(output, columns=['chrom', 'cov20x'])
+
+
+@pytest.mark.parametrize('columns', [['chrom', 'chrom_start', 'chrom_end'], ['chrom_start', 'chrom', 'chrom_end']])
+def test_projection_of_leading_columns(tmp_path, columns):
+    pytest.importorskip('pyarrow')
+    output = str(tmp_path / 'design.parquet')
+    convert(os.path.join(mock_dir_path, 'ampliseq_exome.bed'), output)
+    columnar = ColumnarFileLoader(output, columns=columns)
+    assert columnar.projected
+    with pytest.raises(ValueError):
+        columnar.bed_lines
+    assert not ColumnarFileLoader(output).projected
+    assert not ColumnarFileLoader(output, columns=ColumnarFileLoader(output).columns).projected
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_text_loaders_reject_columnar_files(tmp_path, extension):
+    pytest.importorskip('pyarrow')
+    output = str(tmp_path / 'design.{}'.format(extension))
+    convert(os.path.join(mock_dir_path, 'ampliseq_exome.bed'), output)
+    for loader in [BedFileLoader, StreamingBedFileLoader]:
+        with pytest.raises(ValueError, match='ColumnarFileLoader'):
+            loader(output)
+
+
+def test_data_lines(tmp_path):
+    pytest.importorskip('pyarrow')
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'ampliseq_exome.bed'))
+    output = str(tmp_path / 'design.parquet')
+    write_columnar(loader, output)
+    columnar = ColumnarFileLoader(output)
+    assert columnar.bed_lines == loader.sorted_lines(loader.bed_lines)
+    assert list(columnar.lazy_expand_columns()) == loader.expand_columns()
+    assert columnar.get_rows_by_pool(1) == loader.get_rows_by_pool(1)
+    assert columnar.file_type == loader.file_type
+
+
+def test_streaming(tmp_path):
+    pytest.importorskip('pyarrow')
+    filename = os.path.join(mock_dir_path, 'mock_for_split.bed')
+    output = str(tmp_path / 'design.feather')
+    write_columnar(StreamingBedFileLoader(filename), output)
+    columnar = ColumnarFileLoader(output)
+    assert columnar.is_sorted is False
+    assert columnar.expand_columns() == BedFileLoader(filename).expand_columns()
+
+
+def test_not_written_by_bedhandler(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    output = str(tmp_path / 'other.parquet')
+    pytest.importorskip('pyarrow.parquet').write_table(pa.table({'a': [1]}), output)
+    with pytest.raises(ValueError):
+        ColumnarFileLoader(output)
@@ -0,0 +1,101 @@
+import os
+import random
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import CoverageAggregator
+from bedhandler.handler import coverage
+from bedhandler.handler.coverage import summarize
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+header = 'contig_id\tcontig_srt\tcontig_end\tregion_id\tattributes\tgc_count\toverlaps\tfwd_e2e\trev_e2e\t' \
+         'total_reads\tfwd_reads\trev_reads\tcov20x\tcov100x\tcov500x\n'
+
+
+def amplicon_cov(tmp_path, rows):
+    filename = tmp_path / 'amplicon.cov.tsv'
+    filename.write_text(header + ''.join('chr1\t{}\t{}\t{}\t{}\t50\t0\t0\t0\t{}\t0\t0\t1.0\t0.5\t0.0\n'.format(
+        i * 100, i * 100 + 50, region, attributes, reads) for i, (region, attributes, reads) in enumerate(rows)))
+    return str(filename)
+
+
+def test_summarize():
+    summary = summarize([10, 20, 30, 1])
+    assert summary.count == 4
+    assert summary.sum == 61
+    assert summary.mean == 15.25
+    assert summary.median == 15
+    assert summary.uniformity == 0.75
+
+
+def test_summarize_empty():
+    assert summarize([]).count == 0
+
+
+def test_aggregate_by_gene(tmp_path):
+    aggregator = CoverageAggregator.from_loader(BedFileLoader(amplicon_cov(tmp_path, [
+        ('A_1.1', 'GENE_ID=A;Pool=1', 100), ('A_1.2', 'GENE_ID=A;Pool=2', 300), ('B_1.1', 'GENE_ID=B;Pool=1', 50)])))
+    by_gene = aggregator.by_gene()
+    assert by_gene['A'].sum == 400
+    assert by_gene['A'].mean == 200
+    assert by_gene['B'].count == 1
+
+
+def test_aggregate_fans_out_multi_pool_and_merged_targets(tmp_path):
+    aggregator = CoverageAggregator.from_loader(BedFileLoader(amplicon_cov(tmp_path, [
+        ('A_1.1&B_1.1', 'GENE_ID=A&B;Pool=1&2,3', 100), ('B_1.2', 'GENE_ID=B;Pool=1,1', 10)])))
+    by_pool = aggregator.by_pool()
+    assert {pool: summary.sum for pool, summary in by_pool.items()} == {1: 110, 2: 100, 3: 100}
+    by_gene = aggregator.by_gene()
+    assert by_gene['A'].sum == 100
+    assert by_gene['B'].sum == 110
+
+
+def test_aggregate_float_metrics(tmp_path):
+    aggregator = CoverageAggregator.from_loader(BedFileLoader(amplicon_cov(tmp_path, [
+        ('A_1.1', 'GENE_ID=A;Pool=1', 100), ('A_1.2', 'GENE_ID=A;Pool=2', 300)])))
+    assert aggregator.by_gene('cov100x')['A'].mean == 0.5
+    assert aggregator.summary('total_reads').median == 200
+
+
+def test_aggregate_mock():
+    aggregator = CoverageAggregator.from_loader(BedFileLoader(f'{mock_dir_path}/amplicon_cov.tsv'))
+    assert aggregator.by_pool()[6].sum == 200
+    assert aggregator.summary().uniformity == 1.0
+
+
+def test_aggregator_rejects_other_file_types():
+    with pytest.raises(ValueError):
+        CoverageAggregator.from_loader(BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed'))
+
+
+def test_aggregator_rejects_unknown_metrics_and_columns():
+    aggregator = CoverageAggregator.from_loader(BedFileLoader(f'{mock_dir_path}/amplicon_cov.tsv'))
+    with pytest.raises(ValueError):
+        aggregator.by_gene('chrom_start')
+    with pytest.raises(ValueError):
+        aggregator.aggregate('chrom')
+
+
+def test_summarize_without_numpy(monkeypatch):
+    monkeypatch.setattr(coverage, 'get_numpy', lambda: None)
+    test_summarize()
+
+
+@pytest.mark.parametrize('metric', ['total_reads', 'cov20x'])
+def test_numpy_aggregate_matches_pure_python(tmp_path, monkeypatch, metric):
+    pytest.importorskip('numpy')
+    random.seed(3)
+    genes = ['A', 'B', 'C', 'D', 'E']
+    filename = amplicon_cov(tmp_path, [('{}_1.{}'.format(gene, i), 'GENE_ID={};Pool={}'.format(gene, pools),
+                                        random.randint(0, 1000))
+                                       for i, (gene, pools) in enumerate((random.choice(genes),
+                                                                          random.choice(['1', '2', '1,2', '3']))
+                                                                         for _ in range(301))])
+    aggregator = CoverageAggregator.from_loader(BedFileLoader(filename))
+    results = [aggregator.by_gene(metric), aggregator.by_pool(metric), aggregator.summary(metric)]
+    monkeypatch.setattr(coverage, 'get_numpy', lambda: None)
+    assert results == [aggregator.by_gene(metric), aggregator.by_pool(metric), aggregator.summary(metric)]
+    assert all(type(value) is type(expected) for value, expected in zip(results[2], aggregator.summary(metric)))
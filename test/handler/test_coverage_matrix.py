@@ -0,0 +1,93 @@
+import gzip
+import os
+
+import pytest
+
+from bedhandler.handler import CoverageMatrix
+from bedhandler.handler.coverage_matrix import read_metric, read_metric_column, region_ids_digest
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+header = 'contig_id\tcontig_srt\tcontig_end\tregion_id\tattributes\tgc_count\toverlaps\tfwd_e2e\trev_e2e\t' \
+         'total_reads\tfwd_reads\trev_reads\tcov20x\tcov100x\tcov500x\n'
+
+
+def amplicon_cov(filename, rows, with_header=True):
+    content = (header if with_header else '') + ''.join(
+        'chr1\t{}\t{}\t{}\tGENE_ID=GENE{};Pool=1\t50\t0\t0\t0\t{}\t0\t0\t{}\t0.5\t0.0\n'.format(
+            i * 100, i * 100 + 50, region, i, reads, reads / 100) for i, (region, reads) in enumerate(rows))
+    if str(filename).endswith('.gz'):
+        with gzip.open(str(filename), 'wt') as file:
+            file.write(content)
+    else:
+        filename.write_text(content)
+    return str(filename)
+
+
+def test_read_metric():
+    region_ids, values = read_metric(os.path.join(mock_dir_path, 'amplicon_cov.tsv'), 'total_reads')
+    assert region_ids[0] == 'GENE1_1.3784'
+    assert values.typecode == 'q'
+    assert values[0] == 200
+    assert len(region_ids) == len(values)
+
+
+def test_read_metric_without_header(tmp_path):
+    filename = amplicon_cov(tmp_path / 'a.tsv', [('R1', 10), ('R2', 20)], with_header=False)
+    region_ids, values = read_metric(filename, 'cov20x')
+    assert region_ids == ['R1', 'R2']
+    assert values.typecode == 'd'
+    assert list(values) == [0.1, 0.2]
+
+
+def test_load(tmp_path):
+    filenames = [amplicon_cov(tmp_path / 'a.tsv', [('R1', 10), ('R2', 20), ('R3', 30)]),
+                 amplicon_cov(tmp_path / 'b.tsv.gz', [('R1', 11), ('R2', 21), ('R3', 31)]),
+                 amplicon_cov(tmp_path / 'c.tsv', [('R3', 32), ('R1', 12), ('R2', 22)])]
+    matrix = CoverageMatrix.load(filenames, max_workers=2)
+    assert matrix.shape == (3, 3)
+    assert matrix.samples == ['a.tsv', 'b.tsv.gz', 'c.tsv']
+    assert matrix.region_ids == ['R1', 'R2', 'R3']
+    assert list(matrix.values) == [10, 11, 12, 20, 21, 22, 30, 31, 32]
+    assert list(matrix.row('R2')) == [20, 21, 22]
+    assert list(matrix.column('c.tsv')) == [12, 22, 32]
+    assert matrix.value('R3', 1) == 31
+
+
+def test_load_samples(tmp_path):
+    filenames = [amplicon_cov(tmp_path / 'a.tsv', [('R1', 10)]), amplicon_cov(tmp_path / 'b.tsv', [('R1', 20)])]
+    matrix = CoverageMatrix.load(filenames, metric='cov20x', samples=['s1', 's2'], max_workers=1)
+    assert matrix.values.typecode == 'd'
+    assert list(matrix.row('R1')) == [0.1, 0.2]
+    with pytest.raises(ValueError):
+        CoverageMatrix.load(filenames, samples=['s1'])
+
+
+def test_load_different_regions(tmp_path):
+    filenames = [amplicon_cov(tmp_path / 'a.tsv', [('R1', 10), ('R2', 20)]),
+                 amplicon_cov(tmp_path / 'b.tsv', [('R1', 10), ('R3', 20)])]
+    with pytest.raises(ValueError):
+        CoverageMatrix.load(filenames, max_workers=1)
+
+
+def test_load_unknown_metric(tmp_path):
+    with pytest.raises(ValueError):
+        CoverageMatrix.load([amplicon_cov(tmp_path / 'a.tsv', [('R1', 10)])], metric='attributes')
+
+
+def test_load_duplicate_regions(tmp_path):
+    filenames = [amplicon_cov(tmp_path / 'a.tsv', [('R1', 10), ('R2', 20), ('R1', 30)]),
+                 amplicon_cov(tmp_path / 'b.tsv', [('R1', 10), ('R2', 20), ('R3', 30)])]
+    with pytest.raises(ValueError, match='R1'):
+        CoverageMatrix.load(filenames, max_workers=1)
+    with pytest.raises(ValueError):
+        CoverageMatrix.load(filenames[::-1], max_workers=1)
+
+
+def test_read_metric_column(tmp_path):
+    filename = amplicon_cov(tmp_path / 'a.tsv', [('R1', 10), ('R2', 20)])
+    region_ids, digest, values = read_metric_column(filename, 'total_reads', False)
+    assert region_ids is None
+    assert digest == region_ids_digest(['R1', 'R2']) != region_ids_digest(['R2', 'R1'])
+    assert list(values) == [10, 20]
+    assert read_metric_column(filename, 'total_reads', True)[0] == ['R1', 'R2']
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_exome.bed', 'ampliseq_panel.bed', 'effective_regions.bed', 'amplicon_cov.tsv', 'general.bed']
+
+
+@pytest.mark.parametrize('filename', mocks)
+def test_iter_batches(filename):
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    lines = loader.expand_columns()
+    batches = list(loader.iter_batches(batch_size=3))
+    assert [len(batch) for batch in batches[:-1]] == [3] * (len(batches) - 1)
+    assert sum(len(batch) for batch in batches) == len(lines)
+    table = loader.to_columnar()
+    rows = [[batch[name][i] for name in batch.names] for batch in batches for i in range(len(batch))]
+    assert rows == [[table[name][i] for name in table.names] for i in range(len(table))]
+    assert all(batch.chrom_vocabulary is loader.chrom_vocabulary for batch in batches)
+
+
+def test_iter_batches_streaming():
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    batches = list(StreamingBedFileLoader(filename, sample_size=2).iter_batches(batch_size=4))
+    assert sum(len(batch) for batch in batches) == len(BedFileLoader(filename).bed_lines)
+
+
+def test_missing_dependencies(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.setitem(sys.modules, 'pandas', None)
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'ampliseq_exome.bed'))
+    with pytest.raises(ImportError, match='pyarrow'):
+        loader.to_arrow()
+    with pytest.raises(ImportError, match='pandas'):
+        loader.to_pandas()
+
+
+@pytest.mark.parametrize('filename', mocks)
+def test_to_arrow(filename):
+    pa = pytest.importorskip('pyarrow')
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    lines = loader.expand_columns()
+    table = loader.to_arrow(batch_size=3)
+    assert table.num_rows == len(lines)
+    assert table.column_names == loader.columns[:len(lines[0])]
+    assert table.column('chrom').to_pylist() == [line[0] for line in lines]
+    assert table.column('chrom_start').type == pa.int64()
+    assert table.column('chrom_start').to_pylist() == [int(line[1]) for line in lines]
+    if 'pools' in table.column_names:
+        index = loader.columns.index('pools')
+        assert table.column('pools').to_pylist() == [[list(pool) for pool in line[index]] for line in lines]
+        index = loader.columns.index('gene')
+        assert table.column('gene').to_pylist() == [[list(gene) for gene in line[index]] for line in lines]
+
+
+@pytest.mark.parametrize('filename', mocks)
+def test_to_pandas(filename):
+    pytest.importorskip('pandas')
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    lines = loader.expand_columns()
+    frame = loader.to_pandas()
+    assert len(frame) == len(lines)
+    assert list(frame.columns) == loader.columns[:len(lines[0])]
+    assert list(frame['chrom']) == [line[0] for line in lines]
+    assert list(frame['chrom_end']) == [int(line[2]) for line in lines]
+    if 'pools' in frame.columns:
+        index = loader.columns.index('pools')
+        assert list(frame['pools']) == [[list(pool) for pool in line[index]] for line in lines]
@@ -0,0 +1,55 @@
+import os
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import DesignIndex
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+def test_rows_by_gene():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed')
+    rows = bed_file.get_rows_by_gene('GENE2')
+    assert [row[1] for row in rows] == ['17013203', '17022250']
+    assert bed_file.get_rows_by_gene('EGFR') == []
+
+
+def test_rows_by_pool():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed')
+    assert [row[1] for row in bed_file.get_rows_by_pool(1)] == ['17023014', '17022250']
+    assert bed_file.get_rows_by_pool(7) == []
+
+
+def test_row_by_region_id():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed')
+    assert bed_file.get_row_by_region_id('GENE2_1.1.11194')[1] == '69210'
+    assert bed_file.get_row_by_region_id('GENE9_1.1.1') is None
+
+
+def test_merged_targets_fan_out_once_per_row():
+    bed_file = BedFileLoader(f'{mock_dir_path}/effective_regions.bed')
+    index = bed_file.get_design_index()
+    assert list(index.pool_row_ids(3)) == [1]
+    assert list(index.pool_row_ids(6)) == [1]
+    assert list(index.gene_row_ids('GENE4')) == [1]
+    assert index.region_id_row_id('GENE3_1.2.28698') == 1
+
+
+def test_design_index_is_built_once():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed')
+    assert bed_file.get_design_index() is bed_file.get_design_index()
+    assert bed_file.get_design_index().lines == bed_file.expand_columns()
+
+
+def test_design_index_with_raw_region_ids():
+    index = DesignIndex([['chr1', '1', '2', '111', 'A'], ['chr1', '3', '4', '222', 'B']],
+                        ['chrom', 'chrom_start', 'chrom_end', 'region_id', 'score'])
+    assert index.region_id_row_id('222') == 1
+    assert index.genes == {} and index.pools == {}
+
+
+def test_rows_are_copies():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed')
+    for row in bed_file.get_rows_by_gene('GENE2') + bed_file.get_rows_by_pool(1):
+        row[1] = '-1'
+    assert [row[1] for row in bed_file.get_rows_by_gene('GENE2')] == ['17013203', '17022250']
+    assert bed_file.get_design_index().lines == bed_file.expand_columns()
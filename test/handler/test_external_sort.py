@@ -0,0 +1,52 @@
+import os
+import random
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+from bedhandler.handler import external_sort
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+def random_lines(number):
+    random.seed(3)
+    return [[random.choice(['chr1', 'chr2', '3', 'chrX']), str(random.randint(0, 1000)), str(random.randint(0, 1000)),
+             str(i)] for i in range(number)]
+
+
+@pytest.mark.parametrize('max_lines_in_memory', [1, 7, 100, 999, 1000, 5000])
+def test_external_sort_matches_in_memory_sort(max_lines_in_memory, tmp_path):
+    lines = random_lines(1000)
+    key = BedFileLoader.sort_key
+    assert list(external_sort(lines, key, max_lines_in_memory, str(tmp_path))) == sorted(lines, key=key)
+
+
+def test_external_sort_merges_in_many_passes(tmp_path):
+    lines = random_lines(1000)
+    key = BedFileLoader.sort_key
+    assert list(external_sort(iter(lines), key, 5, str(tmp_path), fan_in=3)) == sorted(lines, key=key)
+
+
+def test_external_sort_removes_temporary_files(tmp_path):
+    list(external_sort(random_lines(100), BedFileLoader.sort_key, 10, str(tmp_path)))
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_external_sort_empty_input():
+    assert list(external_sort([], BedFileLoader.sort_key, 10)) == []
+
+
+@pytest.mark.parametrize('mock', ['mock_for_split.bed', 'effective_regions.bed', 'ampliseq_panel.bed'])
+def test_streaming_sorted_records_match_expanded_columns(mock):
+    streaming = StreamingBedFileLoader(f'{mock_dir_path}/{mock}')
+    assert list(streaming.iter_sorted_records(max_lines_in_memory=1)) == \
+           BedFileLoader(f'{mock_dir_path}/{mock}').expand_columns()
+
+
+def test_sort_chroms_does_not_change_given_list():
+    lines = random_lines(50)
+    copy = list(lines)
+    BedFileLoader(f'{mock_dir_path}/general.bed').sort_chroms(lines)
+    assert lines == copy
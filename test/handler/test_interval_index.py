@@ -0,0 +1,108 @@
+import os
+import random
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import IntervalIndex
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+lines = [['chr1', '100', '200'], ['chr1', '150', '160'], ['chr1', '300', '400'], ['chr2', '100', '1000'],
+         ['chr2', '200', '300']]
+index = IntervalIndex(lines)
+
+
+def test_overlaps_finds_all_overlapping_lines():
+    assert index.overlaps('chr1', 155, 350) == [lines[0], lines[1], lines[2]]
+
+
+def test_overlaps_is_half_open():
+    assert index.overlaps('chr1', 200, 300) == []
+    assert index.overlaps('chr1', 199, 200) == [lines[0]]
+
+
+def test_overlaps_finds_long_interval_started_before_short_ones():
+    assert index.overlaps('chr2', 500, 501) == [lines[3]]
+
+
+def test_overlaps_unknown_chromosome():
+    assert index.overlaps('chrX', 0, 1000) == []
+
+
+def test_contains():
+    assert index.contains('chr1', 155) == [lines[0], lines[1]]
+    assert index.contains('chr1', 250) == []
+
+
+def test_nearest_returns_overlapping_lines():
+    assert index.nearest('chr1', 155) == [lines[0], lines[1]]
+
+
+def test_nearest_upstream_and_downstream():
+    assert index.nearest('chr1', 210) == [lines[0]]
+    assert index.nearest('chr1', 290) == [lines[2]]
+    assert index.nearest('chr1', 10) == [lines[0]]
+    assert index.nearest('chr1', 5000) == [lines[2]]
+
+
+def test_nearest_tie_returns_both_lines():
+    tie_lines = [['chr1', '100', '200'], ['chr1', '301', '400']]
+    assert IntervalIndex(tie_lines).nearest('chr1', 250) == tie_lines
+
+
+def test_overlaps_matches_linear_scan():
+    random.seed(1)
+    random_lines = []
+    for _ in range(500):
+        start = random.randint(0, 10000)
+        random_lines.append(['chr1', str(start), str(start + random.randint(1, 500))])
+    random_index = IntervalIndex(random_lines)
+    for _ in range(200):
+        start = random.randint(0, 10000)
+        end = start + random.randint(1, 300)
+        expected = [line for line in random_lines if int(line[1]) < end and int(line[2]) > start]
+        assert sorted(random_index.overlaps('chr1', start, end)) == sorted(expected)
+
+
+def test_overlaps_with_long_containing_interval_matches_linear_scan():
+    random.seed(2)
+    for size in (1, 2, 3, 15, 16, 17, 100, 1000):
+        random_lines = [['chr1', '0', '100000']]
+        for _ in range(size):
+            start = random.randint(0, 100000)
+            random_lines.append(['chr1', str(start), str(start + random.randint(0, 50))])
+        random.shuffle(random_lines)
+        random_index = IntervalIndex(random_lines)
+        for _ in range(50):
+            start = random.randint(0, 100000)
+            end = start + random.randint(1, 100)
+            expected = [line for line in random_lines if int(line[1]) < end and int(line[2]) > start]
+            found = random_index.overlaps('chr1', start, end)
+            assert sorted(found) == sorted(expected)
+            assert [int(line[1]) for line in found] == sorted(int(line[1]) for line in found)
+
+
+def test_nearest_returns_all_upstream_lines_tied_on_end():
+    tied_lines = [['chr1', '100', '200'], ['chr1', '150', '200'], ['chr1', '120', '180'], ['chr1', '400', '500']]
+    assert IntervalIndex(tied_lines).nearest('chr1', 210) == [tied_lines[0], tied_lines[1]]
+
+
+def test_nearest_matches_linear_scan():
+    random.seed(3)
+    random_lines = []
+    for _ in range(300):
+        start = random.randint(0, 10000)
+        random_lines.append(['chr1', str(start), str(start + random.randint(1, 100))])
+    random_index = IntervalIndex(random_lines)
+    for pos in random.sample(range(-100, 10200), 500):
+        expected = [line for line in random_lines if int(line[1]) <= pos < int(line[2])]
+        if not expected:
+            distances = [max(int(line[1]) - pos, pos - int(line[2]) + 1) for line in random_lines]
+            expected = [line for line, distance in zip(random_lines, distances) if distance == min(distances)]
+        assert sorted(random_index.nearest('chr1', pos)) == sorted(expected)
+
+
+def test_from_loader():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed')
+    loader_index = IntervalIndex.from_loader(bed_file)
+    found = loader_index.overlaps('chr1', 69400, 69401)
+    assert [str(line[3]) for line in found] == ['GENE2_1.1.11194', 'GENE3_1.2.19824']
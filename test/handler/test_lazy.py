@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import LazyExpandedLines
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_exome.bed', 'ampliseq_panel.bed', 'ampliseq_panel_v2.bed', 'effective_regions.bed',
+         'amplicon_cov.tsv', 'general.bed']
+
+
+@pytest.mark.parametrize('filename', mocks)
+def test_rows(filename):
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    lazy = loader.lazy_expand_columns()
+    assert isinstance(lazy, LazyExpandedLines)
+    assert len(lazy) == len(loader.bed_lines)
+    assert list(lazy) == loader.expand_columns()
+    assert lazy[0] == loader.expand_columns()[0]
+
+
+@pytest.mark.parametrize('filename', mocks)
+def test_columns(filename):
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    lines = loader.expand_columns()
+    lazy = loader.lazy_expand_columns()
+    for i, name in enumerate(loader.columns):
+        assert lazy.value(0, name) == lines[0][i]
+        assert lazy.column(name) == [line[i] for line in lines]
+        assert lazy.value(1, name) == lines[1][i]
+
+
+@pytest.mark.parametrize('filename', mocks)
+def test_projection(filename):
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    lines = loader.expand_columns()
+    names = list(reversed(loader.columns))
+    indexes = [loader.columns.index(name) for name in names]
+    assert loader.expand_columns(columns=names) == [[line[i] for i in indexes] for line in lines]
+
+
+def test_projection_coordinates_and_pools():
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'effective_regions.bed'))
+    lines = loader.expand_columns(columns=['chrom', 'chrom_start', 'chrom_end', 'pools'])
+    assert [str(value) for value in lines[1]] == ['chr1', '69212', '69810', '2&3,6&4&5']
+
+
+def test_projection_of_cached_lines(tmp_path):
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    BedFileLoader(filename, cache_dir=str(tmp_path))
+    loader = BedFileLoader(filename, cache_dir=str(tmp_path))
+    assert loader.expand_columns(columns=['pools', 'chrom']) == \
+        BedFileLoader(filename).expand_columns(columns=['pools', 'chrom'])
+
+
+def test_unknown_column(tmp_path):
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    with pytest.raises(ValueError):
+        BedFileLoader(filename).expand_columns(columns=['chrom', 'cov20x'])
+    with pytest.raises(ValueError):
+        BedFileLoader(filename, cache_dir=str(tmp_path)).expand_columns(columns=['cov20x'])
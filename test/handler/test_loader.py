@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 from bedhandler.handler import BedFileLoader
 
 mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
@@ -148,3 +150,110 @@ def test_loader_strip_chr_works():
     """
     bed_lines = BedFileLoader(f'{mock_dir_path}/general.bed', strip_chr=True).bed_lines
     assert bed_lines[0][0] == '7'
+
+
+def test_column_indexes_are_detected_in_first_data_line_matching(tmp_path):
+    """
+    test that column indexes come from the first data line where each pattern is found
+    """
+    filename = tmp_path / 'late_attributes.bed'
+    filename.write_text('chr1\t100\t200\tno_region\t0\t+\t.\tnothing\n'
+                        'chr1\t300\t400\tGENE1_1.1.1\t0\t+\t.\tGENE_ID=GENE1;Pool=1\n')
+    bed_file = BedFileLoader(str(filename))
+    column_map = bed_file.get_map_with_column_indexes()
+    assert column_map[bed_file._BedFileLoader__region_id]['index'] == 3
+    assert column_map[bed_file._BedFileLoader__attributes]['index'] == 7
+    assert column_map[bed_file._BedFileLoader__submitted_region]['index'] == -1
+
+
+def test_column_detection_is_bounded_by_sample_size(tmp_path, monkeypatch):
+    """
+    test that patterns are only searched in the first sample_size data lines
+    """
+    filename = tmp_path / 'late_attributes.bed'
+    filename.write_text('chr1\t100\t200\n' * 5 + 'chr1\t300\t400\tGENE1_1.1.1\t0\t+\t.\tGENE_ID=GENE1;Pool=1\n')
+    monkeypatch.setattr(BedFileLoader, 'sample_size', 5)
+    assert BedFileLoader(str(filename)).file_type == 'general_tsv'
+    monkeypatch.setattr(BedFileLoader, 'sample_size', 6)
+    assert BedFileLoader(str(filename)).file_type == 'ampliseq_exome'
+
+
+def test_loader_detects_sorted_input():
+    assert BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed').is_sorted is True
+    assert BedFileLoader(f'{mock_dir_path}/mock_for_split.bed').is_sorted is False
+
+
+def test_loader_checks_order_on_first_sort(monkeypatch):
+    calls = []
+    check_sorted = BedFileLoader.check_sorted
+    monkeypatch.setattr(BedFileLoader, 'check_sorted', staticmethod(lambda lines: calls.append(lines) or
+                                                                    check_sorted(lines)))
+    bed_file = BedFileLoader(f'{mock_dir_path}/mock_for_split.bed')
+    assert calls == []
+    bed_file.expand_columns()
+    bed_file.expand_columns()
+    assert len(calls) == 1
+    assert bed_file.is_sorted is False
+
+
+def test_loader_skips_sort_for_sorted_input(monkeypatch):
+    """
+    test that lines aren't sorted when they're already sorted
+    """
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed')
+
+    def fail(*args):
+        raise AssertionError('lines must not be sorted')
+
+    monkeypatch.setattr(bed_file, 'sort_key', fail)
+    expanded = bed_file.expand_columns()
+    assert [line[1] for line in expanded] == ['68920', '69210', '69380']
+
+
+def test_check_sorted_compares_chrom_start_and_end():
+    assert BedFileLoader.check_sorted([['chr1', '1', '5'], ['chr1', '1', '6'], ['chr2', '0', '1']]) is True
+    assert BedFileLoader.check_sorted([['chr1', '1', '6'], ['chr1', '1', '5']]) is False
+    assert BedFileLoader.check_sorted([['chr2', '1', '6'], ['chr10', '1', '5']]) is True
+    assert BedFileLoader.check_sorted([['chr10', '1', '6'], ['chr2', '1', '5']]) is False
+    assert BedFileLoader.check_sorted([['chr1', '5', '6'], ['chr2', '1', '2'], ['chr1', '7', '8']]) is False
+    assert BedFileLoader.check_sorted([['chr1', '5', '6'], ['1', '7', '8'], ['chr1', '6', '7']]) is False
+    assert BedFileLoader.check_sorted([]) is True
+
+
+def test_expand_records_match_expanded_columns():
+    for mock in ['ampliseq_panel.bed', 'ampliseq_panel_v2.bed', 'ampliseq_exome.bed', 'general.bed',
+                 'effective_regions.bed', 'amplicon_cov.tsv', 'mock_for_split.bed']:
+        bed_file = BedFileLoader(f'{mock_dir_path}/{mock}')
+        records = bed_file.expand_records()
+        assert [record.to_expanded() for record in records] == bed_file.expand_columns()
+        assert list(records[0]._fields) == bed_file.columns
+
+
+@pytest.mark.parametrize('line', ['chr1\t1\t2', 'chr22\t1\t2\n', '7\t1\t2', 'chrX\t1\t2', 'chrY\t1\t2', 'chrM\t1\t2',
+                                  'chrMT\t1\t2', 'chrUn_gl000220\t1\t2', 'chr1_gl000191_random\t1\t2\tname',
+                                  'GL000220.1\t1\t2', 'X\t1\t2\n', 'chrEBV\t0\t100'])
+def test_is_data_line(line):
+    assert BedFileLoader.is_data_line(line)
+    assert BedFileLoader.split_line(line, False) == line.strip('\n').split('\t')
+
+
+@pytest.mark.parametrize('line', ['', 'track name="this is a mock"', 'browser', 'browser\t1\t2', '#chrom\t1\t2',
+                                  'chromosome\tbut\tignore\tit\tplease', 'contig_id\tcontig_srt\tcontig_end',
+                                  'this is a mock', 'chrMT\tstart\tend'])
+def test_is_not_data_line(line):
+    assert not BedFileLoader.is_data_line(line)
+    assert BedFileLoader.split_line(line, False) is None
+
+
+@pytest.mark.parametrize('mock', ['ampliseq_panel.bed', 'ampliseq_exome.bed', 'general.bed', 'effective_regions.bed',
+                                  'amplicon_cov.tsv'])
+def test_returned_lines_are_copies(mock):
+    bed_file = BedFileLoader(f'{mock_dir_path}/{mock}')
+    bed_lines = [list(line) for line in bed_file.bed_lines]
+    expanded = [list(line) for line in bed_file.expand_columns()]
+    for lines in [bed_file.expand_columns(), list(bed_file.iter_expanded()), bed_file.sort_chroms(bed_file.bed_lines),
+                  list(bed_file.lazy_expand_columns())]:
+        for line in lines:
+            line[1] = '-1'
+    assert bed_file.bed_lines == bed_lines
+    assert bed_file.expand_columns() == expanded
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import MappedBedFile
+from bedhandler.handler.mapped import is_data_line
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_exome.bed', 'ampliseq_panel.bed', 'ampliseq_panel_v2.bed', 'effective_regions.bed',
+         'amplicon_cov.tsv', 'general.bed', 'mock_for_split.bed']
+
+
+@pytest.mark.parametrize('line', ['chr1\t1\t2', '1\t1\t2', 'chrX\t1\t2', 'chrMT\t1\t2', 'chrUn_gl000220\t1\t2',
+                                  'GL000220.1\t1\t2', 'chr\t1', 'chromosome\tbut\tignore', 'track name="mock"',
+                                  'browser\t1\t2', '#chrom\t1\t2', '', 'chr1', 'chrMT\tstart\tend'])
+def test_is_data_line(line):
+    content = line.encode('utf-8')
+    assert is_data_line(content, 0, len(content)) == (BedFileLoader.split_line(line, False) is not None)
+
+
+@pytest.mark.parametrize('filename', mocks)
+@pytest.mark.parametrize('strip_chr', [False, True])
+def test_loader(filename, strip_chr):
+    expected = BedFileLoader(os.path.join(mock_dir_path, filename), strip_chr=strip_chr)
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename), strip_chr=strip_chr, use_mmap=True)
+    assert loader.header_lines == expected.header_lines
+    assert loader.bed_lines == expected.bed_lines
+    assert loader.file_type == expected.file_type
+    assert loader.columns == expected.columns
+    assert loader.expand_columns() == expected.expand_columns()
+
+
+def test_loader_region():
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    expected = BedFileLoader(filename, region='chr1:69000-69300')
+    loader = BedFileLoader(filename, region='chr1:69000-69300', use_mmap=True)
+    assert loader.bed_lines == expected.bed_lines
+    assert len(loader.bed_lines) > 0
+
+
+def test_fields():
+    with MappedBedFile(os.path.join(mock_dir_path, 'ampliseq_exome.bed')) as mapped:
+        assert mapped.header_lines == ['track name="this is a mock"']
+        assert mapped.line(0) == ['chr1', '68920', '69130', 'GENE1_1.1.3601', '0', '+', '.', 'GENE_ID=GENE1;Pool=1']
+        assert mapped.fields(0, [3, 1, 20]) == ['GENE1_1.1.3601', '68920', None]
+        assert list(mapped.column(0)) == [mapped.line(i)[0] for i in range(len(mapped))]
+
+
+def test_empty_file(tmp_path):
+    filename = tmp_path / 'empty.bed'
+    filename.write_text('')
+    with MappedBedFile(str(filename)) as mapped:
+        assert len(mapped) == 0
+        assert mapped.split_lines() == ([], [])
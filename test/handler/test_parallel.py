@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import ColumnarTable
+from bedhandler.handler import StreamingBedFileLoader
+from bedhandler.handler.parallel import byte_ranges, expand_file_table, expand_range
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_panel.bed', 'ampliseq_exome.bed', 'general.bed', 'effective_regions.bed', 'amplicon_cov.tsv',
+         'mock_for_split.bed']
+
+
+@pytest.mark.parametrize('mock', mocks)
+def test_parallel_expand_columns_matches_sequential(mock):
+    bed_file = BedFileLoader(f'{mock_dir_path}/{mock}')
+    assert bed_file.expand_columns(workers=3) == bed_file.expand_columns()
+
+
+def test_parallel_expand_columns_covers_whole_file_for_streaming_loader():
+    streaming = StreamingBedFileLoader(f'{mock_dir_path}/mock_for_split.bed', sample_size=1)
+    assert streaming.expand_columns(workers=2) == BedFileLoader(f'{mock_dir_path}/mock_for_split.bed').expand_columns()
+
+
+@pytest.mark.parametrize('chunks', [1, 2, 5, 1000])
+def test_byte_ranges_are_aligned_to_lines(chunks):
+    filename = f'{mock_dir_path}/ampliseq_panel.bed'
+    with open(filename, 'rb') as file:
+        content = file.read()
+    ranges = byte_ranges(filename, chunks)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(content)
+    assert b''.join(content[start:end] for start, end in ranges) == content
+    for start, end in ranges[1:]:
+        assert content[start - 1:start] == b'\n'
+
+
+def test_workers_return_columnar_chunks():
+    filename = f'{mock_dir_path}/effective_regions.bed'
+    bed_file = BedFileLoader(filename)
+    chunk, first_key, last_key = expand_range(filename, 0, os.path.getsize(filename), bed_file.get_expander(),
+                                              bed_file.split_line, bed_file.sort_key, False, bed_file.columns)
+    assert isinstance(chunk, ColumnarTable)
+    assert chunk.to_lines() == bed_file.expand_columns()
+    assert first_key <= last_key
+
+
+@pytest.mark.parametrize('mock', mocks)
+def test_expand_file_table_matches_sequential(mock):
+    filename = f'{mock_dir_path}/{mock}'
+    bed_file = BedFileLoader(filename)
+    expanded, table = expand_file_table(filename, bed_file.get_expander(), bed_file.split_line, bed_file.sort_key,
+                                        False, 3, bed_file.columns)
+    assert expanded == bed_file.expand_columns()
+    if table is not None:
+        assert table.to_lines() == expanded
+        assert len(table) == len(expanded)
+
+
+def test_parallel_expand_columns_caches_workers_tables(tmp_path):
+    filename = f'{mock_dir_path}/effective_regions.bed'
+    cache_dir = str(tmp_path / 'cache')
+    expanded = BedFileLoader(filename, cache_dir=cache_dir).expand_columns(workers=3)
+    assert expanded == BedFileLoader(filename).expand_columns()
+    assert BedFileLoader(filename, cache_dir=cache_dir).expand_columns() == expanded
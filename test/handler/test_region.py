@@ -0,0 +1,36 @@
+import pytest
+
+from bedhandler.handler import Region
+
+
+def test_parse_region_converts_to_zero_based_half_open():
+    region = Region.parse('chr7:55,241,600-55,241,800')
+    assert (region.chrom, region.start, region.end) == ('chr7', 55241599, 55241800)
+
+
+def test_parse_region_whole_chromosome():
+    region = Region.parse('chrX')
+    assert (region.chrom, region.start, region.end) == ('chrX', 0, None)
+
+
+def test_parse_region_single_position():
+    region = Region.parse('chr1:100')
+    assert (region.start, region.end) == (99, 100)
+
+
+@pytest.mark.parametrize('region', ['chr1:0-10', 'chr1:20-10', 'chr1:a-b', ''])
+def test_parse_invalid_region(region):
+    with pytest.raises(ValueError):
+        Region.parse(region)
+
+
+def test_region_overlaps():
+    region = Region.parse('chr1:101-200')
+    assert region.overlaps('chr1', 199, 300)
+    assert not region.overlaps('chr1', 200, 300)
+    assert not region.overlaps('chr1', 0, 100)
+    assert not region.overlaps('chr2', 150, 160)
+
+
+def test_region_repr():
+    assert repr(Region.parse('chr1:101-200')) == 'chr1:101-200'
@@ -0,0 +1,63 @@
+import os
+
+from bedhandler.domain import GeneId, GeneIdList, Pool, Pools
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import complement, intersect, merge, subtract
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+def line(chrom, start, end, gene='G', pool=1):
+    return [chrom, str(start), str(end), GeneIdList([GeneId([gene])]), Pools([Pool([pool])])]
+
+
+def coordinates(lines):
+    return [tuple(line[:3]) for line in lines]
+
+
+def test_intersect():
+    a = [line('chr1', 100, 200, 'A'), line('chr1', 150, 400, 'B'), line('chr2', 0, 50, 'C')]
+    b = [line('chr1', 0, 120), line('chr1', 180, 300), line('chr3', 0, 10)]
+    result = list(intersect(a, b))
+    assert coordinates(result) == [('chr1', '100', '120'), ('chr1', '180', '200'), ('chr1', '180', '300')]
+    assert [str(r[3]) for r in result] == ['A', 'A', 'B']
+
+
+def test_intersect_no_overlap():
+    assert list(intersect([line('chr1', 100, 200)], [line('chr1', 200, 300)])) == []
+
+
+def test_subtract():
+    a = [line('chr1', 100, 200, 'A'), line('chr1', 150, 400, 'B'), line('chr2', 0, 50, 'C')]
+    b = [line('chr1', 120, 130), line('chr1', 180, 300)]
+    result = list(subtract(a, b))
+    assert coordinates(result) == [('chr1', '100', '120'), ('chr1', '130', '180'), ('chr1', '150', '180'),
+                                   ('chr1', '300', '400'), ('chr2', '0', '50')]
+    assert [str(r[3]) for r in result] == ['A', 'A', 'B', 'B', 'C']
+
+
+def test_merge():
+    lines = [line('chr1', 100, 200, 'A', 1), line('chr1', 150, 250, 'B', 2), line('chr1', 250, 300, 'A', 1),
+             line('chr1', 400, 500, 'C', 1), line('chr2', 0, 50, 'D', 2)]
+    result = list(merge(lines))
+    assert coordinates(result) == [('chr1', '100', '300'), ('chr1', '400', '500'), ('chr2', '0', '50')]
+    assert str(result[0][3]) == 'A&B'
+    assert str(result[0][4]) == '1&2'
+    assert coordinates(merge(lines, distance=100)) == [('chr1', '100', '500'), ('chr2', '0', '50')]
+
+
+def test_complement():
+    lines = [line('chr1', 100, 200), line('chr1', 150, 300), line('chr3', 0, 10), line('chrUn', 0, 10)]
+    result = list(complement(lines, {'chr2': 500, 'chr1': 1000, 'chr3': 10}))
+    assert result == [['chr1', '0', '100'], ['chr1', '300', '1000'], ['chr2', '0', '500']]
+
+
+def test_loaders():
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'ampliseq_exome.bed'))
+    lines = loader.expand_columns()
+    assert set(coordinates(lines)) <= set(coordinates(intersect(loader, loader)))
+    assert list(subtract(loader, loader)) == []
+    merged = list(merge(loader))
+    assert len(merged) <= len(lines)
+    assert all(merged[i][0] != merged[i + 1][0] or int(merged[i][2]) < int(merged[i + 1][1])
+               for i in range(len(merged) - 1))
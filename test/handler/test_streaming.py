@@ -0,0 +1,56 @@
+import io
+import os
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+mocks = ['ampliseq_panel.bed', 'ampliseq_panel_v2.bed', 'ampliseq_exome.bed', 'general.bed', 'effective_regions.bed',
+         'amplicon_cov.tsv', 'mock_for_split.bed']
+
+
+@pytest.mark.parametrize('mock', mocks)
+def test_streaming_predicts_same_file_type_as_loader(mock):
+    assert StreamingBedFileLoader(f'{mock_dir_path}/{mock}').file_type == \
+           BedFileLoader(f'{mock_dir_path}/{mock}').file_type
+
+
+@pytest.mark.parametrize('mock', mocks)
+def test_streaming_records_match_expanded_columns(mock):
+    streaming = StreamingBedFileLoader(f'{mock_dir_path}/{mock}')
+    loader = BedFileLoader(f'{mock_dir_path}/{mock}')
+    assert streaming.sort_chroms(list(streaming.iter_records())) == loader.expand_columns()
+
+
+def test_streaming_detection_is_bounded_by_sample_size():
+    """
+    test that only sample_size data lines are kept after detection
+    """
+    streaming = StreamingBedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed', sample_size=2)
+    assert len(streaming.bed_lines) == 2
+    assert streaming.file_type == 'ampliseq_panel'
+    assert len(list(streaming)) == len(BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed').bed_lines)
+
+
+def test_streaming_keeps_file_order():
+    records = list(StreamingBedFileLoader(f'{mock_dir_path}/mock_for_split.bed').iter_records())
+    assert [record[0] for record in records] == ['chr1', 'chr12', '12', '1']
+
+
+def test_streaming_is_sorted_covers_whole_file_after_iteration():
+    streaming = StreamingBedFileLoader(f'{mock_dir_path}/mock_for_split.bed', sample_size=1)
+    assert streaming.is_sorted is True
+    list(streaming.iter_records())
+    assert streaming.is_sorted is False
+
+
+def test_stream():
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    with open(filename) as file:
+        loader = StreamingBedFileLoader(io.StringIO(file.read()), sample_size=2, region='chr1:69000-69400')
+    assert loader.file_type == 'ampliseq_exome'
+    assert list(loader.iter_records()) == BedFileLoader(filename, region='chr1:69000-69400').expand_columns()
+    with pytest.raises(ValueError):
+        list(loader.iter_records())
@@ -0,0 +1,78 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import StreamingBedFileLoader
+from bedhandler.handler import Vocabulary
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+def test_vocabulary_codes_in_order_of_appearance():
+    vocabulary = Vocabulary(['chr1', 'chr2'])
+    assert vocabulary.code('chr1') == 0
+    assert vocabulary.code('chrX') == 2
+    assert vocabulary[1] == 'chr2'
+    assert len(vocabulary) == 3
+    assert 'chrX' in vocabulary
+    assert vocabulary.get_code('chrY') == -1
+
+
+def test_vocabulary_interns_values():
+    vocabulary = Vocabulary()
+    first = ''.join(['chr', '1'])
+    second = ''.join(['chr', '1'])
+    assert first is not second
+    assert vocabulary.intern(first) is vocabulary.intern(second)
+
+
+def test_vocabulary_is_consistent_when_shared_by_threads():
+    vocabulary = Vocabulary()
+    values = ['GENE{}'.format(i % 100) for i in range(10000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(vocabulary.code, values))
+    assert len(vocabulary) == 100
+    assert all(vocabulary[vocabulary.code(value)] == value for value in values)
+
+
+def test_vocabulary_can_be_pickled():
+    vocabulary = pickle.loads(pickle.dumps(Vocabulary(['chr1', 'chr2'])))
+    assert vocabulary.code('chr2') == 1
+    assert vocabulary.code('chr3') == 2
+
+
+def test_loader_interns_chromosomes_and_genes():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed')
+    expanded = bed_file.expand_columns()
+    assert expanded[0][0] is expanded[1][0]
+    gene_index = bed_file.columns.index('gene')
+    assert expanded[0][gene_index][0][0] is expanded[1][gene_index][0][0]
+    assert bed_file.chrom_vocabulary.values == ['chr1', 'chr2']
+    assert bed_file.gene_vocabulary.values == ['GENE1', 'GENE2']
+
+
+def test_loaders_sharing_vocabularies_share_codes():
+    chroms, genes = Vocabulary(), Vocabulary()
+    panel = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed', chrom_vocabulary=chroms, gene_vocabulary=genes)
+    exome = StreamingBedFileLoader(f'{mock_dir_path}/ampliseq_exome.bed', chrom_vocabulary=chroms,
+                                   gene_vocabulary=genes)
+    list(exome.iter_records())
+    assert panel.chrom_vocabulary is exome.chrom_vocabulary
+    assert chroms.values == ['chr1', 'chr2']
+    assert genes.values == ['GENE1', 'GENE2', 'GENE3']
+
+
+def test_columnar_gene_column_is_dictionary_encoded():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed')
+    table = bed_file.to_columnar()
+    assert table['gene'].values.typecode == 'i'
+    assert list(table['gene'].values) == [0, 0, 1, 1]
+    assert str(table['gene'][2]) == 'GENE2'
+    assert table['chrom'].vocabulary is bed_file.chrom_vocabulary
+
+
+def test_parallel_expansion_interns_values():
+    bed_file = BedFileLoader(f'{mock_dir_path}/ampliseq_panel.bed')
+    expanded = bed_file.expand_columns(workers=2)
+    assert expanded[0][0] is bed_file.chrom_vocabulary.intern('chr1')
@@ -0,0 +1,52 @@
+import io
+import os
+
+import pytest
+
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import BedFileWriter
+from bedhandler.handler.bgzf import is_bgzf, is_gzip
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'mocks')
+
+
+@pytest.mark.parametrize('filename', ['ampliseq_exome.bed', 'ampliseq_panel.bed', 'ampliseq_panel_v2.bed',
+                                      'effective_regions.bed', 'amplicon_cov.tsv', 'general.bed'])
+@pytest.mark.parametrize('compression', [None, 'gzip', 'bgzf'])
+def test_round_trip(tmp_path, filename, compression):
+    loader = BedFileLoader(os.path.join(mock_dir_path, filename))
+    output = str(tmp_path / filename)
+    with BedFileWriter.from_loader(output, loader, compression=compression, buffer_size=2) as writer:
+        assert writer.write_all(loader.expand_columns()) == len(loader.bed_lines)
+
+    assert is_gzip(output) == (compression is not None)
+    assert is_bgzf(output) == (compression == 'bgzf')
+    written = BedFileLoader(output)
+    assert written.file_type == loader.file_type
+    assert written.header_lines == loader.header_lines
+    assert [[str(value) for value in line] for line in written.expand_columns()] == \
+           [[str(value) for value in line] for line in loader.expand_columns()]
+
+
+def test_attributes():
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'effective_regions.bed'))
+    file = io.StringIO()
+    with BedFileWriter(file, loader.columns) as writer:
+        writer.write_all(loader.expand_columns())
+    lines = file.getvalue().split('\n')
+    assert lines[1] == 'chr1\t69212\t69810\tGENE1_1.1.11194&GENE2_1.2.19824&GENE3_1.2.28698&GENE4_1.2.30842\t' \
+                       '0\t+\t.\tGENE_ID=GENE1&GENE2&GENE3&GENE4;SUBMITTED_REGION=&&&;Pool=2&3,6&4&5'
+    assert not file.closed
+
+
+def test_records():
+    loader = BedFileLoader(os.path.join(mock_dir_path, 'ampliseq_exome.bed'))
+    file = io.StringIO()
+    with BedFileWriter(file, loader.columns) as writer:
+        writer.write_all(loader.expand_records())
+    assert file.getvalue().split('\n')[0] == 'chr1\t68920\t69130\tGENE1_1.1.3601\t0\t+\t.\tGENE_ID=GENE1;Pool=1'
+
+
+def test_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        BedFileWriter(str(tmp_path / 'a.bed'), [], compression='zip')
@@ -0,0 +1,43 @@
+import pytest
+
+from bedhandler.mapper import AttributeMapper
+from bedhandler.mapper import GeneIdMapper
+from bedhandler.mapper import PoolMapper
+from bedhandler.mapper import SubmittedRegionMapper
+
+attribute_mapper = AttributeMapper()
+
+attributes = ['GENE_ID=OR4F5;Pool=1',
+              'GENE_ID=SAMD11&SAMD11&SAMD11;Pool=4,1&5,2&6,3',
+              'GENE_ID=SAMD11&SAMD11&SAMD11;SUBMITTED_REGION=&&;Pool=11&12&1',
+              'GENE_ID=GENE1&GENE2&GENE3&GENE4;SUBMITTED_REGION=&&&;Pool=2&3,6&4&5',
+              'GENE_ID=GENE1;Pool=2;PURPOSE=CDS;CNV_ID=GENE1;CNV_HS=2;TRIM_LEFT=10',
+              'GENE_ID=GENE1;SUBMITTED_REGION=REGION1,REGION2;Pool=2',
+              'GENE1=OR4F5;Pool=1']
+
+
+def test_mapper_pattern():
+    assert attribute_mapper.pattern == ''
+
+
+@pytest.mark.parametrize('string', attributes)
+def test_mapper_matches_single_mappers(string):
+    genes, pools, submitted_regions = attribute_mapper.to_entity_list(string)
+    assert genes == GeneIdMapper().to_entity_list(string)
+    assert pools == PoolMapper().to_entity_list(string)
+    assert submitted_regions == SubmittedRegionMapper().to_entity_list(string)
+
+
+def test_mapper_to_entity_list():
+    genes, pools, submitted_regions = attribute_mapper.to_entity_list('GENE_ID=A&B;SUBMITTED_REGION=&;Pool=2&3,6')
+    assert genes == [['A'], ['B']]
+    assert pools == [[2], [3, 6]]
+    assert submitted_regions == [[''], ['']]
+
+
+def test_mapper_to_entity_list_without_pools():
+    assert attribute_mapper.to_entity_list('GENE_ID=A')[1] == []
+
+
+def test_mapper_ignores_ampersands_in_fields_after_pools():
+    assert attribute_mapper.to_entity_list('GENE_ID=A;Pool=1;NOTE=x&y')[1] == [[1]]
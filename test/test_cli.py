@@ -0,0 +1,103 @@
+import io
+import os
+
+import pytest
+
+from bedhandler.cli import main
+from bedhandler.handler import BedFileLoader
+from bedhandler.handler import ColumnarFileLoader
+
+mock_dir_path = os.path.join(os.path.dirname(__file__), 'handler', 'mocks')
+
+
+def test_convert(tmp_path, capsys):
+    pytest.importorskip('pyarrow')
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    output = str(tmp_path / 'design.feather')
+    assert main(['convert', filename, output]) == 0
+    assert 'Wrote' in capsys.readouterr().err
+    assert ColumnarFileLoader(output).expand_columns() == BedFileLoader(filename).expand_columns()
+
+
+def test_convert_unknown_format(tmp_path, capsys):
+    assert main(['convert', os.path.join(mock_dir_path, 'ampliseq_exome.bed'), str(tmp_path / 'design.bed')]) == 1
+    assert 'Unknown columnar format' in capsys.readouterr().err
+
+
+def run(capsys, argv: list) -> list:
+    assert main(argv) == 0
+    return capsys.readouterr().out.split('\n')[:-1]
+
+
+def test_detect(capsys):
+    assert run(capsys, ['detect', os.path.join(mock_dir_path, 'amplicon_cov.tsv')]) == ['amplicon_cov']
+    lines = run(capsys, ['detect', os.path.join(mock_dir_path, 'ampliseq_exome.bed'),
+                         os.path.join(mock_dir_path, 'general.bed')])
+    assert [line.split('\t')[1] for line in lines] == ['ampliseq_exome', 'general_tsv']
+
+
+def test_stdin(capsys, monkeypatch):
+    with open(os.path.join(mock_dir_path, 'effective_regions.bed')) as file:
+        monkeypatch.setattr('sys.stdin', io.StringIO(file.read()))
+    lines = run(capsys, ['expand'])
+    assert lines[0] == '#chrom\tchrom_start\tchrom_end\tregion_id\tscore\tstrand\tframe\tgene\tpools\tsubmitted_region'
+    assert len(lines) == len(BedFileLoader(os.path.join(mock_dir_path, 'effective_regions.bed')).bed_lines) + 1
+
+
+def test_filter(capsys):
+    filename = os.path.join(mock_dir_path, 'effective_regions.bed')
+    lines = run(capsys, ['filter', filename, '--pool', '3'])
+    assert lines == ['track name="this is a mock"',
+                     'chr1\t69212\t69810\tGENE1_1.1.11194&GENE2_1.2.19824&GENE3_1.2.28698&GENE4_1.2.30842\t0\t+\t.\t'
+                     'GENE_ID=GENE1&GENE2&GENE3&GENE4;SUBMITTED_REGION=&&&;Pool=2&3,6&4&5']
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    assert run(capsys, ['filter', filename, '--gene', 'GENE2', '--gene', 'GENE3', '--region', 'chr1:69000-69400']) \
+        == ['track name="this is a mock"', 'chr1\t69210\t69420\tGENE2_1.1.11194\t0\t+\t.\tGENE_ID=GENE2;Pool=2',
+            'chr1\t69380\t69560\tGENE3_1.2.19824\t0\t+\t.\tGENE_ID=GENE3;Pool=3,6']
+    assert main(['filter', os.path.join(mock_dir_path, 'general.bed'), '--gene', 'GENE1']) == 1
+
+
+def test_sort(capsys, tmp_path):
+    filename = os.path.join(mock_dir_path, 'mock_for_split.bed')
+    lines = run(capsys, ['sort', filename, '--max-lines-in-memory', '2', '--tmp-dir', str(tmp_path)])
+    assert lines[3:] == ['\t'.join(line) for line in BedFileLoader(filename).expand_columns()]
+
+
+def test_query(capsys):
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    lines = run(capsys, ['query', filename, 'chr1:69300-69400'])
+    assert lines == ['track name="this is a mock"',
+                     'chr1\t69210\t69420\tGENE2_1.1.11194\t0\t+\t.\tGENE_ID=GENE2;Pool=2',
+                     'chr1\t69380\t69560\tGENE3_1.2.19824\t0\t+\t.\tGENE_ID=GENE3;Pool=3,6']
+
+
+def test_columnar_input(capsys, tmp_path):
+    pytest.importorskip('pyarrow')
+    filename = os.path.join(mock_dir_path, 'ampliseq_exome.bed')
+    output = str(tmp_path / 'design.parquet')
+    assert main(['convert', filename, output]) == 0
+    capsys.readouterr()
+    assert run(capsys, ['detect', output]) == ['ampliseq_exome']
+    assert run(capsys, ['query', output, 'chr1:69300-69400']) == run(capsys, ['query', filename, 'chr1:69300-69400'])
+
+
+def test_data_lines_are_written_as_found(capsys, tmp_path):
+    filename = os.path.join(mock_dir_path, 'ampliseq_panel.bed')
+    with open(filename) as file:
+        data_lines = file.read().split('\n')[1:]
+    unsorted = tmp_path / 'unsorted.bed'
+    unsorted.write_text('\n'.join(['track name="this is a mock"'] + data_lines[::-1]) + '\n')
+    assert run(capsys, ['sort', str(unsorted), '--max-lines-in-memory', '2', '--tmp-dir', str(tmp_path)])[1:] == \
+        data_lines
+    assert run(capsys, ['filter', filename, '--pool', '1']) == ['track name="this is a mock"', data_lines[1],
+                                                                 data_lines[3]]
+    assert run(capsys, ['query', filename, 'chr2'])[1:] == data_lines[2:]
+    assert run(capsys, ['query', filename, 'chr2', '--strip-chr'])[1:] == [line[3:] for line in data_lines[2:]]
+
+
+def test_missing_input(capsys):
+    with pytest.raises(SystemExit):
+        main(['query', os.path.join(mock_dir_path, 'missing.bed'), 'chr1'])
+    output = capsys.readouterr()
+    assert output.out == ''
+    assert 'File not found' in output.err